@@ -1,13 +1,45 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-API serverless ultra-simple pour Vercel - Test de base
+API serverless pour Vercel
+Seul json est importé au chargement : le moteur de filtrage (bibliothèque
+standard uniquement, sans pandas) n'est importé qu'au premier appel de
+/api/filter, pour que les démarrages à froid des autres routes restent rapides.
+
+POST /api/filter :
+    JSON : {"keywords": [...] ou "keywords_csv": "...",
+            "rows": [{"title": ..., "channelName": ...}, ...] ou "data_csv": "...",
+            "format": "json" (défaut) ou "csv"}
+    CSV  : corps text/csv (Data.csv) et paramètre ?keywords=mot1,mot2
+    Réponse : décisions (Gardé/Rejeté) dans l'ordre des lignes et statistiques.
+    Au-delà de MAX_LIGNES lignes, les données doivent être envoyées en plusieurs lots.
 """
 
 import json
+import os
+import sys
+from collections import OrderedDict
+from urllib.parse import parse_qs
+
+# Modules du projet (dossier parent de api/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Nombre maximal de lignes par appel (lot) et d'automates gardés entre deux appels d'une instance chaude
+MAX_LIGNES = int(os.environ.get('FILTRE_API_MAX_LIGNES', 50_000))
+MAX_AUTOMATES = 8
+
+_automates: 'OrderedDict[frozenset, object]' = OrderedDict()
+
+
+class ErreurRequete(ValueError):
+    """Requête invalide (réponse 400, ou 413 si trop de lignes)"""
+
+    def __init__(self, message, statut=400):
+        super().__init__(message)
+        self.statut = statut
 
 def handler(request):
-    """Handler principal pour Vercel - Version de test"""
+    """Handler principal pour Vercel"""
     try:
         # Headers CORS
         headers = {
@@ -25,16 +57,35 @@ def handler(request):
                 'body': ''
             }
         
+        chemin = request.path.split('?', 1)[0]
+        
         # Route principale - Page d'accueil
-        if request.path == '/' or request.path == '':
+        if chemin == '/' or chemin == '':
             return {
                 'statusCode': 200,
                 'headers': {'Content-Type': 'text/html'},
                 'body': get_homepage_html()
             }
         
+        # Route de filtrage
+        elif chemin == '/api/filter':
+            if request.method != 'POST':
+                return {
+                    'statusCode': 405,
+                    'headers': dict(headers, Allow='POST, OPTIONS'),
+                    'body': json.dumps({'error': 'Method not allowed'})
+                }
+            try:
+                return filtrer(request, headers)
+            except ErreurRequete as e:
+                return {
+                    'statusCode': e.statut,
+                    'headers': headers,
+                    'body': json.dumps({'error': str(e)}, ensure_ascii=False)
+                }
+        
         # Route API de test
-        elif request.path == '/api/test':
+        elif chemin == '/api/test':
             return {
                 'statusCode': 200,
                 'headers': headers,
@@ -61,6 +112,161 @@ def handler(request):
             'body': json.dumps({'error': f'Internal server error: {str(e)}'})
         }
 
+def _entete(request, nom):
+    """Valeur d'un en-tête HTTP (insensible à la casse), '' s'il est absent"""
+    entetes = getattr(request, 'headers', None) or {}
+    for cle, valeur in entetes.items():
+        if cle.lower() == nom.lower():
+            return valeur
+    return ''
+
+def _parametres(request):
+    """Paramètres de la chaîne de requête"""
+    parametres = getattr(request, 'args', None) or getattr(request, 'query', None)
+    if parametres:
+        return {cle: (valeur[0] if isinstance(valeur, list) else valeur) for cle, valeur in parametres.items()}
+    requete = request.path.split('?', 1)[1] if '?' in request.path else ''
+    return {cle: valeurs[0] for cle, valeurs in parse_qs(requete).items()}
+
+def _corps(request):
+    """Corps de la requête décodé en texte"""
+    corps = getattr(request, 'body', None)
+    if corps is None and hasattr(request, 'get_data'):
+        corps = request.get_data()
+    if corps is None:
+        return ''
+    if isinstance(corps, bytes):
+        try:
+            corps = corps.decode('utf-8')
+        except UnicodeDecodeError:
+            raise ErreurRequete('Body must be UTF-8') from None
+    return corps.lstrip('\ufeff')
+
+def _automate(mots_cles):
+    """Automate des mots-clés, réutilisé d'un appel à l'autre tant que l'instance reste chaude"""
+    from automate_mots_cles import AutomateMotsCles
+    
+    cle = frozenset(mots_cles)
+    automate = _automates.get(cle)
+    if automate is None:
+        automate = AutomateMotsCles(cle)
+        _automates[cle] = automate
+        if len(_automates) > MAX_AUTOMATES:
+            _automates.popitem(last=False)
+    else:
+        _automates.move_to_end(cle)
+    return automate
+
+def _champ(ligne, nom):
+    """Texte d'un champ d'une ligne JSON ('' si absent ou null ; 0 ou false restent des valeurs)"""
+    valeur = ligne.get(nom)
+    return '' if valeur is None else str(valeur)
+
+def _verifier_taille(nb_lignes):
+    if nb_lignes > MAX_LIGNES:
+        raise ErreurRequete(f'Too many rows ({nb_lignes}): send at most {MAX_LIGNES} rows per request', 413)
+
+def filtrer(request, headers):
+    """
+    Filtre un lot de vidéos (route /api/filter)
+    
+    Les lignes JSON sont analysées sur f"{title} {channelName}" ; un champ
+    absent ou null compte comme vide. Les lignes CSV sont analysées comme par
+    les autres interfaces (valeur manquante : 'nan').
+    """
+    import csv
+    import io
+    from automate_mots_cles import ExpressionInvalide, normaliser_texte
+    from filtrage_sans_pandas import decisions_csv, lignes_csv, mots_cles_depuis_csv, nettoyer_mots_cles
+    
+    parametres = _parametres(request)
+    corps = _corps(request)
+    format_sortie = parametres.get('format', 'json')
+    
+    try:
+        if _entete(request, 'Content-Type').split(';')[0].strip().lower() == 'text/csv':
+            mots_cles = nettoyer_mots_cles(parametres.get('keywords', '').split(','))
+            donnees = {'data_csv': corps}
+        else:
+            try:
+                donnees = json.loads(corps or '{}')
+            except ValueError:
+                raise ErreurRequete('Body must be JSON or text/csv') from None
+            if not isinstance(donnees, dict):
+                raise ErreurRequete('JSON body must be an object')
+            format_sortie = donnees.get('format', format_sortie)
+            if 'keywords_csv' in donnees:
+                if not isinstance(donnees['keywords_csv'], str):
+                    raise ErreurRequete('keywords_csv must be a string')
+                mots_cles = mots_cles_depuis_csv(donnees['keywords_csv'])
+            else:
+                # Une chaîne serait parcourue caractère par caractère : chaque lettre deviendrait un mot-clé
+                mots_cles = donnees.get('keywords') or []
+                if not isinstance(mots_cles, list) or not all(isinstance(mot, str) for mot in mots_cles):
+                    raise ErreurRequete('keywords must be a list of strings')
+                mots_cles = nettoyer_mots_cles(mots_cles)
+    except ExpressionInvalide as e:
+        raise ErreurRequete(f'Invalid keyword expression: {e}') from None
+    
+    if not mots_cles:
+        raise ErreurRequete('No valid keyword')
+    if format_sortie not in ('json', 'csv'):
+        raise ErreurRequete("format must be 'json' or 'csv'")
+    automate = _automate(mots_cles)
+    
+    if 'data_csv' in donnees:
+        if not isinstance(donnees['data_csv'], str):
+            raise ErreurRequete('data_csv must be a string')
+        lignes = list(lignes_csv(donnees['data_csv']))
+        entete = lignes[0] if lignes else []
+        lignes = lignes[1:]
+        _verifier_taille(len(lignes))
+        decisions = list(decisions_csv(entete, lignes, automate))
+    elif 'rows' in donnees:
+        lignes = donnees['rows']
+        if not isinstance(lignes, list) or not all(isinstance(ligne, dict) for ligne in lignes):
+            raise ErreurRequete('rows must be a list of objects')
+        _verifier_taille(len(lignes))
+        entete = list(OrderedDict.fromkeys(cle for ligne in lignes for cle in ligne))
+        contient = automate.contient
+        decisions = [
+            contient(f"{normaliser_texte(_champ(ligne, 'title'))} {normaliser_texte(_champ(ligne, 'channelName'))}")
+            for ligne in lignes
+        ]
+        lignes = [['' if ligne.get(cle) is None else str(ligne.get(cle)) for cle in entete] for ligne in lignes]
+    else:
+        raise ErreurRequete("Missing 'rows' or 'data_csv'")
+    
+    gardees = sum(decisions)
+    stats = {
+        'gardees': gardees,
+        'rejetees': len(decisions) - gardees,
+        'total': len(decisions),
+        'mots_cles': len(mots_cles)
+    }
+    
+    if format_sortie == 'csv':
+        sortie = io.StringIO()
+        ecrivain = csv.writer(sortie, lineterminator='\n')
+        ecrivain.writerow(list(entete) + ['decision'])
+        for ligne, garde in zip(lignes, decisions):
+            ecrivain.writerow(list(ligne) + ['Gardé' if garde else 'Rejeté'])
+        entetes_csv = dict(headers, **{'Content-Type': 'text/csv; charset=utf-8'})
+        # Tirets et non soulignés : nginx et d'autres proxys ignorent les en-têtes contenant '_'
+        entetes_csv.update({'X-Filtre-' + '-'.join(mot.capitalize() for mot in nom.split('_')): str(valeur)
+                            for nom, valeur in stats.items()})
+        return {'statusCode': 200, 'headers': entetes_csv, 'body': sortie.getvalue()}
+    
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': json.dumps({
+            'success': True,
+            'decisions': ['Gardé' if garde else 'Rejeté' for garde in decisions],
+            'stats': stats
+        }, ensure_ascii=False)
+    }
+
 def get_homepage_html():
     """Retourne le HTML de la page d'accueil"""
     return """
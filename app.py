@@ -4,13 +4,22 @@
 Interface web pour le filtreur de vidéos par mots-clés
 """
 
-from flask import Flask, render_template, request, send_file, flash, redirect, url_for
-import pandas as pd
+from flask import Flask, render_template, request, flash, redirect, url_for, jsonify
+import io
+import json
 import os
+import re
 import tempfile
-from werkzeug.utils import secure_filename
 import shutil
 
+import moteur_filtrage as moteur
+from instrumentation import INSTRUMENTATION_NULLE, creer_instrumentation
+from flux_upload import TAILLE_LECTURE, FormulaireFlux
+from cache_mots_cles import automate_depuis_cache
+from cache_resultats import LecteurEmpreinte, cle_resultat, copier_resultat, ecrire_resultat, lire_resultat
+from file_travaux import TERMINE, FilePleine, FileTravaux, nouvel_identifiant
+from telechargements import NettoyagePeriodique, envoyer_fichier, preparer_gzip, supprimer
+
 app = Flask(__name__)
 app.secret_key = 'votre_cle_secrete_ici'  # Changez cette clé en production
 
@@ -18,6 +27,32 @@ app.secret_key = 'votre_cle_secrete_ici'  # Changez cette clé en production
 UPLOAD_FOLDER = 'uploads'
 ALLOWED_EXTENSIONS = {'csv'}
 
+# Nombre de lignes de Data.csv filtrées à la fois
+TAILLE_BLOC = int(os.environ.get('FILTRE_TAILLE_BLOC', 50_000))
+
+# Nombre de processus pour le filtrage des gros fichiers (0 : tous les cœurs) ; 1 par
+# défaut : les requêtes simultanées se partagent déjà les cœurs
+NB_WORKERS = int(os.environ.get('FILTRE_WORKERS', 1))
+
+# Moteur de recherche (voir moteur_filtrage.BACKENDS ; vide : choix automatique)
+BACKEND = os.environ.get('FILTRE_BACKEND') or None
+
+# Instrumentation : rapport JSON de chaque filtrage dans les logs (FILTRE_PROFIL : cprofile ou tracemalloc)
+INSTRUMENTATION = os.environ.get('FILTRE_INSTRUMENTATION', '').lower() in ('1', 'true', 'oui')
+PROFIL = os.environ.get('FILTRE_PROFIL') or None
+
+# File de travaux en arrière-plan (/jobs) : threads de filtrage et travaux en attente au maximum
+TRAVAUX_WORKERS = int(os.environ.get('FILTRE_TRAVAUX_WORKERS', 2))
+TRAVAUX_FILE = int(os.environ.get('FILTRE_TRAVAUX_FILE', 8))
+travaux = FileTravaux(nb_workers=TRAVAUX_WORKERS, taille_file=TRAVAUX_FILE)
+
+# Nom du fichier résultat, dans le dossier propre à chaque filtrage
+NOM_RESULTAT = 'videos_filtrees.csv'
+
+# Durée de vie des fichiers uploadés et des résultats (secondes), supprimés ensuite en arrière-plan
+RESULTATS_TTL = int(os.environ.get('FILTRE_RESULTATS_TTL', 3600))
+nettoyage = NettoyagePeriodique(UPLOAD_FOLDER, RESULTATS_TTL, en_cours=travaux.en_cours)
+
 # Créer le dossier uploads s'il n'existe pas
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
@@ -28,156 +63,383 @@ def allowed_file(filename):
 def charger_mots_cles(fichier_keywords):
     """Charge les mots-clés depuis le fichier CSV"""
     try:
-        df_keywords = pd.read_csv(fichier_keywords)
-        
-        # Extraire tous les mots-clés
-        if 'keyword' in df_keywords.columns:
-            mots_cles = df_keywords['keyword'].tolist()
-        else:
-            mots_cles = df_keywords.iloc[:, 0].tolist()
-        
-        # Nettoyer et convertir en minuscules
-        mots_cles_clean = set()
-        for mot in mots_cles:
-            if pd.notna(mot):
-                mot_clean = str(mot).strip().lower()
-                if mot_clean:
-                    mots_cles_clean.add(mot_clean)
-        
-        return mots_cles_clean
-        
+        return moteur.charger_mots_cles(fichier_keywords)
     except Exception as e:
         print(f"Erreur lors du chargement des mots-clés: {e}")
         return set()
 
-def contient_mots_cles(texte, mots_cles):
-    """Vérifie si un texte contient au moins un des mots-clés"""
-    if pd.isna(texte) or not isinstance(texte, str):
-        return False
+@app.route('/')
+def index():
+    """Page d'accueil"""
+    return render_template('index.html')
+
+class ErreurFormulaire(ValueError):
+    """Formulaire d'upload incomplet ou invalide (message destiné à l'utilisateur)"""
+
+def creer_instrumentation_requete(mode):
+    """Instrumentation sans effet sauf si FILTRE_INSTRUMENTATION est activé"""
+    return creer_instrumentation(
+        actif=INSTRUMENTATION,
+        profil=PROFIL,
+        contexte={'interface': 'flask', 'mode': mode, 'backend': moteur.choisir_backend(BACKEND, NB_WORKERS)}
+    )
+
+def journaliser_rapport(instrumentation):
+    """Arrête l'instrumentation et écrit son rapport dans les logs"""
+    instrumentation.arreter()
+    if instrumentation.actif:
+        app.logger.info("rapport_filtrage %s", json.dumps(instrumentation.rapport(), ensure_ascii=False))
+
+def lire_formulaire(traiter_data, instrumentation=INSTRUMENTATION_NULLE, dossier=UPLOAD_FOLDER):
+    """
+    Parcourt le formulaire d'upload au fil de la réception
     
-    texte_clean = str(texte).lower()
+    request.files n'est jamais utilisé : il mettrait tout l'upload en mémoire
+    ou sur disque avant de rendre la main.
     
-    for mot_cle in mots_cles:
-        if mot_cle in texte_clean:
-            return True
+    Le champ 'correspondances' (case à cocher placée avant les fichiers dans
+    le formulaire) demande la colonne matched_keywords et les statistiques
+    par mot-clé. Le champ facultatif 'data_sha256', envoyé avant Data.csv,
+    annonce l'empreinte SHA-256 du fichier pour consulter le cache des
+    résultats avant de le recevoir (voir resultat_annonce).
     
-    return False
-
-def filtrer_videos(fichier_data, fichier_keywords):
-    """Filtre les vidéos en fonction des mots-clés"""
-    # Charger les mots-clés
-    mots_cles = charger_mots_cles(fichier_keywords)
-    if not mots_cles:
-        return None, "Aucun mot-clé valide trouvé dans le fichier keywords.csv"
+    Args:
+        traiter_data: Fonction appelée avec (flux de Data.csv, automate,
+            correspondances, empreinte annoncée ou None) dès que les mots-clés sont connus
+        instrumentation: Reçoit les durées des étapes
+        dossier: Dossier du fichier temporaire (Data.csv reçu avant keywords.csv)
     
-    # Charger les données des vidéos
-    try:
-        df_data = pd.read_csv(fichier_data)
-    except Exception as e:
-        return None, f"Erreur lors du chargement des données: {e}"
+    Returns:
+        Valeur renvoyée par traiter_data
     
-    # Créer une copie du DataFrame
-    df_resultat = df_data.copy()
-    df_resultat['decision'] = 'Rejeté'  # Par défaut, toutes les vidéos sont rejetées
+    Raises:
+        ErreurFormulaire: Si un fichier manque, n'est pas un CSV, si keywords.csv est
+            vide ou si data_sha256 n'est pas une empreinte SHA-256
+    """
+    frontiere = request.mimetype_params.get('boundary')
+    if request.mimetype != 'multipart/form-data' or not frontiere:
+        raise ErreurFormulaire('Veuillez sélectionner les deux fichiers CSV')
     
-    # Compter les vidéos gardées et rejetées
-    gardees = 0
-    rejetees = 0
+    automate = None
+    resultat = None
+    data_recu = False
+    data_en_attente = None
+    correspondances = False
+    empreinte_annoncee = None
     
-    # Analyser chaque vidéo
-    for index, row in df_data.iterrows():
-        titre = row.get('title', '')
-        channel_name = row.get('channelName', '')
+    try:
+        for partie in FormulaireFlux(request.stream, frontiere).parties():
+            if partie.nom == 'correspondances':
+                correspondances = partie.read().strip() not in (b'', b'0')
+                continue
+            if partie.nom == 'data_sha256':
+                empreinte_annoncee = partie.read().strip().lower().decode('ascii', 'replace') or None
+                if empreinte_annoncee is not None and not re.fullmatch(r'[0-9a-f]{64}', empreinte_annoncee):
+                    raise ErreurFormulaire("Empreinte data_sha256 invalide")
+                continue
+            if partie.nom not in ('data_file', 'keywords_file'):
+                continue
+            
+            if not partie.nom_fichier:
+                raise ErreurFormulaire('Veuillez sélectionner les deux fichiers CSV')
+            
+            if not allowed_file(partie.nom_fichier):
+                raise ErreurFormulaire('Seuls les fichiers CSV sont autorisés')
+            
+            if partie.nom == 'keywords_file':
+                # Mots-clés compilés (depuis le cache si ce fichier est déjà connu)
+                with instrumentation.etape('chargement_mots_cles'):
+                    contenu_keywords = partie.read()
+                    automate = automate_depuis_cache(
+                        contenu_keywords, lambda: charger_mots_cles(io.BytesIO(contenu_keywords))
+                    )
+                if not automate:
+                    raise ErreurFormulaire("Erreur lors du filtrage: Aucun mot-clé valide trouvé dans le fichier keywords.csv")
+            
+            elif automate is not None:
+                # Cas normal : les mots-clés sont déjà connus, Data.csv est traité pendant sa réception
+                resultat = traiter_data(partie, automate, correspondances, empreinte_annoncee)
+                data_recu = True
+            
+            else:
+                # Data.csv envoyé avant keywords.csv : il faut le conserver le temps de recevoir les mots-clés
+                with instrumentation.etape('reception'):
+                    descripteur, data_en_attente = tempfile.mkstemp(dir=dossier, suffix='.csv')
+                    with os.fdopen(descripteur, 'wb') as fichier:
+                        shutil.copyfileobj(partie, fichier, TAILLE_LECTURE)
         
-        # Combiner titre et nom de chaîne pour l'analyse
-        texte_analyse = f"{titre} {channel_name}"
+        if automate is None or not (data_recu or data_en_attente):
+            raise ErreurFormulaire('Veuillez sélectionner les deux fichiers CSV')
         
-        if contient_mots_cles(texte_analyse, mots_cles):
-            df_resultat.at[index, 'decision'] = 'Gardé'
-            gardees += 1
-        else:
-            rejetees += 1
+        if not data_recu:
+            with open(data_en_attente, 'rb') as fichier:
+                resultat = traiter_data(fichier, automate, correspondances, empreinte_annoncee)
+        return resultat
     
-    return df_resultat, {
-        'gardees': gardees,
-        'rejetees': rejetees,
-        'total': len(df_data),
-        'mots_cles': len(mots_cles)
-    }
+    finally:
+        # Nettoyer le fichier temporaire éventuel
+        if data_en_attente is not None and os.path.exists(data_en_attente):
+            os.remove(data_en_attente)
 
-@app.route('/')
-def index():
-    """Page d'accueil"""
-    return render_template('index.html')
+def statistiques_session(stats):
+    """Statistiques affichées dans result.html (mots-clés les plus trouvés en mode correspondances)"""
+    session = {
+        'gardees': stats['gardees'],
+        'rejetees': stats['rejetees'],
+        'total': stats['total'],
+        'mots_cles': stats['mots_cles'],
+        'taux_conservation': round((stats['gardees'] / stats['total'] * 100), 1) if stats['total'] > 0 else 0
+    }
+    for cle in ('mots_cles_frequents', 'mots_cles_sans_correspondance'):
+        if cle in stats:
+            session[cle] = stats[cle]
+    return session
 
 @app.route('/upload', methods=['POST'])
 def upload_files():
-    """Traite l'upload des fichiers et effectue le filtrage"""
-    if 'data_file' not in request.files or 'keywords_file' not in request.files:
-        flash('Veuillez sélectionner les deux fichiers CSV', 'error')
-        return redirect(url_for('index'))
+    """
+    Traite l'upload des fichiers et filtre Data.csv au fil de sa réception
     
-    data_file = request.files['data_file']
-    keywords_file = request.files['keywords_file']
+    Le résultat est ajouté au cache ; il en est servi directement si
+    l'empreinte de Data.csv est annoncée (champ data_sha256) et déjà connue.
+    """
+    nettoyage.demarrer()
+    instrumentation = creer_instrumentation_requete('synchrone')
+    instrumentation.demarrer()
     
-    if data_file.filename == '' or keywords_file.filename == '':
-        flash('Veuillez sélectionner les deux fichiers CSV', 'error')
-        return redirect(url_for('index'))
+    # Dossier propre à ce filtrage : les utilisateurs simultanés ne partagent aucun fichier
+    job_id = nouvel_identifiant()
+    os.makedirs(dossier_travail(job_id))
+    output_path = fichier_resultat(job_id)
     
-    if not (allowed_file(data_file.filename) and allowed_file(keywords_file.filename)):
-        flash('Seuls les fichiers CSV sont autorisés', 'error')
-        return redirect(url_for('index'))
+    def filtrer_data(flux, automate, correspondances, empreinte_annoncee):
+        stats = resultat_annonce(flux, automate, correspondances, empreinte_annoncee, output_path, instrumentation)
+        if stats is not None:
+            return stats
+        
+        # Data.csv est filtré pendant sa réception, sans être enregistré : son empreinte,
+        # calculée au passage, ne sert qu'à mettre le résultat en cache une fois le filtrage terminé
+        lecteur = LecteurEmpreinte(flux)
+        stats = statistiques_session(filtrer_flux(lecteur, automate, output_path, instrumentation,
+                                                  correspondances=correspondances))
+        while lecteur.read(TAILLE_LECTURE):
+            pass
+        with instrumentation.etape('cache_resultats'):
+            cle = cle_resultat(lecteur.hexdigest(), moteur.empreinte_mots_cles(automate), correspondances)
+            ecrire_resultat(cle, output_path, stats)
+        return stats
     
     try:
-        # Sauvegarder les fichiers temporairement
-        data_filename = secure_filename(data_file.filename)
-        keywords_filename = secure_filename(keywords_file.filename)
-        
-        data_path = os.path.join(UPLOAD_FOLDER, data_filename)
-        keywords_path = os.path.join(UPLOAD_FOLDER, keywords_filename)
-        
-        data_file.save(data_path)
-        keywords_file.save(keywords_path)
-        
-        # Effectuer le filtrage
-        resultat, stats = filtrer_videos(data_path, keywords_path)
-        
-        if resultat is None:
-            flash(f"Erreur lors du filtrage: {stats}", 'error')
-            return redirect(url_for('index'))
-        
-        # Sauvegarder le résultat
-        output_filename = 'videos_filtrees.csv'
-        output_path = os.path.join(UPLOAD_FOLDER, output_filename)
-        resultat.to_csv(output_path, index=False, encoding='utf-8')
-        
-        # Nettoyer les fichiers temporaires
-        os.remove(data_path)
-        os.remove(keywords_path)
-        
-        # Stocker les statistiques dans la session
-        session_stats = {
-            'gardees': stats['gardees'],
-            'rejetees': stats['rejetees'],
-            'total': stats['total'],
-            'mots_cles': stats['mots_cles'],
-            'taux_conservation': round((stats['gardees'] / stats['total'] * 100), 1) if stats['total'] > 0 else 0
-        }
+        stats = lire_formulaire(filtrer_data, instrumentation, dossier_travail(job_id))
         
         flash('Filtrage terminé avec succès !', 'success')
-        return render_template('result.html', stats=session_stats, output_file=output_filename)
+        return render_template('result.html', stats=stats, job_id=job_id)
+    
+    except ErreurFormulaire as e:
+        supprimer(dossier_travail(job_id))
+        flash(str(e), 'error')
+        return redirect(url_for('index'))
         
     except Exception as e:
+        supprimer(dossier_travail(job_id))
         flash(f'Erreur lors du traitement: {str(e)}', 'error')
         return redirect(url_for('index'))
+    
+    finally:
+        journaliser_rapport(instrumentation)
+
+def resultat_annonce(flux, automate, correspondances, empreinte_annoncee, destination,
+                     instrumentation=INSTRUMENTATION_NULLE):
+    """
+    Sert depuis le cache le résultat d'un Data.csv dont l'empreinte a été annoncée
+    
+    Sans cette annonce, l'empreinte n'est connue qu'une fois Data.csv reçu :
+    le fichier serait à conserver pour pouvoir le filtrer en cas d'absence du
+    cache. En cas de succès, Data.csv est tout de même lu jusqu'au bout (sans
+    être conservé) pour vérifier l'empreinte annoncée : le résultat d'un autre
+    fichier n'est jamais servi.
+    
+    Returns:
+        Statistiques du résultat copié vers destination, ou None sans empreinte
+        annoncée ou sans résultat en cache (le flux n'est alors pas lu)
+    
+    Raises:
+        ErreurFormulaire: Si l'empreinte de Data.csv n'est pas celle annoncée
+    """
+    if empreinte_annoncee is None:
+        return None
+    with instrumentation.etape('cache_resultats'):
+        en_cache = lire_resultat(cle_resultat(empreinte_annoncee, moteur.empreinte_mots_cles(automate),
+                                              correspondances))
+    if en_cache is None:
+        return None
+    
+    with instrumentation.etape('reception'):
+        lecteur = LecteurEmpreinte(flux)
+        while lecteur.read(TAILLE_LECTURE):
+            pass
+    if lecteur.hexdigest() != empreinte_annoncee:
+        raise ErreurFormulaire("L'empreinte data_sha256 ne correspond pas au fichier Data.csv")
+    chemin_cache, stats = en_cache
+    copier_resultat(chemin_cache, destination)
+    return stats
+
+def enregistrer_data(flux, automate, correspondances, dossier):
+    """
+    Enregistre Data.csv reçu en flux dans le dossier du filtrage (travail en arrière-plan)
+    
+    Returns:
+        Tuple (chemin du fichier, clé du cache des résultats calculée d'après
+        l'empreinte de son contenu et celle des mots-clés)
+    """
+    lecteur = LecteurEmpreinte(flux)
+    chemin = os.path.join(dossier, 'Data.csv')
+    with open(chemin, 'wb') as fichier:
+        shutil.copyfileobj(lecteur, fichier, TAILLE_LECTURE)
+    return chemin, cle_resultat(lecteur.hexdigest(), moteur.empreinte_mots_cles(automate), correspondances)
+
+def filtrer_flux(flux, automate, output_path, instrumentation=INSTRUMENTATION_NULLE, rappel=None,
+                 correspondances=False):
+    """Filtre un CSV lu en flux, bloc par bloc, directement vers le fichier résultat"""
+    lecteur = io.BufferedReader(flux, TAILLE_LECTURE) if isinstance(flux, io.RawIOBase) else flux
+    stats = moteur.filtrer_par_blocs(
+        lecteur, automate, output_path, TAILLE_BLOC,
+        backend=BACKEND, nb_workers=NB_WORKERS, rappel=rappel, instrumentation=instrumentation,
+        correspondances=correspondances
+    )
+    instrumentation.compter('octets_lus', getattr(flux, 'octets_lus', 0) or os.fstat(flux.fileno()).st_size)
+    return stats
+
+def executer_travail(travail, fichier_data, automate, output_path, cle, correspondances=False):
+    """Filtrage exécuté en arrière-plan par la file de travaux ; le résultat est ajouté au cache"""
+    instrumentation = creer_instrumentation_requete('travail')
+    instrumentation.demarrer()
+    try:
+        taille = os.path.getsize(fichier_data)
+        with open(fichier_data, 'rb') as flux:
+            def rappel(lignes):
+                # Avancement estimé d'après la position de lecture dans Data.csv
+                travail.lignes_traitees = lignes
+                travail.progression = min(flux.tell() / taille, 1.0) if taille else 1.0
+            
+            stats = statistiques_session(filtrer_flux(flux, automate, output_path, instrumentation, rappel,
+                                                      correspondances))
+        with instrumentation.etape('cache_resultats'):
+            ecrire_resultat(cle, output_path, stats)
+        # Version gzip préparée ici, en arrière-plan, plutôt qu'au premier téléchargement
+        with instrumentation.etape('compression'):
+            preparer_gzip(output_path)
+        return stats
+    finally:
+        os.remove(fichier_data)
+        journaliser_rapport(instrumentation)
+
+def reponse_travail(travail, code=200):
+    """État JSON d'un travail, avec les liens utiles"""
+    etat = travail.en_dict()
+    etat['statut_url'] = url_for('statut_travail', job_id=travail.id)
+    if travail.etat == TERMINE:
+        etat['resultat_url'] = url_for('resultat_travail', job_id=travail.id)
+        etat['page_url'] = url_for('page_travail', job_id=travail.id)
+    return jsonify(etat), code
+
+def dossier_travail(job_id):
+    """Dossier des fichiers d'un filtrage (upload en attente, résultat)"""
+    return os.path.join(UPLOAD_FOLDER, job_id)
+
+def fichier_resultat(job_id):
+    """Fichier résultat d'un filtrage"""
+    return os.path.join(dossier_travail(job_id), NOM_RESULTAT)
+
+def identifiant_valide(job_id):
+    """Vrai si job_id a la forme d'un identifiant de travail (pas de chemin arbitraire)"""
+    return re.fullmatch(r'[0-9a-f]{32}', job_id) is not None
+
+@app.route('/jobs', methods=['POST'])
+def soumettre_travail():
+    """Reçoit les fichiers et soumet le filtrage à la file de travaux (réponse immédiate)"""
+    # Refuser avant de recevoir Data.csv si aucune place n'est libre
+    if travaux.pleine():
+        reponse = jsonify({'erreur': "Trop de filtrages en cours, réessayez dans quelques instants"})
+        return reponse, 503, {'Retry-After': '5'}
+    
+    def recevoir_data(flux, automate, correspondances, empreinte_annoncee):
+        # Empreinte annoncée et résultat en cache : Data.csv n'est pas enregistré
+        stats = resultat_annonce(flux, automate, correspondances, empreinte_annoncee, fichier_resultat(job_id))
+        if stats is not None:
+            return stats, None
+        chemin, cle = enregistrer_data(flux, automate, correspondances, dossier_travail(job_id))
+        return None, (chemin, automate, cle, correspondances)
+    
+    nettoyage.demarrer()
+    job_id = nouvel_identifiant()
+    os.makedirs(dossier_travail(job_id))
+    try:
+        stats, reception = lire_formulaire(recevoir_data, dossier=dossier_travail(job_id))
+        if stats is None:
+            fichier_data, automate, cle, correspondances = reception
+            # Mêmes fichiers déjà filtrés : le résultat en cache est servi sans nouveau filtrage
+            en_cache = lire_resultat(cle)
+            if en_cache is not None:
+                os.remove(fichier_data)
+                chemin_cache, stats = en_cache
+                copier_resultat(chemin_cache, fichier_resultat(job_id))
+        if stats is not None:
+            return reponse_travail(travaux.enregistrer_termine(stats, identifiant=job_id), 200)
+        
+        travail = travaux.soumettre(executer_travail, fichier_data, automate, fichier_resultat(job_id), cle,
+                                    correspondances, identifiant=job_id)
+        return reponse_travail(travail, 202)
+    
+    except ErreurFormulaire as e:
+        supprimer(dossier_travail(job_id))
+        return jsonify({'erreur': str(e)}), 400
+    
+    except FilePleine:
+        supprimer(dossier_travail(job_id))
+        return jsonify({'erreur': "Trop de filtrages en cours, réessayez dans quelques instants"}), 503, {'Retry-After': '5'}
+    
+    except Exception as e:
+        supprimer(dossier_travail(job_id))
+        return jsonify({'erreur': f'Erreur lors du traitement: {str(e)}'}), 500
+
+@app.route('/jobs/<job_id>')
+def statut_travail(job_id):
+    """État et avancement d'un travail"""
+    travail = travaux.obtenir(job_id)
+    if travail is None:
+        return jsonify({'erreur': 'Travail inconnu'}), 404
+    return reponse_travail(travail)
+
+@app.route('/jobs/<job_id>/resultat')
+def resultat_travail(job_id):
+    """Télécharge le résultat d'un travail terminé"""
+    travail = travaux.obtenir(job_id)
+    if travail is None:
+        return jsonify({'erreur': 'Travail inconnu'}), 404
+    if travail.etat != TERMINE:
+        return reponse_travail(travail, 409)
+    return download_file(job_id)
+
+@app.route('/jobs/<job_id>/page')
+def page_travail(job_id):
+    """Page de résultats d'un travail terminé"""
+    travail = travaux.obtenir(job_id)
+    if travail is None or travail.etat != TERMINE:
+        message = travail.erreur if travail is not None and travail.erreur else 'Résultat non disponible'
+        flash(f'Erreur lors du traitement: {message}', 'error')
+        return redirect(url_for('index'))
+    
+    flash('Filtrage terminé avec succès !', 'success')
+    return render_template('result.html', stats=travail.resultat, job_id=job_id)
 
-@app.route('/download/<filename>')
-def download_file(filename):
-    """Télécharge le fichier filtré"""
+@app.route('/download/<job_id>')
+def download_file(job_id):
+    """Télécharge le fichier filtré (par morceaux, gzip si accepté, requêtes Range possibles)"""
     try:
-        file_path = os.path.join(UPLOAD_FOLDER, filename)
-        if os.path.exists(file_path):
-            return send_file(file_path, as_attachment=True, download_name=filename)
+        file_path = fichier_resultat(job_id) if identifiant_valide(job_id) else None
+        if file_path is not None and os.path.exists(file_path):
+            return envoyer_fichier(request, file_path, NOM_RESULTAT)
         else:
             flash('Fichier non trouvé', 'error')
             return redirect(url_for('index'))
@@ -185,14 +447,12 @@ def download_file(filename):
         flash(f'Erreur lors du téléchargement: {str(e)}', 'error')
         return redirect(url_for('index'))
 
-@app.route('/cleanup')
-def cleanup():
-    """Nettoie les fichiers temporaires"""
+@app.route('/cleanup/<job_id>')
+def cleanup(job_id):
+    """Supprime les fichiers d'un filtrage (ceux des autres utilisateurs ne sont pas touchés)"""
     try:
-        for filename in os.listdir(UPLOAD_FOLDER):
-            file_path = os.path.join(UPLOAD_FOLDER, filename)
-            if os.path.isfile(file_path):
-                os.remove(file_path)
+        if identifiant_valide(job_id) and not travaux.en_cours(job_id):
+            supprimer(dossier_travail(job_id))
         flash('Fichiers temporaires nettoyés', 'info')
     except Exception as e:
         flash(f'Erreur lors du nettoyage: {str(e)}', 'error')
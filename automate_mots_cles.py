@@ -0,0 +1,728 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Automate de recherche des mots-clés (bibliothèque standard uniquement)
+Séparé de moteur_filtrage pour être importable sans pandas ni numpy : l'API
+serverless et le cache des mots-clés n'en ont pas besoin.
+
+Textes et mots-clés sont comparés après normalisation (normaliser_texte) :
+sans casse ni accents, espaces regroupés.
+
+Une ligne de keywords.csv peut aussi être une expression booléenne, reconnue
+à ses opérateurs en majuscules :
+    python AND (tutoriel OR cours) NOT shorts
+Les termes sont des suites de mots (ou des textes entre guillemets doubles)
+recherchés comme des mots-clés ; `a NOT b` équivaut à `a AND NOT b`, AND est
+prioritaire sur OR. Une vidéo est gardée si un mot-clé ou une expression est
+vrai. Tous les termes sont trouvés par le même passage de l'automate ; les
+expressions sont ensuite évaluées sur le masque de bits des termes présents.
+"""
+
+import hashlib
+import re
+import unicodedata
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+# À incrémenter quand normaliser_texte change : les empreintes des mots-clés
+# (cache des résultats, état du mode incrémental) deviennent alors différentes
+VERSION_NORMALISATION = 1
+
+
+class _TableAccents(dict):
+    """
+    Table de str.translate retirant les marques combinantes (accents après NFKD)
+
+    Remplie à la demande, caractère par caractère : énumérer tout Unicode au
+    démarrage coûterait plus cher que le filtrage d'un petit fichier.
+    """
+
+    def __missing__(self, code: int):
+        valeur = None if unicodedata.combining(chr(code)) else code
+        self[code] = valeur
+        return valeur
+
+
+_TABLE_ACCENTS = _TableAccents()
+
+# Marques combinantes les plus fréquentes (bloc « diacritiques » U+0300 à U+036F,
+# sauf U+034F qui n'est pas combinante au sens de unicodedata.combining)
+_ACCENTS_USUELS = re.compile('[\u0300-\u034e\u0350-\u036f]+')
+
+
+def normaliser_texte(texte: str) -> str:
+    """
+    Forme normalisée d'un texte pour la recherche des mots-clés
+
+    Insensible à la casse (casefold), aux formes Unicode de compatibilité
+    (NFKD : ligatures, exposants, espaces insécables...) et aux accents
+    (marques combinantes retirées) ; les blancs sont regroupés en un espace
+    et retirés aux extrémités. "  Débutant TUTORIEL " devient "debutant tutoriel".
+    """
+    if texte.isascii():
+        return ' '.join(texte.lower().split())
+    # Cas courant (alphabet latin) : il ne reste que de l'ASCII une fois les accents usuels retirés
+    texte = _ACCENTS_USUELS.sub('', unicodedata.normalize('NFKD', texte).casefold())
+    if not texte.isascii():
+        texte = unicodedata.normalize('NFKD', texte).translate(_TABLE_ACCENTS)
+    return ' '.join(texte.split())
+
+
+# Opérateurs des expressions (en majuscules uniquement : "and" reste un mot ordinaire)
+OPERATEURS = ('AND', 'OR', 'NOT')
+
+# Un opérateur isolé (entouré de blancs, de parenthèses ou aux extrémités) signale une expression
+_OPERATEUR = re.compile(r'(?<![^\s()])(?:AND|OR|NOT)(?![^\s()])')
+
+# Lexèmes : parenthèse, texte entre guillemets ("" pour un guillemet) ou mot
+_LEXEME = re.compile(r'\s*(?:(\()|(\))|"((?:[^"]|"")*)"|([^\s()"]+)|(\S))')
+
+# Caractères qui obligent à écrire un terme entre guillemets
+_A_CITER = re.compile(r'[()"]')
+
+# Plan d'une expression : ('terme', texte), ('non', plan), ('et', plans) ou ('ou', plans)
+Plan = Tuple
+
+
+class ExpressionInvalide(ValueError):
+    """Expression booléenne de keywords.csv mal formée"""
+
+
+def est_expression(regle: str) -> bool:
+    """Vrai si la ligne de keywords.csv est une expression booléenne (et non un simple mot-clé)"""
+    return _OPERATEUR.search(regle) is not None
+
+
+def _lexemes(expression: str) -> Iterator[Tuple[str, str]]:
+    """Lexèmes (nature, valeur) : '(' , ')', 'op' ou 'terme' ; les mots consécutifs forment un seul terme"""
+    mots: List[str] = []
+    for ouvrante, fermante, cite, mot, autre in _LEXEME.findall(expression):
+        if mot and mot not in OPERATEURS:
+            mots.append(mot)
+            continue
+        if mots:
+            yield 'terme', ' '.join(mots)
+            mots = []
+        if autre:
+            raise ExpressionInvalide(f"Guillemet non fermé dans l'expression: {expression}")
+        if ouvrante or fermante:
+            yield ouvrante or fermante, ''
+        elif mot:
+            yield 'op', mot
+        else:
+            yield 'terme', cite.replace('""', '"')
+    if mots:
+        yield 'terme', ' '.join(mots)
+
+
+def analyser_expression(expression: str) -> Plan:
+    """
+    Analyse une expression booléenne de mots-clés
+
+    Grammaire (AND prioritaire sur OR) :
+        ou    := et ('OR' et)*
+        et    := unaire (['AND'] unaire)*     le second terme doit commencer par NOT sans AND
+        unaire:= 'NOT' unaire | '(' ou ')' | terme
+
+    Returns:
+        Plan de l'expression, termes normalisés (normaliser_texte)
+
+    Raises:
+        ExpressionInvalide: Si l'expression est mal formée ou contient un terme vide
+    """
+    lexemes = list(_lexemes(expression))
+    position = 0
+
+    def erreur(message: str) -> ExpressionInvalide:
+        return ExpressionInvalide(f"{message} dans l'expression: {expression}")
+
+    def suivant() -> Tuple[str, str]:
+        return lexemes[position] if position < len(lexemes) else ('fin', '')
+
+    def regrouper(nature: str, plans: List[Plan]) -> Plan:
+        # (a AND (b AND c)) devient (a AND b AND c)
+        aplatis: List[Plan] = []
+        for plan in plans:
+            aplatis.extend(plan[1] if plan[0] == nature else (plan,))
+        return aplatis[0] if len(aplatis) == 1 else (nature, tuple(aplatis))
+
+    def ou() -> Plan:
+        nonlocal position
+        plans = [et()]
+        while suivant() == ('op', 'OR'):
+            position += 1
+            plans.append(et())
+        return regrouper('ou', plans)
+
+    def et() -> Plan:
+        nonlocal position
+        plans = [unaire()]
+        while suivant() in (('op', 'AND'), ('op', 'NOT')):
+            if suivant() == ('op', 'AND'):
+                position += 1
+            plans.append(unaire())
+        return regrouper('et', plans)
+
+    def unaire() -> Plan:
+        nonlocal position
+        nature, valeur = suivant()
+        position += 1
+        if (nature, valeur) == ('op', 'NOT'):
+            return ('non', unaire())
+        if nature == '(':
+            plan = ou()
+            if suivant()[0] != ')':
+                raise erreur("Parenthèse fermante manquante")
+            position += 1
+            return plan
+        if nature == 'terme':
+            terme = normaliser_texte(valeur)
+            if not terme:
+                raise erreur("Terme vide")
+            return ('terme', terme)
+        if nature == 'fin':
+            raise erreur("Terme manquant en fin d'expression")
+        raise erreur(f"Terme attendu avant '{valeur or nature}'")
+
+    plan = ou()
+    if position < len(lexemes):
+        nature, valeur = lexemes[position]
+        raise erreur(f"Opérateur attendu avant '{valeur or nature}'")
+    return plan
+
+
+def ecrire_expression(plan: Plan) -> str:
+    """
+    Forme canonique d'un plan, relue à l'identique par analyser_expression
+
+    Les termes normalisés sont en minuscules et ne peuvent pas être pris pour
+    des opérateurs : seuls ceux qui contiennent une parenthèse ou un guillemet
+    sont écrits entre guillemets.
+    """
+    nature, contenu = plan
+    if nature == 'terme':
+        return '"' + contenu.replace('"', '""') + '"' if _A_CITER.search(contenu) else contenu
+    if nature == 'non':
+        return 'NOT ' + (f"({ecrire_expression(contenu)})" if contenu[0] in ('et', 'ou') else ecrire_expression(contenu))
+    if nature == 'et':
+        return ' AND '.join(f"({ecrire_expression(p)})" if p[0] == 'ou' else ecrire_expression(p) for p in contenu)
+    return ' OR '.join(ecrire_expression(p) for p in contenu)
+
+
+def termes_plan(plan: Plan) -> Iterator[str]:
+    """Termes d'un plan, dans l'ordre d'apparition"""
+    nature, contenu = plan
+    if nature == 'terme':
+        yield contenu
+    elif nature == 'non':
+        yield from termes_plan(contenu)
+    else:
+        for sous_plan in contenu:
+            yield from termes_plan(sous_plan)
+
+
+def plan_vrai(plan: Plan, texte: str) -> bool:
+    """Évaluation directe d'un plan sur un texte normalisé (implémentation de référence, `terme in texte`)"""
+    nature, contenu = plan
+    if nature == 'terme':
+        return contenu in texte
+    if nature == 'non':
+        return not plan_vrai(contenu, texte)
+    if nature == 'et':
+        return all(plan_vrai(sous_plan, texte) for sous_plan in contenu)
+    return any(plan_vrai(sous_plan, texte) for sous_plan in contenu)
+
+
+def nettoyer_regle(valeur: str) -> str:
+    """
+    Ligne de keywords.csv sous forme comparable : mot-clé normalisé, ou
+    expression analysée puis réécrite sous sa forme canonique ('' si vide)
+
+    Raises:
+        ExpressionInvalide: Si la ligne est une expression mal formée
+    """
+    if est_expression(valeur):
+        return ecrire_expression(analyser_expression(valeur))
+    return normaliser_texte(valeur)
+
+
+def evaluateur(plan: Plan, bits: Callable[[str], int]) -> Callable[[int], bool]:
+    """
+    Fonction évaluant un plan sur le masque de bits des termes présents
+
+    Args:
+        plan: Plan de l'expression
+        bits: Bit (1 << numéro) de chaque terme
+    """
+    nature, contenu = plan
+    if nature == 'terme':
+        bit = bits(contenu)
+        return lambda presents: presents & bit != 0
+    if nature == 'non':
+        sous = evaluateur(contenu, bits)
+        return lambda presents: not sous(presents)
+
+    # Termes positifs regroupés en un seul test de masque
+    masque = 0
+    autres = []
+    for sous_plan in contenu:
+        if sous_plan[0] == 'terme':
+            masque |= bits(sous_plan[1])
+        else:
+            autres.append(evaluateur(sous_plan, bits))
+    if nature == 'et':
+        return lambda presents: presents & masque == masque and all(sous(presents) for sous in autres)
+    return lambda presents: presents & masque != 0 or any(sous(presents) for sous in autres)
+
+
+class AutomateMotsCles:
+    """
+    Automate d'Aho-Corasick construit une seule fois à partir des mots-clés
+
+    La recherche a la même sémantique que `mot_cle in texte` pour chaque
+    mot-clé : un texte est accepté dès qu'un mot-clé y apparaît comme
+    sous-chaîne. Le texte doit déjà être normalisé (normaliser_texte), comme
+    les mots-clés renvoyés par `charger_mots_cles`.
+
+    Les expressions booléennes (voir analyser_expression) partagent l'automate :
+    leurs termes y sont ajoutés, chaque état final portant le masque de bits
+    des termes reconnus. Un texte est alors parcouru une seule fois, puis les
+    expressions sont évaluées sur le masque des termes présents.
+    """
+
+    __slots__ = ('mots_cles', 'simples', 'expressions', 'termes', 'plans', '_transitions', '_echecs', '_finaux',
+                 '_mots', '_sorties', '_evaluer', '_expression')
+
+    def __init__(self, mots_cles: Iterable[str]):
+        self.mots_cles = frozenset(mots_cles)
+        self.simples = frozenset(regle for regle in self.mots_cles if not est_expression(regle))
+        self.expressions = tuple(sorted(self.mots_cles - self.simples))
+        self.plans = tuple(analyser_expression(regle) for regle in self.expressions)
+        self.termes = tuple(dict.fromkeys(terme for plan in self.plans for terme in termes_plan(plan)))
+
+        # Construction du trie (transitions "goto") : mots-clés simples puis termes des expressions
+        transitions: List[dict] = [{}]
+        finaux: List[bool] = [False]
+        sorties: List[int] = [0]
+
+        def ajouter(mot: str) -> int:
+            etat = 0
+            for car in mot:
+                suivant = transitions[etat].get(car)
+                if suivant is None:
+                    suivant = len(transitions)
+                    transitions[etat][car] = suivant
+                    transitions.append({})
+                    finaux.append(False)
+                    sorties.append(0)
+                etat = suivant
+            return etat
+
+        # Mots-clés simples reconnus par chaque état final (pour correspondances)
+        mots: Dict[int, Tuple[str, ...]] = {}
+        for mot in self.simples:
+            etat = ajouter(mot)
+            finaux[etat] = True
+            mots[etat] = (mot,)
+        for numero, terme in enumerate(self.termes):
+            sorties[ajouter(terme)] |= 1 << numero
+
+        # Liens d'échec calculés en largeur d'abord
+        echecs = [0] * len(transitions)
+        file_etats = deque(transitions[0].values())
+        while file_etats:
+            etat = file_etats.popleft()
+            for car, suivant in transitions[etat].items():
+                file_etats.append(suivant)
+                repli = echecs[etat]
+                while repli and car not in transitions[repli]:
+                    repli = echecs[repli]
+                echecs[suivant] = transitions[repli].get(car, 0)
+                # Un état est final si un suffixe de son chemin est un mot-clé (ou un terme)
+                finaux[suivant] = finaux[suivant] or finaux[echecs[suivant]]
+                if echecs[suivant] in mots:
+                    mots[suivant] = mots.get(suivant, ()) + mots[echecs[suivant]]
+                sorties[suivant] |= sorties[echecs[suivant]]
+
+        self._transitions = transitions
+        self._echecs = echecs
+        self._finaux = finaux
+        self._mots = mots
+        self._sorties = sorties
+        self._evaluer = None
+        self._expression = None
+
+    def __getstate__(self):
+        # L'évaluateur des expressions (fonctions) est reconstruit après désérialisation
+        return {nom: getattr(self, nom) for nom in self.__slots__ if nom != '_evaluer'}
+
+    def __setstate__(self, etat):
+        for nom, valeur in etat.items():
+            setattr(self, nom, valeur)
+        self._evaluer = None
+
+    def __len__(self) -> int:
+        return len(self.mots_cles)
+
+    def __bool__(self) -> bool:
+        return bool(self.mots_cles)
+
+    def evaluer(self, presents: int) -> bool:
+        """
+        Vrai si une expression est satisfaite par les termes présents
+
+        Seules les expressions dont un terme est présent sont évaluées (plus
+        celles qui peuvent être vraies sans aucun terme, comme `NOT a`).
+
+        Args:
+            presents: Masque de bits des termes présents (bit n : self.termes[n])
+        """
+        if self._evaluer is None:
+            self._evaluer = self._preparer_evaluation()
+        evaluateurs, toujours, par_terme = self._evaluer
+        for numero in toujours:
+            if evaluateurs[numero](presents):
+                return True
+        restants = presents
+        while restants:
+            bit = restants & -restants
+            for numero in par_terme[bit.bit_length() - 1]:
+                if evaluateurs[numero](presents):
+                    return True
+            restants ^= bit
+        return False
+
+    def expressions_vraies(self, presents: int) -> List[str]:
+        """Expressions (dans l'ordre de self.expressions) satisfaites par les termes présents"""
+        if self._evaluer is None:
+            self._evaluer = self._preparer_evaluation()
+        evaluateurs, toujours, par_terme = self._evaluer
+        candidates = set(toujours)
+        restants = presents
+        while restants:
+            bit = restants & -restants
+            candidates.update(par_terme[bit.bit_length() - 1])
+            restants ^= bit
+        return [self.expressions[numero] for numero in sorted(candidates) if evaluateurs[numero](presents)]
+
+    def _preparer_evaluation(self) -> Tuple[List[Callable[[int], bool]], List[int], List[List[int]]]:
+        """Évaluateurs des expressions, indexés par terme (construits à la demande, non sérialisés)"""
+        bits = {terme: 1 << numero for numero, terme in enumerate(self.termes)}
+        evaluateurs = [evaluateur(plan, bits.__getitem__) for plan in self.plans]
+        toujours = []
+        par_terme: List[List[int]] = [[] for _ in self.termes]
+        for numero, plan in enumerate(self.plans):
+            if evaluateurs[numero](0):
+                toujours.append(numero)
+            else:
+                # Fausse sans aucun terme : il suffit de l'évaluer quand l'un de ses termes est présent
+                for terme in dict.fromkeys(termes_plan(plan)):
+                    par_terme[bits[terme].bit_length() - 1].append(numero)
+        return evaluateurs, toujours, par_terme
+
+    def contient(self, texte: str) -> bool:
+        """
+        Vérifie si le texte contient au moins un des mots-clés (ou satisfait une expression)
+
+        Args:
+            texte: Texte déjà normalisé
+
+        Returns:
+            True dès qu'un mot-clé est trouvé, False sinon
+        """
+        finaux = self._finaux
+        if finaux[0]:
+            # Mot-clé vide : toujours présent, comme `'' in texte`
+            return True
+
+        transitions = self._transitions
+        echecs = self._echecs
+        etat = 0
+        if not self.plans:
+            for car in texte:
+                suivant = transitions[etat].get(car)
+                while suivant is None and etat:
+                    etat = echecs[etat]
+                    suivant = transitions[etat].get(car)
+                etat = suivant or 0
+                if finaux[etat]:
+                    return True
+            return False
+
+        # Avec des expressions : le texte entier est parcouru pour connaître tous les termes présents
+        sorties = self._sorties
+        presents = 0
+        for car in texte:
+            suivant = transitions[etat].get(car)
+            while suivant is None and etat:
+                etat = echecs[etat]
+                suivant = transitions[etat].get(car)
+            etat = suivant or 0
+            if finaux[etat]:
+                return True
+            presents |= sorties[etat]
+        return self.evaluer(presents)
+
+    def masque(self, textes: Iterable[str]) -> List[bool]:
+        """
+        Applique la recherche à une série de textes en un seul appel
+
+        Args:
+            textes: Textes déjà normalisés
+
+        Returns:
+            Liste de booléens, True pour chaque texte contenant un mot-clé
+        """
+        contient = self.contient
+        return [contient(texte) for texte in textes]
+
+    def correspondances(self, texte: str) -> List[str]:
+        """
+        Tous les mots-clés et expressions vrais pour le texte (pas d'arrêt au premier trouvé)
+
+        Un seul passage sur le texte, comme contient ; la liste est vide
+        exactement quand contient renvoie False.
+
+        Args:
+            texte: Texte déjà normalisé
+
+        Returns:
+            Mots-clés trouvés (ordre alphabétique) puis expressions vraies
+        """
+        transitions = self._transitions
+        echecs = self._echecs
+        mots = self._mots
+        sorties = self._sorties
+        trouves = set(mots.get(0, ()))
+        presents = 0
+        etat = 0
+        for car in texte:
+            suivant = transitions[etat].get(car)
+            while suivant is None and etat:
+                etat = echecs[etat]
+                suivant = transitions[etat].get(car)
+            etat = suivant or 0
+            if etat in mots:
+                trouves.update(mots[etat])
+            presents |= sorties[etat]
+        resultat = sorted(trouves)
+        if self.plans:
+            resultat.extend(self.expressions_vraies(presents))
+        return resultat
+
+    def bits_groupes(self, groupes: Sequence[Iterable[str]]) -> Tuple[Dict[int, int], Dict[str, int]]:
+        """
+        Prépare groupes_trouves pour des groupes de mots-clés de cet automate
+
+        Args:
+            groupes: Mots-clés (et expressions) de chaque groupe ; un mot-clé
+                peut appartenir à plusieurs groupes
+
+        Returns:
+            Tuple (bits des groupes reconnus par chaque état final, bits des
+            groupes de chaque expression), le bit n désignant groupes[n]
+        """
+        bits_mots: Dict[str, int] = {}
+        for numero, groupe in enumerate(groupes):
+            for mot in groupe:
+                bits_mots[mot] = bits_mots.get(mot, 0) | 1 << numero
+        bits_etats = {}
+        for etat, mots_etat in self._mots.items():
+            bits = 0
+            for mot in mots_etat:
+                bits |= bits_mots.get(mot, 0)
+            if bits:
+                bits_etats[etat] = bits
+        bits_expressions = {expression: bits_mots[expression] for expression in self.expressions
+                            if bits_mots.get(expression)}
+        return bits_etats, bits_expressions
+
+    def groupes_trouves(self, texte: str, bits_etats: Dict[int, int], bits_expressions: Dict[str, int],
+                        complet: int) -> int:
+        """
+        Groupes dont un mot-clé (ou une expression) est trouvé, en un seul passage
+
+        Le parcours s'arrête dès que tous les groupes sont trouvés.
+
+        Args:
+            texte: Texte déjà normalisé
+            bits_etats, bits_expressions: Préparés par bits_groupes
+            complet: Masque de tous les groupes
+
+        Returns:
+            Masque de bits des groupes trouvés (bit n : groupes[n] de bits_groupes)
+        """
+        transitions = self._transitions
+        echecs = self._echecs
+        sorties = self._sorties
+        # Mot-clé vide : toujours présent
+        trouves = bits_etats.get(0, 0)
+        presents = 0
+        etat = 0
+        for car in texte:
+            if trouves == complet:
+                return trouves
+            suivant = transitions[etat].get(car)
+            while suivant is None and etat:
+                etat = echecs[etat]
+                suivant = transitions[etat].get(car)
+            etat = suivant or 0
+            trouves |= bits_etats.get(etat, 0)
+            presents |= sorties[etat]
+        if bits_expressions and trouves != complet:
+            for expression in self.expressions_vraies(presents):
+                trouves |= bits_expressions.get(expression, 0)
+        return trouves
+
+    def expression(self) -> 're.Pattern':
+        """Expression régulière équivalente aux mots-clés simples (alternative), compilée à la demande"""
+        if self._expression is None:
+            # Les mots-clés les plus longs d'abord, pour une alternative déterministe
+            motifs = sorted(self.simples, key=len, reverse=True)
+            self._expression = re.compile('|'.join(re.escape(mot) for mot in motifs))
+        return self._expression
+
+
+# Nombre de mots-clés les plus trouvés repris dans les statistiques
+NB_MOTS_CLES_FREQUENTS = 10
+
+
+def statistiques_mots_cles(occurrences: Dict[str, int], automate: AutomateMotsCles,
+                           nombre: int = NB_MOTS_CLES_FREQUENTS) -> Dict[str, object]:
+    """
+    Statistiques par mot-clé ajoutées aux statistiques du filtrage
+
+    Args:
+        occurrences: Nombre de vidéos trouvées par mot-clé (ou expression)
+        automate: Mots-clés compilés
+        nombre: Nombre de mots-clés les plus fréquents conservés
+
+    Returns:
+        'mots_cles_frequents' : liste de [mot-clé, vidéos], du plus trouvé au
+        moins trouvé (puis par ordre alphabétique) ; 'mots_cles_sans_correspondance' :
+        nombre de mots-clés qui n'ont trouvé aucune vidéo
+    """
+    frequents = sorted(((mot, nb) for mot, nb in occurrences.items() if nb), key=lambda paire: (-paire[1], paire[0]))
+    return {
+        'mots_cles_frequents': [[mot, nb] for mot, nb in frequents[:nombre]],
+        'mots_cles_sans_correspondance': len(automate) - len(frequents),
+    }
+
+
+def compiler_mots_cles(mots_cles: Iterable[str]) -> AutomateMotsCles:
+    """
+    Compile les mots-clés en un automate réutilisable pour toutes les lignes
+
+    Args:
+        mots_cles: Mots-clés normalisés (tel que renvoyé par charger_mots_cles)
+
+    Returns:
+        Automate prêt pour la recherche
+    """
+    if isinstance(mots_cles, AutomateMotsCles):
+        return mots_cles
+    return AutomateMotsCles(mots_cles)
+
+
+# Préfixes des colonnes de résultat de chaque règle de ReglesChamps ('match_title', 'blocked_channelUrl'...)
+PREFIXE_INCLUSION = 'match_'
+PREFIXE_EXCLUSION = 'blocked_'
+
+
+class ReglesChamps:
+    """
+    Mots-clés recherchés champ par champ, sans concaténer les champs
+
+    Chaque règle associe un champ (colonne de Data.csv) à des mots-clés
+    compilés, recherchés dans ce seul champ : un mot-clé ne peut plus être
+    trouvé à cheval sur deux champs. Une règle d'exclusion (liste de blocage)
+    rejette la vidéo dès qu'elle trouve un mot-clé. Une vidéo est gardée si
+    une règle d'inclusion trouve un mot-clé (ou s'il n'y en a aucune) et
+    qu'aucune règle d'exclusion n'en trouve.
+
+    Les règles d'un même champ (inclusion et exclusion) sont fusionnées en un
+    seul automate dont les sorties portent le bit de chaque règle : pour
+    chaque ligne, chaque champ est parcouru une seule fois. Le résultat de
+    chaque règle est conservé (colonnes self.colonnes).
+
+    Usage :
+        regles = ReglesChamps([('title', automate_titres, False), ('channelUrl', automate_bloques, True)])
+        garder, resultats = regles.decider(('python pour debutants', 'https://...'))
+    """
+
+    __slots__ = ('regles', 'champs', 'colonnes', '_recherches', '_inclusions', '_exclusions')
+
+    def __init__(self, regles: Iterable[Tuple[str, Iterable[str], bool]]):
+        """
+        Args:
+            regles: Triplets (champ, mots-clés ou automate, exclusion)
+
+        Raises:
+            ValueError: Sans règle, ou si un champ a deux règles du même type
+        """
+        self.regles = tuple((champ, compiler_mots_cles(mots_cles), bool(exclure))
+                            for champ, mots_cles, exclure in regles)
+        if not self.regles:
+            raise ValueError("Aucune règle de champ")
+        self.champs = tuple(dict.fromkeys(champ for champ, _, _ in self.regles))
+        self.colonnes = tuple((PREFIXE_EXCLUSION if exclure else PREFIXE_INCLUSION) + champ
+                              for champ, _, exclure in self.regles)
+        doubles = sorted({colonne for colonne in self.colonnes if self.colonnes.count(colonne) > 1})
+        if doubles:
+            raise ValueError(f"Règles en double: {doubles}")
+        # Recherche de chaque champ : (numéros de ses règles, automate, bits des états et des
+        # expressions, masque complet) ; automate de la règle tel quel si le champ n'en a qu'une
+        recherches = []
+        for champ in self.champs:
+            numeros = tuple(numero for numero, (nom, _, _) in enumerate(self.regles) if nom == champ)
+            automates = [self.regles[numero][1] for numero in numeros]
+            if len(numeros) == 1:
+                recherches.append((numeros, automates[0], None, None, 1))
+                continue
+            automate = AutomateMotsCles(frozenset().union(*(regle.mots_cles for regle in automates)))
+            bits_etats, bits_expressions = automate.bits_groupes([regle.mots_cles for regle in automates])
+            recherches.append((numeros, automate, bits_etats, bits_expressions, (1 << len(numeros)) - 1))
+        self._recherches = tuple(recherches)
+        self._inclusions = tuple(numero for numero, (_, _, exclure) in enumerate(self.regles) if not exclure)
+        self._exclusions = tuple(numero for numero, (_, _, exclure) in enumerate(self.regles) if exclure)
+
+    def __len__(self) -> int:
+        """Nombre de mots-clés distincts, toutes règles confondues"""
+        return len(frozenset().union(*(automate.mots_cles for _, automate, _ in self.regles)))
+
+    def __bool__(self) -> bool:
+        """Vrai si chaque règle a au moins un mot-clé"""
+        return all(automate for _, automate, _ in self.regles)
+
+    def garder(self, resultats: Sequence[bool]) -> bool:
+        """Décision à partir du résultat de chaque règle"""
+        if any(resultats[numero] for numero in self._exclusions):
+            return False
+        return not self._inclusions or any(resultats[numero] for numero in self._inclusions)
+
+    def decider(self, textes: Sequence[str]) -> Tuple[bool, Tuple[bool, ...]]:
+        """
+        Décision pour une ligne et résultat de chaque règle
+
+        Args:
+            textes: Textes normalisés des champs, dans l'ordre de self.champs
+
+        Returns:
+            Tuple (True si la vidéo est gardée, résultat de chaque règle)
+        """
+        resultats = [False] * len(self.regles)
+        for texte, (numeros, automate, bits_etats, bits_expressions, complet) in zip(textes, self._recherches):
+            if bits_etats is None:
+                resultats[numeros[0]] = automate.contient(texte)
+                continue
+            trouves = automate.groupes_trouves(texte, bits_etats, bits_expressions, complet)
+            for bit, numero in enumerate(numeros):
+                resultats[numero] = trouves >> bit & 1 == 1
+        resultats = tuple(resultats)
+        return self.garder(resultats), resultats
+
+
+def empreinte_mots_cles(automate: AutomateMotsCles) -> str:
+    """Empreinte SHA-256 de l'ensemble des mots-clés (indépendante de leur ordre dans le fichier)"""
+    contenu = f"v{VERSION_NORMALISATION}\n" + '\n'.join(sorted(automate.mots_cles))
+    return hashlib.sha256(contenu.encode('utf-8')).hexdigest()
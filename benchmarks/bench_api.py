@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Latence de l'API serverless (api/index.py) mesurée en local
+Appelle directement `handler` avec une requête simulée, sans serveur :
+    - démarrage à froid : un processus neuf importe api/index.py et traite une
+      première requête (durée de l'import, du premier appel et du processus)
+    - à chaud : appels répétés dans le même processus (moyenne, médiane, p95)
+Les résultats sont ajoutés en JSON Lines, une mesure par ligne.
+
+Exemple :
+    python benchmarks/bench_api.py --lignes 100 10000 --mots-cles 10 1000
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from generer_donnees import generer_data, generer_keywords  # noqa: E402
+
+# Script exécuté dans un processus neuf pour mesurer un démarrage à froid
+SCRIPT_FROID = """
+import importlib.util, json, sys, time
+debut = time.perf_counter()
+spec = importlib.util.spec_from_file_location('index', {chemin!r})
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+import_s = time.perf_counter() - debut
+requete = json.loads(sys.stdin.read())
+class Requete:
+    method, path, headers, body = requete['method'], requete['path'], requete['headers'], requete['body']
+debut = time.perf_counter()
+reponse = module.handler(Requete())
+appel_s = time.perf_counter() - debut
+print(json.dumps({{'import_s': import_s, 'premier_appel_s': appel_s, 'statut': reponse['statusCode'],
+                  'pandas_importe': 'pandas' in sys.modules}}))
+"""
+
+
+class RequeteLocale:
+    """Requête minimale telle que reçue par handler"""
+
+    def __init__(self, method: str, path: str, headers: Dict[str, str], body: str):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+
+
+def preparer_requete(dossier: str, nb_lignes: int, nb_mots_cles: int, graine: int) -> Dict:
+    """Requête /api/filter (JSON avec data_csv et keywords_csv) sur des fichiers générés"""
+    os.makedirs(dossier, exist_ok=True)
+    data = os.path.join(dossier, f"Data_{nb_lignes}_{graine}.csv")
+    keywords = os.path.join(dossier, f"keywords_{nb_mots_cles}_{graine}.csv")
+    if not os.path.exists(data):
+        generer_data(data, nb_lignes, graine)
+    if not os.path.exists(keywords):
+        generer_keywords(keywords, nb_mots_cles, graine)
+
+    with open(data, 'r', encoding='utf-8') as fichier:
+        data_csv = fichier.read()
+    with open(keywords, 'r', encoding='utf-8') as fichier:
+        keywords_csv = fichier.read()
+    return {
+        'method': 'POST',
+        'path': '/api/filter',
+        'headers': {'Content-Type': 'application/json'},
+        'body': json.dumps({'data_csv': data_csv, 'keywords_csv': keywords_csv}),
+    }
+
+
+def mesurer_froid(requete: Dict) -> Dict:
+    """Import de api/index.py et premier appel dans un processus Python neuf"""
+    script = SCRIPT_FROID.format(chemin=os.path.join(RACINE, 'api', 'index.py'))
+    debut = time.perf_counter()
+    sortie = subprocess.run([sys.executable, '-c', script], input=json.dumps(requete),
+                            capture_output=True, text=True, check=True).stdout
+    mesure = json.loads(sortie)
+    mesure['processus_s'] = time.perf_counter() - debut
+    return {nom: round(valeur, 6) if isinstance(valeur, float) else valeur for nom, valeur in mesure.items()}
+
+
+def mesurer_chaud(requete: Dict, repetitions: int) -> Dict:
+    """Appels répétés de handler dans le processus courant (instance chaude)"""
+    import importlib.util
+    spec = importlib.util.spec_from_file_location('index', os.path.join(RACINE, 'api', 'index.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    module.handler(RequeteLocale(**requete))
+    durees: List[float] = []
+    for _ in range(repetitions):
+        debut = time.perf_counter()
+        reponse = module.handler(RequeteLocale(**requete))
+        durees.append(time.perf_counter() - debut)
+
+    durees.sort()
+    return {
+        'statut': reponse['statusCode'],
+        'moyenne_s': round(statistics.fmean(durees), 6),
+        'mediane_s': round(statistics.median(durees), 6),
+        'p95_s': round(durees[min(len(durees) - 1, int(len(durees) * 0.95))], 6),
+    }
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Latence de l'API serverless (démarrage à froid et à chaud)")
+    parser.add_argument('--lignes', type=int, nargs='+', default=[100, 10_000], help="Lignes par requête")
+    parser.add_argument('--mots-cles', type=int, nargs='+', default=[10, 1_000], help="Mots-clés par requête")
+    parser.add_argument('--froid', type=int, default=3, help="Nombre de démarrages à froid mesurés")
+    parser.add_argument('--repetitions', type=int, default=20, help="Nombre d'appels à chaud mesurés")
+    parser.add_argument('--dossier', default=os.path.join(tempfile.gettempdir(), 'filtre_videos_bench'),
+                        help="Dossier des fichiers générés (réutilisés d'une exécution à l'autre)")
+    parser.add_argument('--sortie', default='resultats_bench_api.jsonl', help="Fichier de résultats JSON Lines")
+    parser.add_argument('--graine', type=int, default=0, help="Graine des fichiers générés")
+    options = parser.parse_args()
+
+    print("=" * 60)
+    print("LATENCE DE L'API /api/filter")
+    print("=" * 60)
+    with open(options.sortie, 'a', encoding='utf-8') as fichier_resultats:
+        for nb_lignes in options.lignes:
+            for nb_mots_cles in options.mots_cles:
+                requete = preparer_requete(options.dossier, nb_lignes, nb_mots_cles, options.graine)
+                froids = [mesurer_froid(requete) for _ in range(options.froid)]
+                chaud = mesurer_chaud(requete, options.repetitions)
+                resultat = {
+                    'lignes': nb_lignes,
+                    'mots_cles': nb_mots_cles,
+                    'horodatage': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'froid': froids,
+                    'chaud': chaud,
+                }
+                fichier_resultats.write(json.dumps(resultat, ensure_ascii=False) + '\n')
+                print(f"  {nb_lignes:>8} lignes {nb_mots_cles:>6} mots-cles  "
+                      f"froid: import {statistics.median(m['import_s'] for m in froids) * 1000:>7.1f} ms, "
+                      f"1er appel {statistics.median(m['premier_appel_s'] for m in froids) * 1000:>8.1f} ms  "
+                      f"chaud: {chaud['mediane_s'] * 1000:>8.1f} ms (p95 {chaud['p95_s'] * 1000:.1f} ms)")
+
+    print(f"\n[OK] Resultats ajoutes a {options.sortie}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du filtrage par mots-clés
+Mesure, pour chaque taille de fichier, taille de liste de mots-clés et moteur,
+la durée de chaque étape de filtrer_videos (chargement des mots-clés, lecture
+du CSV par formats_donnees.lire_donnees, recherche, écriture du CSV), le débit en lignes/s et la mémoire
+maximale. Les résultats sont écrits en JSON Lines, une mesure par ligne.
+
+Exemple :
+    python benchmarks/bench_filtrage.py --lignes 10000 1000000 --mots-cles 10 100000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RACINE)
+
+from benchmarks.generer_donnees import generer_data, generer_keywords  # noqa: E402
+
+# Nombre maximal de comparaisons (lignes × mots-clés) tenté avec le moteur 'boucle'
+COUT_MAX_BOUCLE = 2_000_000_000
+
+BACKENDS_DEFAUT = ['boucle', 'vectorise', 'automate', 'parallele']
+
+
+def _rss_max_mo(qui: int) -> float:
+    """Mémoire résidente maximale en Mo (ru_maxrss est en Ko sous Linux, en octets sous macOS)"""
+    rss = resource.getrusage(qui).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def preparer_fichiers(dossier: str, nb_lignes: int, nb_mots_cles: int, graine: int) -> Dict[str, str]:
+    """Génère (ou réutilise) les fichiers d'entrée d'un cas de benchmark"""
+    os.makedirs(dossier, exist_ok=True)
+    data = os.path.join(dossier, f"Data_{nb_lignes}_{graine}.csv")
+    keywords = os.path.join(dossier, f"keywords_{nb_mots_cles}_{graine}.csv")
+    if not os.path.exists(data):
+        print(f"  Generation de {data}...")
+        generer_data(data, nb_lignes, graine)
+    if not os.path.exists(keywords):
+        generer_keywords(keywords, nb_mots_cles, graine)
+    return {'data': data, 'keywords': keywords}
+
+
+def mesurer_cas(fichier_data: str, fichier_keywords: str, backend: str, nb_workers: int,
+                seuil_parallele: Optional[int] = None) -> Dict:
+    """
+    Exécute un filtrage complet en chronométrant chaque étape
+
+    Appelée dans un processus neuf (voir executer_cas) pour que la mémoire
+    maximale mesurée ne concerne que ce cas.
+
+    Args:
+        seuil_parallele: Remplace moteur_filtrage.SEUIL_PARALLELE dans ce processus
+    """
+    debut_import = time.perf_counter()
+    import pandas as pd
+    import moteur_filtrage as moteur
+    from formats_donnees import lire_donnees
+    etapes = {'import': time.perf_counter() - debut_import}
+    if seuil_parallele is not None:
+        moteur.SEUIL_PARALLELE = seuil_parallele
+
+    debut = time.perf_counter()
+    automate = moteur.compiler_mots_cles(moteur.charger_mots_cles(fichier_keywords))
+    etapes['chargement_mots_cles'] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    df_data = lire_donnees(fichier_data)
+    etapes['lecture_csv'] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    masque = moteur.calculer_masque_backend(df_data, automate, backend, nb_workers)
+    etapes['recherche'] = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    df_resultat = moteur.appliquer_decision(df_data.copy(), masque)
+    with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as sortie:
+        chemin_sortie = sortie.name
+    try:
+        df_resultat.to_csv(chemin_sortie, index=False, encoding='utf-8')
+        etapes['ecriture_csv'] = time.perf_counter() - debut
+    finally:
+        os.remove(chemin_sortie)
+
+    total = sum(duree for nom, duree in etapes.items() if nom != 'import')
+    return {
+        'etapes_s': {nom: round(duree, 6) for nom, duree in etapes.items()},
+        'total_s': round(total, 6),
+        'lignes_par_s': round(len(df_data) / total, 1) if total else None,
+        'recherche_lignes_par_s': round(len(df_data) / etapes['recherche'], 1) if etapes['recherche'] else None,
+        'gardees': int(masque.sum()),
+        'rss_max_mo': round(_rss_max_mo(resource.RUSAGE_SELF), 1),
+        'rss_max_workers_mo': round(_rss_max_mo(resource.RUSAGE_CHILDREN), 1),
+        'pandas': pd.__version__,
+    }
+
+
+def _executer_cas(connexion, *arguments):
+    """Corps du processus d'un cas : renvoie ('mesure', résultats) ou ('erreur', message)"""
+    try:
+        connexion.send(('mesure', mesurer_cas(*arguments)))
+    except Exception as erreur:
+        connexion.send(('erreur', f"{type(erreur).__name__}: {erreur}"))
+    finally:
+        connexion.close()
+
+
+def executer_cas(contexte, *arguments) -> Dict:
+    """
+    Mesure un cas (arguments de mesurer_cas) dans un processus neuf
+
+    Le processus n'est pas un démon, contrairement aux workers d'un
+    multiprocessing.Pool : le moteur 'parallele' peut y créer son propre pool.
+
+    Returns:
+        Mesures du cas, ou {'erreur': message} si le cas a échoué
+    """
+    reception, envoi = contexte.Pipe(duplex=False)
+    processus = contexte.Process(target=_executer_cas, args=(envoi, *arguments))
+    processus.start()
+    envoi.close()
+    try:
+        nature, contenu = reception.recv()
+    except EOFError:
+        # Processus arrêté sans réponse (mémoire épuisée, signal...)
+        nature, contenu = 'erreur', None
+    finally:
+        reception.close()
+        processus.join()
+    if nature == 'erreur':
+        return {'erreur': contenu or f"processus terminé avec le code {processus.exitcode}"}
+    return contenu
+
+
+def _version_depot() -> str:
+    """Révision git courante, pour suivre le débit d'une version à l'autre"""
+    try:
+        return subprocess.check_output(
+            ['git', 'describe', '--always', '--dirty'], cwd=RACINE, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return 'inconnue'
+
+
+def lancer(lignes: List[int], mots_cles: List[int], backends: List[str], nb_workers: int,
+           dossier: str, sortie: str, graine: int = 0, repetitions: int = 1,
+           seuil_parallele: Optional[int] = None) -> int:
+    """
+    Exécute toute la matrice de cas et ajoute les résultats au fichier JSON Lines
+
+    Un cas en échec est enregistré avec son message d'erreur ('erreur') sans
+    interrompre les suivants.
+
+    Returns:
+        Nombre de mesures en échec
+    """
+    contexte = multiprocessing.get_context('spawn')
+    commun = {
+        'revision': _version_depot(),
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'horodatage': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    if seuil_parallele is not None:
+        commun['seuil_parallele'] = seuil_parallele
+    echecs = 0
+
+    with open(sortie, 'a', encoding='utf-8') as fichier_resultats:
+        for nb_lignes in lignes:
+            for nb_mots_cles in mots_cles:
+                fichiers = preparer_fichiers(dossier, nb_lignes, nb_mots_cles, graine)
+                for backend in backends:
+                    cas = dict(commun, lignes=nb_lignes, mots_cles=nb_mots_cles, backend=backend,
+                               workers=nb_workers if backend == 'parallele' else 1)
+
+                    if backend == 'boucle' and nb_lignes * nb_mots_cles > COUT_MAX_BOUCLE:
+                        resultats = [dict(cas, ignore="trop lent pour le moteur 'boucle'")]
+                    else:
+                        resultats = []
+                        for repetition in range(repetitions):
+                            # Un processus neuf par mesure : mémoire maximale et caches indépendants
+                            mesure = executer_cas(contexte, fichiers['data'], fichiers['keywords'],
+                                                  backend, cas['workers'], seuil_parallele)
+                            resultats.append(dict(cas, repetition=repetition, **mesure))
+
+                    for resultat in resultats:
+                        fichier_resultats.write(json.dumps(resultat, ensure_ascii=False) + '\n')
+                        fichier_resultats.flush()
+                        if 'ignore' in resultat:
+                            print(f"  {nb_lignes:>10} lignes {nb_mots_cles:>7} mots-cles {backend:<10} ignore")
+                        elif 'erreur' in resultat:
+                            echecs += 1
+                            print(f"  {nb_lignes:>10} lignes {nb_mots_cles:>7} mots-cles {backend:<10} "
+                                  f"[ERREUR] {resultat['erreur']}")
+                        else:
+                            print(f"  {nb_lignes:>10} lignes {nb_mots_cles:>7} mots-cles {backend:<10} "
+                                  f"{resultat['total_s']:>9.3f}s {resultat['lignes_par_s']:>12.0f} lignes/s "
+                                  f"{resultat['rss_max_mo']:>8.1f} Mo")
+    return echecs
+
+
+def main():
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Benchmark du filtrage de vidéos par mots-clés")
+    parser.add_argument('--lignes', type=int, nargs='+', default=[10_000, 100_000],
+                        help="Tailles de Data.csv à tester (ex: 10000 1000000 10000000)")
+    parser.add_argument('--mots-cles', type=int, nargs='+', default=[10, 1_000, 100_000],
+                        help="Tailles de keywords.csv à tester (ex: 10 1000 100000)")
+    parser.add_argument('--backends', nargs='+', default=BACKENDS_DEFAUT, choices=BACKENDS_DEFAUT,
+                        help="Moteurs à comparer")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Processus pour le moteur 'parallele' (0: tous les cœurs)")
+    parser.add_argument('--repetitions', type=int, default=1, help="Nombre de mesures par cas")
+    parser.add_argument('--dossier', default=os.path.join(tempfile.gettempdir(), 'filtre_videos_bench'),
+                        help="Dossier des fichiers générés (réutilisés d'une exécution à l'autre)")
+    parser.add_argument('--sortie', default='resultats_bench.jsonl', help="Fichier de résultats JSON Lines")
+    parser.add_argument('--graine', type=int, default=0, help="Graine des fichiers générés")
+    parser.add_argument('--seuil-parallele', type=int, default=None,
+                        help="Nombre de lignes à partir duquel le moteur 'parallele' démarre son pool "
+                             "(défaut : celui de moteur_filtrage)")
+    options = parser.parse_args()
+
+    print("=" * 60)
+    print("BENCHMARK DU FILTRAGE")
+    print("=" * 60)
+    echecs = lancer(options.lignes, options.mots_cles, options.backends, options.workers,
+                    options.dossier, options.sortie, options.graine, options.repetitions,
+                    options.seuil_parallele)
+    print(f"\n[OK] Resultats ajoutes a {options.sortie}")
+    if echecs:
+        print(f"[ERREUR] {echecs} mesure(s) en echec (champ 'erreur' des resultats)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Générateurs de fichiers Data.csv et keywords.csv synthétiques pour les benchmarks
+Produit des titres et des noms de chaînes en français (avec accents) au format
+attendu par filtre_videos.py
+"""
+
+import argparse
+import csv
+import os
+import random
+from datetime import date, timedelta
+
+# Colonnes de Data.csv, dans l'ordre du fichier d'exemple
+COLONNES = ['title', 'id', 'url', 'viewcount', 'date', 'channelName', 'channelUrl', 'numberOfSubscribers', 'duration']
+
+# Vocabulaire des titres : sujets techniques (souvent dans keywords.csv) et généraux
+MOTS_TECHNIQUES = [
+    'python', 'javascript', 'react', 'node.js', 'css', 'html', 'développement', 'programmation',
+    'tutoriel', 'apprendre', 'débutant', 'avancé', 'backend', 'frontend', 'code', 'web', 'données',
+    'algorithme', 'déploiement', 'sécurité', 'réseau', 'base de données', 'intelligence artificielle',
+]
+MOTS_GENERAUX = [
+    'recette', 'cuisine', 'gâteau', 'crêpes', 'voyage', 'été', 'hiver', 'forêt', 'randonnée',
+    'musique', 'concert', 'théâtre', 'cinéma', 'critique', 'réaction', 'défi', 'vlog', 'journée',
+    'entraînement', 'football', 'pâtisserie', 'jardinage', 'décoration', 'économie', 'histoire',
+    'sciences', 'astronomie', 'énergie', 'écologie', 'maquillage', 'mode', 'jeu vidéo', 'stratégie',
+]
+GABARITS_TITRES = [
+    "Comment {a} en {annee}",
+    "{A} pour les débutants : {b}",
+    "Les 10 meilleures astuces {a} et {b}",
+    "{A} — tout ce qu'il faut savoir sur {b}",
+    "J'ai testé {a} pendant une semaine",
+    "{A} vs {b} : lequel choisir ?",
+    "Découverte : {a}, {b} et {c}",
+    "Pourquoi {a} change tout (épisode {n})",
+]
+PREFIXES_CHAINES = ['Les', 'Chez', 'Atelier', 'Studio', 'École', 'Café', 'Planète', 'Coin']
+SUFFIXES_CHAINES = ['Facile', 'Pro', 'Académie', 'TV', 'Québec', 'Lab', 'Déclic', 'Passion']
+
+# Alphabet des mots-clés synthétiques (accents compris) au-delà du vocabulaire réel
+LETTRES = 'abcdefghijklmnopqrstuvwxyzéèêàçôùî'
+
+
+def _titre(aleatoire: random.Random, proportion_technique: float) -> str:
+    """Titre de vidéo plausible, technique avec la probabilité donnée"""
+    vocabulaire = MOTS_TECHNIQUES if aleatoire.random() < proportion_technique else MOTS_GENERAUX
+    a, b, c = aleatoire.sample(vocabulaire, 3)
+    titre = aleatoire.choice(GABARITS_TITRES).format(
+        a=a, A=a.capitalize(), b=b, c=c, annee=aleatoire.randint(2015, 2025), n=aleatoire.randint(1, 300)
+    )
+    # Quelques titres en majuscules, comme sur les vraies plateformes
+    return titre.upper() if aleatoire.random() < 0.05 else titre
+
+
+def generer_data(chemin: str, nb_lignes: int, graine: int = 0, proportion_technique: float = 0.3,
+                 nb_chaines: int = 5000):
+    """
+    Écrit un Data.csv synthétique de nb_lignes vidéos
+
+    Le fichier est écrit ligne par ligne : la mémoire utilisée ne dépend pas
+    du nombre de lignes.
+
+    Args:
+        chemin: Fichier à créer
+        nb_lignes: Nombre de vidéos
+        graine: Graine du générateur aléatoire (fichiers reproductibles)
+        proportion_technique: Part approximative des titres sur des sujets techniques
+        nb_chaines: Nombre de chaînes distinctes
+    """
+    aleatoire = random.Random(graine)
+    chaines = []
+    for numero in range(nb_chaines):
+        nom = f"{aleatoire.choice(PREFIXES_CHAINES)}{aleatoire.choice(MOTS_GENERAUX + MOTS_TECHNIQUES).title().replace(' ', '')}{aleatoire.choice(SUFFIXES_CHAINES)}"
+        chaines.append((nom, f"https://youtube.com/@{nom.lower()}{numero}", aleatoire.randint(100, 5_000_000)))
+
+    debut = date(2015, 1, 1)
+    with open(chemin, 'w', encoding='utf-8', newline='') as fichier:
+        ecrivain = csv.writer(fichier)
+        ecrivain.writerow(COLONNES)
+        for numero in range(nb_lignes):
+            nom, url_chaine, abonnes = aleatoire.choice(chaines)
+            ecrivain.writerow([
+                _titre(aleatoire, proportion_technique),
+                f"vid{numero:09d}",
+                f"https://youtube.com/watch?v={numero:09d}",
+                int(aleatoire.paretovariate(1.2) * 100),
+                (debut + timedelta(days=aleatoire.randint(0, 3650))).isoformat(),
+                nom,
+                url_chaine,
+                abonnes,
+                aleatoire.randint(15, 7200),
+            ])
+
+
+def generer_keywords(chemin: str, nb_mots_cles: int, graine: int = 0):
+    """
+    Écrit un keywords.csv de nb_mots_cles mots-clés distincts
+
+    Les premiers mots-clés sont tirés du vocabulaire technique des titres (ils
+    provoquent donc de vraies correspondances) ; le reste est synthétique.
+    """
+    aleatoire = random.Random(graine + 1)
+    mots_cles = list(dict.fromkeys(MOTS_TECHNIQUES))[:nb_mots_cles]
+    vus = set(mots_cles)
+    while len(mots_cles) < nb_mots_cles:
+        mot = ''.join(aleatoire.choice(LETTRES) for _ in range(aleatoire.randint(5, 12)))
+        if mot not in vus:
+            vus.add(mot)
+            mots_cles.append(mot)
+
+    with open(chemin, 'w', encoding='utf-8', newline='') as fichier:
+        ecrivain = csv.writer(fichier)
+        ecrivain.writerow(['keyword'])
+        for mot in mots_cles:
+            ecrivain.writerow([mot])
+
+
+def main():
+    """Génère une paire de fichiers depuis la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Génère des fichiers Data.csv et keywords.csv synthétiques")
+    parser.add_argument('--lignes', type=int, default=10_000, help="Nombre de vidéos (défaut: 10000)")
+    parser.add_argument('--mots-cles', type=int, default=100, help="Nombre de mots-clés (défaut: 100)")
+    parser.add_argument('--dossier', default='.', help="Dossier de destination (défaut: répertoire courant)")
+    parser.add_argument('--graine', type=int, default=0, help="Graine aléatoire (défaut: 0)")
+    options = parser.parse_args()
+
+    os.makedirs(options.dossier, exist_ok=True)
+    generer_data(os.path.join(options.dossier, 'Data.csv'), options.lignes, options.graine)
+    generer_keywords(os.path.join(options.dossier, 'keywords.csv'), options.mots_cles, options.graine)
+    print(f"[OK] {options.lignes} videos et {options.mots_cles} mots-cles generes dans {options.dossier}")
+
+
+if __name__ == '__main__':
+    main()
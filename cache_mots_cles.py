@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache disque des mots-clés compilés
+Évite de relire keywords.csv et de reconstruire l'automate à chaque exécution :
+l'automate est sérialisé sous une clé dérivée du contenu du fichier de mots-clés
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from typing import Callable, Iterable, Optional
+
+from automate_mots_cles import AutomateMotsCles, compiler_mots_cles
+
+# À incrémenter quand le format de l'automate ou le nettoyage des mots-clés change
+VERSION_CACHE = 6
+
+# Dossier du cache (FILTRE_CACHE_DIR vide : cache désactivé)
+DOSSIER_CACHE = os.environ.get(
+    'FILTRE_CACHE_DIR',
+    os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'filtre_videos')
+)
+
+# Éviction : nombre maximal d'entrées et âge maximal depuis la dernière utilisation
+MAX_ENTREES = 20
+AGE_MAX_SECONDES = 30 * 24 * 3600
+
+EXTENSION = '.automate'
+
+
+def cle_contenu(contenu: bytes) -> str:
+    """Clé de cache : empreinte SHA-256 du contenu du fichier de mots-clés"""
+    empreinte = hashlib.sha256()
+    empreinte.update(f"v{VERSION_CACHE}:".encode('ascii'))
+    empreinte.update(contenu)
+    return empreinte.hexdigest()
+
+
+def _chemin(cle: str, dossier: str) -> str:
+    return os.path.join(dossier, cle + EXTENSION)
+
+
+def lire_cache(cle: str, dossier: Optional[str] = None) -> Optional[AutomateMotsCles]:
+    """
+    Lit un automate depuis le cache
+
+    Args:
+        cle: Clé calculée par cle_contenu
+        dossier: Dossier du cache (DOSSIER_CACHE par défaut)
+
+    Returns:
+        L'automate, ou None s'il est absent ou illisible
+    """
+    dossier = DOSSIER_CACHE if dossier is None else dossier
+    if not dossier:
+        return None
+
+    chemin = _chemin(cle, dossier)
+    try:
+        with open(chemin, 'rb') as fichier:
+            automate = pickle.load(fichier)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Entrée corrompue ou d'un format incompatible : on la supprime
+        _supprimer(chemin)
+        return None
+
+    if not isinstance(automate, AutomateMotsCles):
+        _supprimer(chemin)
+        return None
+
+    # Marquer l'entrée comme récemment utilisée pour l'éviction
+    try:
+        os.utime(chemin)
+    except OSError:
+        pass
+    return automate
+
+
+def ecrire_cache(cle: str, automate: AutomateMotsCles, dossier: Optional[str] = None):
+    """
+    Écrit un automate dans le cache puis évince les entrées périmées
+
+    L'écriture passe par un fichier temporaire renommé, pour qu'un lecteur
+    concurrent ne voie jamais une entrée à moitié écrite.
+    """
+    dossier = DOSSIER_CACHE if dossier is None else dossier
+    if not dossier:
+        return
+
+    try:
+        os.makedirs(dossier, exist_ok=True)
+        descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix='.tmp')
+        with os.fdopen(descripteur, 'wb') as fichier:
+            pickle.dump(automate, fichier, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporaire, _chemin(cle, dossier))
+    except Exception as e:
+        print(f"[ATTENTION] Impossible d'ecrire le cache des mots-cles: {e}")
+        return
+
+    evincer(dossier)
+
+
+def evincer(dossier: Optional[str] = None, max_entrees: int = MAX_ENTREES,
+            age_max: float = AGE_MAX_SECONDES):
+    """Supprime les entrées trop anciennes, puis les moins récemment utilisées au-delà de max_entrees"""
+    dossier = DOSSIER_CACHE if dossier is None else dossier
+    if not dossier or not os.path.isdir(dossier):
+        return
+
+    entrees = []
+    for nom in os.listdir(dossier):
+        if not nom.endswith(EXTENSION):
+            continue
+        chemin = os.path.join(dossier, nom)
+        try:
+            entrees.append((os.path.getmtime(chemin), chemin))
+        except OSError:
+            continue
+
+    limite = time.time() - age_max
+    entrees.sort(reverse=True)
+    for rang, (date_utilisation, chemin) in enumerate(entrees):
+        if rang >= max_entrees or date_utilisation < limite:
+            _supprimer(chemin)
+
+
+def _supprimer(chemin: str):
+    try:
+        os.remove(chemin)
+    except OSError:
+        pass
+
+
+def automate_depuis_cache(contenu: bytes, construire: Callable[[], Iterable[str]],
+                          dossier: Optional[str] = None) -> AutomateMotsCles:
+    """
+    Renvoie l'automate correspondant au contenu du fichier de mots-clés
+
+    Args:
+        contenu: Contenu brut du fichier de mots-clés (sert de clé)
+        construire: Fonction qui analyse ce contenu et renvoie les mots-clés,
+            appelée uniquement en cas d'absence dans le cache
+        dossier: Dossier du cache (DOSSIER_CACHE par défaut)
+
+    Returns:
+        L'automate compilé (vide si aucun mot-clé valide ; il n'est alors pas mis en cache)
+    """
+    cle = cle_contenu(contenu)
+    automate = lire_cache(cle, dossier)
+    if automate is not None:
+        return automate
+
+    automate = compiler_mots_cles(construire())
+    if automate:
+        ecrire_cache(cle, automate, dossier)
+    return automate
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Cache disque des résultats de filtrage de l'interface web
+Un même Data.csv filtré avec les mêmes mots-clés donne toujours le même
+résultat : il est conservé sous une clé dérivée de l'empreinte du contenu de
+Data.csv et de celle des mots-clés, avec les statistiques affichées.
+"""
+
+import hashlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from cache_mots_cles import DOSSIER_CACHE as DOSSIER_CACHE_MOTS_CLES
+
+# À incrémenter quand le format du fichier résultat ou des statistiques change
+VERSION_CACHE = 1
+
+# Dossier du cache (FILTRE_CACHE_RESULTATS_DIR vide : cache désactivé)
+DOSSIER_CACHE = os.environ.get(
+    'FILTRE_CACHE_RESULTATS_DIR',
+    os.path.join(DOSSIER_CACHE_MOTS_CLES, 'resultats') if DOSSIER_CACHE_MOTS_CLES else ''
+)
+
+# Éviction : taille totale maximale et âge maximal depuis la dernière utilisation
+MAX_OCTETS = 1024 * 1024 * 1024
+AGE_MAX_SECONDES = 7 * 24 * 3600
+
+EXTENSION_RESULTAT = '.csv'
+EXTENSION_STATS = '.json'
+
+
+class LecteurEmpreinte(io.RawIOBase):
+    """
+    Flux binaire qui calcule l'empreinte SHA-256 de ce qui y est lu
+
+    Permet d'obtenir la clé de Data.csv pendant sa réception, sans relecture.
+    """
+
+    def __init__(self, source):
+        super().__init__()
+        self._source = source
+        self._empreinte = hashlib.sha256()
+        self.octets_lus = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, destination) -> int:
+        morceau = self._source.read(len(destination))
+        taille = len(morceau)
+        destination[:taille] = morceau
+        self._empreinte.update(morceau)
+        self.octets_lus += taille
+        return taille
+
+    def hexdigest(self) -> str:
+        """Empreinte du contenu lu jusqu'ici"""
+        return self._empreinte.hexdigest()
+
+
+def cle_resultat(empreinte_data: str, empreinte_mots_cles: str, correspondances: bool = False) -> str:
+    """Clé de cache : empreinte de Data.csv et des mots-clés, et mode correspondances (colonne matched_keywords)"""
+    contenu = f"v{VERSION_CACHE}:{empreinte_data}:{empreinte_mots_cles}" + (':correspondances' if correspondances else '')
+    return hashlib.sha256(contenu.encode('ascii')).hexdigest()
+
+
+def _chemins(cle: str, dossier: str) -> Tuple[str, str]:
+    base = os.path.join(dossier, cle)
+    return base + EXTENSION_RESULTAT, base + EXTENSION_STATS
+
+
+def lire_resultat(cle: str, dossier: Optional[str] = None) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Cherche un résultat dans le cache
+
+    Args:
+        cle: Clé calculée par cle_resultat
+        dossier: Dossier du cache (DOSSIER_CACHE par défaut)
+
+    Returns:
+        (chemin du fichier résultat en cache, statistiques), ou None s'il est absent
+    """
+    dossier = DOSSIER_CACHE if dossier is None else dossier
+    if not dossier:
+        return None
+
+    chemin_resultat, chemin_stats = _chemins(cle, dossier)
+    try:
+        with open(chemin_stats, 'r', encoding='utf-8') as fichier:
+            stats = json.load(fichier)
+        # Marquer l'entrée comme récemment utilisée pour l'éviction
+        os.utime(chemin_resultat)
+        os.utime(chemin_stats)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Entrée corrompue ou incomplète : on la supprime
+        _supprimer(chemin_resultat)
+        _supprimer(chemin_stats)
+        return None
+    return chemin_resultat, stats
+
+
+def ecrire_resultat(cle: str, fichier_resultat: str, stats: Dict[str, Any], dossier: Optional[str] = None):
+    """
+    Copie un résultat dans le cache puis évince les entrées en trop
+
+    Le fichier résultat est écrit avant les statistiques, chacun via un
+    fichier temporaire renommé : une entrée n'est visible qu'une fois complète.
+    """
+    dossier = DOSSIER_CACHE if dossier is None else dossier
+    if not dossier:
+        return
+
+    chemin_resultat, chemin_stats = _chemins(cle, dossier)
+    try:
+        os.makedirs(dossier, exist_ok=True)
+        descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix='.tmp')
+        os.close(descripteur)
+        shutil.copyfile(fichier_resultat, temporaire)
+        os.replace(temporaire, chemin_resultat)
+
+        descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix='.tmp')
+        with os.fdopen(descripteur, 'w', encoding='utf-8') as fichier:
+            json.dump(stats, fichier)
+        os.replace(temporaire, chemin_stats)
+    except Exception as e:
+        print(f"[ATTENTION] Impossible d'ecrire le cache des resultats: {e}")
+        return
+
+    evincer(dossier)
+
+
+def copier_resultat(chemin_cache: str, destination: str):
+    """
+    Copie un résultat en cache vers le dossier des téléchargements
+
+    Une copie plutôt qu'un lien : le fichier téléchargeable peut être réécrit
+    sur place par un filtrage suivant sans altérer le cache.
+    """
+    shutil.copyfile(chemin_cache, destination)
+
+
+def evincer(dossier: Optional[str] = None, max_octets: int = MAX_OCTETS,
+            age_max: float = AGE_MAX_SECONDES):
+    """Supprime les entrées trop anciennes, puis les moins récemment utilisées au-delà de max_octets"""
+    dossier = DOSSIER_CACHE if dossier is None else dossier
+    if not dossier or not os.path.isdir(dossier):
+        return
+
+    entrees = []
+    for nom in os.listdir(dossier):
+        if not nom.endswith(EXTENSION_STATS):
+            continue
+        cle = nom[:-len(EXTENSION_STATS)]
+        chemin_resultat, chemin_stats = _chemins(cle, dossier)
+        try:
+            taille = os.path.getsize(chemin_resultat) + os.path.getsize(chemin_stats)
+            entrees.append((os.path.getmtime(chemin_stats), taille, cle))
+        except OSError:
+            continue
+
+    limite = time.time() - age_max
+    total = 0
+    entrees.sort(reverse=True)
+    for date_utilisation, taille, cle in entrees:
+        if date_utilisation >= limite:
+            total += taille
+            if total <= max_octets:
+                continue
+        for chemin in _chemins(cle, dossier):
+            _supprimer(chemin)
+
+
+def _supprimer(chemin: str):
+    try:
+        os.remove(chemin)
+    except OSError:
+        pass
@@ -0,0 +1,583 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Connecteur Google Sheets : lecture des vidéos et des mots-clés, écriture de 'decision'
+Lit les feuilles par pages de lignes (plusieurs pages par requête values:batchGet),
+sur une session HTTP à connexions réutilisées avec nouvelles tentatives, puis
+écrit la colonne 'decision' par lots de plages (values:batchUpdate).
+
+La synchronisation est incrémentale : un fichier d'état mémorise l'empreinte de
+chaque ligne (contenu et décision écrite) et la dernière ligne lue. Seules les
+lignes qui suivent celle-ci sont lues, filtrées et écrites ; la dernière ligne
+est relue pour vérifier que rien n'a été supprimé ni inséré avant elle (sinon
+toute la feuille est relue). Une ligne modifiée avant la dernière ligne lue
+n'est donc vue qu'avec relire_tout (--relire-tout), qui relit toute la feuille
+et refiltre les lignes dont l'empreinte a changé. Si les mots-clés ou les
+colonnes changent, toute la feuille est refiltrée.
+
+Seule l'API « values » de Sheets est utilisée : serveur_sheets_local.py en
+fournit une imitation locale pour essayer le connecteur sans compte Google.
+Le connecteur nécessite requests (pip install requests) ; pandas n'est pas importé.
+
+Exemple :
+    python connecteur_sheets.py --classeur <id du classeur> --feuille-data Data --feuille-keywords keywords
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import tempfile
+from itertools import chain
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from automate_mots_cles import AutomateMotsCles, compiler_mots_cles, empreinte_mots_cles
+from filtrage_sans_pandas import (COLONNE_DECISION, DECISIONS, decideur_csv, mots_cles_depuis_csv,
+                                  mots_cles_depuis_lignes)
+from instrumentation import INSTRUMENTATION_NULLE, InstrumentationNulle, creer_instrumentation
+
+# Adresse de l'API (FILTRE_SHEETS_URL pour un serveur compatible, comme serveur_sheets_local.py)
+URL_DEFAUT = os.environ.get('FILTRE_SHEETS_URL', 'https://sheets.googleapis.com')
+
+# Détecté sans importer requests
+REQUESTS_DISPONIBLE = importlib.util.find_spec('requests') is not None
+
+# Lignes par page lue, et pages demandées dans une même requête values:batchGet
+LIGNES_PAR_PAGE = 5_000
+PAGES_PAR_REQUETE = 4
+
+# Plages (suites de lignes consécutives) écrites par requête values:batchUpdate
+PLAGES_PAR_ECRITURE = 500
+
+# Nouvelles tentatives sur erreur réseau, 429 (quota) et 5xx, avec attente exponentielle
+TENTATIVES = 5
+FACTEUR_ATTENTE = 0.5
+STATUTS_A_REESSAYER = (429, 500, 502, 503, 504)
+
+# Délais de connexion et de lecture d'une requête (secondes)
+DELAIS = (10, 120)
+
+# À incrémenter si le format du fichier d'état change
+VERSION_ETAT = 1
+
+
+class ErreurSheets(Exception):
+    """Réponse d'erreur de l'API Sheets (après épuisement des nouvelles tentatives)"""
+
+
+def colonne_a1(numero: int) -> str:
+    """Lettres de colonne en notation A1 (0 -> 'A', 26 -> 'AA')"""
+    lettres = ''
+    numero += 1
+    while numero:
+        numero, reste = divmod(numero - 1, 26)
+        lettres = chr(ord('A') + reste) + lettres
+    return lettres
+
+
+def plage_a1(feuille: str, premiere_ligne: int, derniere_ligne: Optional[int] = None,
+             premiere_colonne: int = 0, derniere_colonne: Optional[int] = None) -> str:
+    """
+    Plage en notation A1 ('Data'!A2:J5001), lignes numérotées à partir de 1 et colonnes de 0
+
+    Sans dernière colonne, la plage couvre des lignes entières ('Data'!2:5001).
+    """
+    feuille = "'" + feuille.replace("'", "''") + "'"
+    derniere_ligne = premiere_ligne if derniere_ligne is None else derniere_ligne
+    if derniere_colonne is None:
+        return f"{feuille}!{premiere_ligne}:{derniere_ligne}"
+    return (f"{feuille}!{colonne_a1(premiere_colonne)}{premiere_ligne}:"
+            f"{colonne_a1(derniere_colonne)}{derniere_ligne}")
+
+
+class ClientSheets:
+    """
+    Accès à l'API « values » d'un classeur Google Sheets
+
+    Une seule session requests est utilisée : les connexions HTTP sont gardées
+    ouvertes d'une requête à l'autre et les erreurs temporaires (réseau, quota,
+    5xx) sont réessayées avec une attente croissante. Les écritures
+    values:batchUpdate remplacent des valeurs : les rejouer est sans risque.
+
+    Usage :
+        with ClientSheets(identifiant, jeton=...) as client:
+            entete, lignes = client.lire_feuille('Data')
+    """
+
+    def __init__(self, classeur: str, url: str = URL_DEFAUT, cle_api: Optional[str] = None,
+                 jeton: Optional[str] = None, tentatives: int = TENTATIVES, connexions: int = 4):
+        """
+        Args:
+            classeur: Identifiant du classeur (dans son URL)
+            url: Adresse de l'API
+            cle_api: Clé d'API (lecture des classeurs publics)
+            jeton: Jeton OAuth 2 (nécessaire pour écrire)
+            tentatives: Nombre de nouvelles tentatives par requête
+            connexions: Connexions HTTP gardées ouvertes
+
+        Raises:
+            ImportError: Si requests n'est pas installé
+        """
+        if not REQUESTS_DISPONIBLE:
+            raise ImportError("Le connecteur Google Sheets nécessite requests (pip install requests)")
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        self.classeur = classeur
+        self.url = f"{url.rstrip('/')}/v4/spreadsheets/{classeur}"
+        self.cle_api = cle_api
+        self.requetes = 0
+
+        nouvelles_tentatives = Retry(total=tentatives, backoff_factor=FACTEUR_ATTENTE,
+                                     status_forcelist=STATUTS_A_REESSAYER, allowed_methods=None,
+                                     respect_retry_after_header=True, raise_on_status=False)
+        self.session = requests.Session()
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=connexions,
+                                                  max_retries=nouvelles_tentatives))
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=connexions,
+                                                   max_retries=nouvelles_tentatives))
+        if jeton:
+            self.session.headers['Authorization'] = f"Bearer {jeton}"
+
+    def __enter__(self) -> 'ClientSheets':
+        return self
+
+    def __exit__(self, *exception):
+        self.fermer()
+
+    def fermer(self):
+        """Ferme les connexions de la session"""
+        self.session.close()
+
+    def _requete(self, methode: str, chemin: str, params: Optional[Dict] = None,
+                 corps: Optional[Dict] = None) -> Dict:
+        """
+        Requête JSON vers l'API
+
+        Raises:
+            ErreurSheets: Si la réponse est une erreur une fois les tentatives épuisées
+        """
+        params = dict(params or {})
+        if self.cle_api:
+            params['key'] = self.cle_api
+        self.requetes += 1
+        reponse = self.session.request(methode, self.url + chemin, params=params, json=corps, timeout=DELAIS)
+        if reponse.status_code >= 400:
+            try:
+                message = reponse.json()['error']['message']
+            except (ValueError, KeyError, TypeError):
+                message = reponse.text[:200]
+            raise ErreurSheets(f"{reponse.status_code} : {message}")
+        return reponse.json()
+
+    def lire_plages(self, plages: Sequence[str]) -> List[List[List[str]]]:
+        """
+        Valeurs de plusieurs plages en une requête (values:batchGet)
+
+        Comme l'API, les cellules vides en fin de ligne et les lignes vides
+        en fin de plage sont omises.
+
+        Returns:
+            Lignes de chaque plage, dans l'ordre des plages demandées
+        """
+        reponse = self._requete('GET', '/values:batchGet', params={
+            'ranges': list(plages), 'majorDimension': 'ROWS', 'valueRenderOption': 'FORMATTED_VALUE',
+        })
+        return [plage.get('values', []) for plage in reponse.get('valueRanges', [])]
+
+    def ecrire_plages(self, donnees: Sequence[Tuple[str, List[List[str]]]]) -> int:
+        """
+        Écrit plusieurs plages en une requête (values:batchUpdate, valeurs brutes)
+
+        Args:
+            donnees: Couples (plage A1, lignes de valeurs)
+
+        Returns:
+            Nombre de cellules écrites
+        """
+        reponse = self._requete('POST', '/values:batchUpdate', corps={
+            'valueInputOption': 'RAW',
+            'data': [{'range': plage, 'majorDimension': 'ROWS', 'values': valeurs} for plage, valeurs in donnees],
+        })
+        return int(reponse.get('totalUpdatedCells', 0))
+
+    def lire_pages(self, feuille: str, nb_colonnes: int, premiere_ligne: int = 2,
+                   lignes_par_page: int = LIGNES_PAR_PAGE,
+                   pages_par_requete: int = PAGES_PAR_REQUETE) -> Iterator[Tuple[int, List[List[str]]]]:
+        """
+        Parcourt une feuille par pages de lignes, plusieurs pages par requête
+
+        La lecture s'arrête à la première page vide : des lignes vides isolées
+        sont conservées, mais une page entière de lignes vides termine la feuille.
+
+        Args:
+            feuille: Nom de la feuille
+            nb_colonnes: Colonnes lues (à partir de A)
+            premiere_ligne: Numéro (à partir de 1) de la première ligne lue
+
+        Returns:
+            Couples (numéro de la première ligne de la page, lignes de la page)
+        """
+        debut = premiere_ligne
+        while True:
+            debuts = [debut + numero * lignes_par_page for numero in range(pages_par_requete)]
+            pages = self.lire_plages([plage_a1(feuille, page, page + lignes_par_page - 1, 0, nb_colonnes - 1)
+                                      for page in debuts])
+            for page, lignes in zip(debuts, pages):
+                if not lignes:
+                    return
+                yield page, lignes
+            debut = debuts[-1] + lignes_par_page
+
+    def lire_entete(self, feuille: str) -> List[str]:
+        """
+        Première ligne d'une feuille
+
+        Raises:
+            ValueError: Si la feuille est vide
+        """
+        entete = self.lire_plages([plage_a1(feuille, 1)])[0]
+        if not entete or not entete[0]:
+            raise ValueError(f"Feuille {feuille} vide (aucun en-tête)")
+        return entete[0]
+
+    def lignes_feuille(self, feuille: str, nb_colonnes: int, premiere_ligne: int = 2,
+                       lignes_par_page: int = LIGNES_PAR_PAGE,
+                       pages_par_requete: int = PAGES_PAR_REQUETE) -> Iterator[Tuple[int, List[str]]]:
+        """Lignes non vides à partir de `premiere_ligne`, lues page par page : couples (numéro de ligne, valeurs)"""
+        for debut, page in self.lire_pages(feuille, nb_colonnes, premiere_ligne, lignes_par_page, pages_par_requete):
+            for decalage, ligne in enumerate(page):
+                if any(ligne):
+                    yield debut + decalage, ligne
+
+    def lire_feuille(self, feuille: str, lignes_par_page: int = LIGNES_PAR_PAGE,
+                     pages_par_requete: int = PAGES_PAR_REQUETE) -> Tuple[List[str], Iterator[Tuple[int, List[str]]]]:
+        """
+        En-tête d'une feuille et ses lignes non vides, lues page par page
+
+        Returns:
+            Tuple (en-tête, itérateur de couples (numéro de ligne, valeurs))
+
+        Raises:
+            ValueError: Si la feuille est vide
+        """
+        entete = self.lire_entete(feuille)
+        return entete, self.lignes_feuille(feuille, len(entete), 2, lignes_par_page, pages_par_requete)
+
+    def lire_mots_cles(self, feuille: str) -> Set[str]:
+        """
+        Mots-clés d'une feuille : colonne 'keyword' ou, à défaut, la première colonne
+
+        Même nettoyage que pour keywords.csv (filtrage_sans_pandas.mots_cles_depuis_lignes).
+        """
+        entete, lignes = self.lire_feuille(feuille)
+        return mots_cles_depuis_lignes(chain([entete], (ligne for _, ligne in lignes)))
+
+
+def empreinte_ligne(valeurs: Sequence[str], position_decision: int) -> str:
+    """Empreinte compacte (64 bits) du contenu d'une ligne et de sa décision écrite"""
+    contenu = [valeur for position, valeur in enumerate(valeurs) if position != position_decision]
+    decision = valeurs[position_decision] if position_decision < len(valeurs) else ''
+    texte = '\x1f'.join(contenu) + '\x1e' + decision
+    return hashlib.blake2b(texte.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def chemin_etat_defaut(classeur: str, feuille: str) -> str:
+    """Fichier d'état d'une feuille, dans le répertoire courant"""
+    return f"sheets_{classeur}_{feuille}.etat.json".replace(os.sep, '_')
+
+
+def lire_etat(fichier_etat: str) -> Optional[Dict]:
+    """
+    Lit le fichier d'état d'une synchronisation
+
+    Returns:
+        Dict avec 'empreinte_mots_cles', 'entete', 'lignes' (set des
+        empreintes de lignes), 'derniere_ligne' et 'empreinte_derniere'
+        (dernière ligne lue, None si aucune) et 'nb_lignes' (lignes non vides
+        jusqu'à elle), ou None s'il est absent ou invalide
+    """
+    try:
+        with open(fichier_etat, 'r', encoding='utf-8') as fichier:
+            etat = json.load(fichier)
+    except (OSError, ValueError):
+        return None
+
+    if etat.get('version') != VERSION_ETAT or 'empreinte_mots_cles' not in etat:
+        return None
+    # Fichiers d'état antérieurs, sans dernière ligne : la synchronisation suivante relit tout
+    return {'empreinte_mots_cles': etat['empreinte_mots_cles'], 'entete': etat.get('entete'),
+            'lignes': set(etat.get('lignes', [])), 'derniere_ligne': etat.get('derniere_ligne'),
+            'empreinte_derniere': etat.get('empreinte_derniere'), 'nb_lignes': etat.get('nb_lignes', 0)}
+
+
+def ecrire_etat(fichier_etat: str, empreinte: str, entete: List[str], lignes: Set[str],
+                derniere_ligne: Optional[int] = None, empreinte_derniere: Optional[str] = None, nb_lignes: int = 0):
+    """Écrit le fichier d'état de façon atomique (fichier temporaire renommé)"""
+    dossier = os.path.dirname(os.path.abspath(fichier_etat))
+    descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix='.tmp')
+    with os.fdopen(descripteur, 'w', encoding='utf-8') as fichier:
+        json.dump({'version': VERSION_ETAT, 'empreinte_mots_cles': empreinte, 'entete': entete,
+                   'lignes': sorted(lignes), 'derniere_ligne': derniere_ligne,
+                   'empreinte_derniere': empreinte_derniere, 'nb_lignes': nb_lignes}, fichier)
+    os.replace(temporaire, fichier_etat)
+
+
+def plages_decisions(feuille: str, colonne: int, decisions: List[Tuple[int, str]]) -> List[Tuple[str, List[List[str]]]]:
+    """Regroupe les décisions à écrire (numéro de ligne, valeur) en plages de lignes consécutives"""
+    plages = []
+    debut = precedente = None
+    valeurs: List[List[str]] = []
+    for numero, decision in sorted(decisions):
+        if precedente is not None and numero != precedente + 1:
+            plages.append((plage_a1(feuille, debut, precedente, colonne, colonne), valeurs))
+            debut, valeurs = None, []
+        if debut is None:
+            debut = numero
+        valeurs.append([decision])
+        precedente = numero
+    if debut is not None:
+        plages.append((plage_a1(feuille, debut, precedente, colonne, colonne), valeurs))
+    return plages
+
+
+def synchroniser(client: ClientSheets, automate: AutomateMotsCles, feuille: str = 'Data',
+                 fichier_etat: Optional[str] = None, complet: bool = False, ecrire: bool = True,
+                 lignes_par_page: int = LIGNES_PAR_PAGE, pages_par_requete: int = PAGES_PAR_REQUETE,
+                 plages_par_ecriture: int = PLAGES_PAR_ECRITURE,
+                 rappel: Optional[Callable[[int], None]] = None,
+                 instrumentation: InstrumentationNulle = INSTRUMENTATION_NULLE,
+                 relire_tout: bool = False) -> Dict:
+    """
+    Filtre les lignes ajoutées à une feuille et y écrit la colonne 'decision'
+
+    La colonne 'decision' est ajoutée après la dernière colonne si elle
+    n'existe pas. Le texte analysé est celui d'un Data.csv exporté
+    (filtrage_sans_pandas.texteur_csv). Seules les décisions qui changent sont
+    écrites, par lots de `plages_par_ecriture` plages de lignes consécutives,
+    après chaque page lue.
+
+    En mode incrémental, la lecture reprend à la dernière ligne lue lors de la
+    synchronisation précédente. Si cette ligne a disparu ou changé (feuille
+    raccourcie, lignes supprimées ou insérées avant elle), toute la feuille est
+    relue et seules les lignes dont l'empreinte a changé sont refiltrées.
+
+    Args:
+        client: Client du classeur
+        automate: Mots-clés compilés
+        feuille: Nom de la feuille des vidéos
+        fichier_etat: Fichier d'état (par défaut chemin_etat_defaut)
+        complet: Ignore l'état et refiltre toute la feuille
+        ecrire: False pour calculer les statistiques sans rien écrire (ni état ni feuille)
+        lignes_par_page: Lignes lues par page
+        pages_par_requete: Pages lues par requête
+        plages_par_ecriture: Plages écrites par requête
+        rappel: Fonction appelée après chaque page avec le nombre de lignes lues
+        instrumentation: Reçoit les durées des étapes et les compteurs
+        relire_tout: Relit toute la feuille même si la dernière ligne lue n'a
+            pas changé, pour refiltrer aussi les lignes modifiées avant elle
+
+    Returns:
+        Statistiques des lignes filtrées lors de cet appel, plus 'deja_traitees'
+        (lignes inchangées), 'cellules_ecrites', 'requetes', 'mode'
+        ('complet' ou 'incremental') et 'lecture' ('suite' si seule la fin de
+        la feuille a été lue, 'complete' sinon)
+    """
+    fichier_etat = fichier_etat or chemin_etat_defaut(client.classeur, feuille)
+    empreinte = empreinte_mots_cles(automate)
+    requetes_initiales = client.requetes
+
+    with instrumentation.etape('lecture'):
+        entete = client.lire_entete(feuille)
+    nouvelle_colonne = COLONNE_DECISION not in entete
+    entete_final = entete + [COLONNE_DECISION] if nouvelle_colonne else list(entete)
+    position_decision = entete_final.index(COLONNE_DECISION)
+
+    etat = None if complet else lire_etat(fichier_etat)
+    incremental = (etat is not None and etat['empreinte_mots_cles'] == empreinte
+                   and etat['entete'] == entete_final)
+    connues = etat['lignes'] if incremental else set()
+
+    def completer(valeurs: List[str]) -> List[str]:
+        return valeurs[:len(entete_final)] + [''] * (len(entete_final) - len(valeurs))
+
+    # Reprise à la dernière ligne lue, relue pour vérifier que la feuille n'a
+    # pas été raccourcie et que rien n'a été supprimé ou inséré avant elle
+    premiere_ligne = 2
+    lignes = None
+    derniere_ligne = empreinte_derniere = None
+    deja_lues = 0
+    if incremental and not relire_tout and etat['derniere_ligne']:
+        with instrumentation.etape('lecture'):
+            lignes = client.lignes_feuille(feuille, len(entete), etat['derniere_ligne'],
+                                           lignes_par_page, pages_par_requete)
+            repere = next(lignes, None)
+        if (repere is not None and repere[0] == etat['derniere_ligne']
+                and empreinte_ligne(completer(repere[1]), position_decision) == etat['empreinte_derniere']):
+            premiere_ligne = etat['derniere_ligne']
+            derniere_ligne, empreinte_derniere = etat['derniere_ligne'], etat['empreinte_derniere']
+            deja_lues = etat['nb_lignes']
+        else:
+            lignes = None
+    if lignes is None:
+        lignes = client.lignes_feuille(feuille, len(entete), 2, lignes_par_page, pages_par_requete)
+
+    decider = decideur_csv(entete_final, automate)
+    a_ecrire: List[Tuple[int, str]] = [(1, COLONNE_DECISION)] if nouvelle_colonne else []
+    # Les lignes non relues gardent leurs empreintes
+    empreintes: Set[str] = set(connues) if deja_lues else set()
+    gardees = nouvelles = deja_traitees = lues = cellules = 0
+
+    def vider():
+        nonlocal a_ecrire, cellules
+        plages = plages_decisions(feuille, position_decision, a_ecrire)
+        with instrumentation.etape('ecriture'):
+            for debut in range(0, len(plages), plages_par_ecriture):
+                cellules += client.ecrire_plages(plages[debut:debut + plages_par_ecriture])
+        a_ecrire = []
+
+    page_courante = 0
+    while True:
+        with instrumentation.etape('lecture'):
+            element = next(lignes, None)
+        if element is None:
+            break
+        numero, valeurs = element
+        page = (numero - premiere_ligne) // lignes_par_page
+        if page != page_courante:
+            # Page précédente terminée : ses décisions sont écrites avant de continuer
+            page_courante = page
+            if rappel is not None:
+                rappel(lues)
+            if ecrire and a_ecrire:
+                vider()
+
+        lues += 1
+        valeurs = completer(valeurs)
+        empreinte_courante = empreinte_ligne(valeurs, position_decision)
+        if empreinte_courante in connues:
+            deja_traitees += 1
+            empreintes.add(empreinte_courante)
+            derniere_ligne, empreinte_derniere = numero, empreinte_courante
+            continue
+
+        with instrumentation.etape('recherche'):
+            decision = DECISIONS[decider(valeurs)]
+        nouvelles += 1
+        gardees += decision == DECISIONS[True]
+        if valeurs[position_decision] != decision:
+            valeurs[position_decision] = decision
+            a_ecrire.append((numero, decision))
+        derniere_ligne, empreinte_derniere = numero, empreinte_ligne(valeurs, position_decision)
+        empreintes.add(empreinte_derniere)
+
+    if ecrire:
+        if a_ecrire:
+            vider()
+        ecrire_etat(fichier_etat, empreinte, entete_final, empreintes,
+                    derniere_ligne, empreinte_derniere, deja_lues + lues)
+
+    instrumentation.compter('lignes', nouvelles)
+    instrumentation.compter('gardees', gardees)
+    return {
+        'gardees': gardees,
+        'rejetees': nouvelles - gardees,
+        'total': nouvelles,
+        'mots_cles': len(automate),
+        'deja_traitees': deja_lues + deja_traitees,
+        'cellules_ecrites': cellules,
+        'requetes': client.requetes - requetes_initiales,
+        'mode': 'incremental' if incremental else 'complet',
+        'lecture': 'suite' if deja_lues else 'complete',
+    }
+
+
+def parser_arguments(arguments: Optional[List[str]] = None) -> argparse.Namespace:
+    """Lit les options de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Filtre une feuille Google Sheets et y écrit la colonne decision")
+    parser.add_argument('--classeur', required=True, help="Identifiant du classeur (dans son URL)")
+    parser.add_argument('--feuille-data', default='Data', help="Feuille des vidéos (défaut: Data)")
+    parser.add_argument('--feuille-keywords', default='keywords',
+                        help="Feuille des mots-clés (défaut: keywords)")
+    parser.add_argument('--keywords', default=None,
+                        help="Fichier CSV local des mots-clés, à la place de --feuille-keywords")
+    parser.add_argument('--url', default=URL_DEFAUT,
+                        help="Adresse de l'API (défaut: FILTRE_SHEETS_URL ou https://sheets.googleapis.com)")
+    parser.add_argument('--etat', default=None,
+                        help="Fichier d'état de la synchronisation (défaut: sheets_<classeur>_<feuille>.etat.json)")
+    parser.add_argument('--complet', action='store_true', help="Refiltre toute la feuille en ignorant l'état")
+    parser.add_argument('--relire-tout', action='store_true',
+                        help="Relit toute la feuille pour refiltrer aussi les lignes modifiées "
+                             "avant la dernière ligne lue")
+    parser.add_argument('--sans-ecriture', action='store_true',
+                        help="Affiche les statistiques sans écrire dans la feuille")
+    parser.add_argument('--lignes-par-page', type=int, default=LIGNES_PAR_PAGE,
+                        help=f"Lignes lues par page (défaut: {LIGNES_PAR_PAGE})")
+    parser.add_argument('--pages-par-requete', type=int, default=PAGES_PAR_REQUETE,
+                        help=f"Pages lues par requête (défaut: {PAGES_PAR_REQUETE})")
+    parser.add_argument('--rapport', default=None,
+                        help="Écrit un rapport JSON (durée des étapes, compteurs) dans ce fichier ('-': sortie standard)")
+    return parser.parse_args(arguments)
+
+
+def main(arguments: Optional[List[str]] = None):
+    """Point d'entrée en ligne de commande (jeton OAuth : FILTRE_SHEETS_JETON, clé d'API : FILTRE_SHEETS_CLE)"""
+    options = parser_arguments(arguments)
+
+    print("=" * 60)
+    print("FILTREUR DE VIDEOS - GOOGLE SHEETS")
+    print("=" * 60)
+
+    instrumentation = creer_instrumentation(
+        actif=options.rapport is not None,
+        contexte={'interface': 'sheets', 'classeur': options.classeur, 'feuille': options.feuille_data},
+    )
+    instrumentation.demarrer()
+    try:
+        with ClientSheets(options.classeur, options.url, cle_api=os.environ.get('FILTRE_SHEETS_CLE'),
+                          jeton=os.environ.get('FILTRE_SHEETS_JETON')) as client:
+            with instrumentation.etape('chargement_mots_cles'):
+                if options.keywords:
+                    with open(options.keywords, 'r', encoding='utf-8-sig', newline='') as fichier:
+                        mots_cles = mots_cles_depuis_csv(fichier)
+                    source = options.keywords
+                else:
+                    mots_cles = client.lire_mots_cles(options.feuille_keywords)
+                    source = f"la feuille {options.feuille_keywords}"
+                automate = compiler_mots_cles(mots_cles)
+            print(f"[OK] {len(automate)} mots-cles charges depuis {source}")
+            if not automate:
+                print("[ERREUR] Aucun mot-cle charge. Arret du programme.")
+                return
+
+            print(f"\nAnalyse de la feuille {options.feuille_data}...")
+            stats = synchroniser(client, automate, options.feuille_data, options.etat,
+                                 complet=options.complet, ecrire=not options.sans_ecriture,
+                                 lignes_par_page=options.lignes_par_page,
+                                 pages_par_requete=options.pages_par_requete,
+                                 rappel=lambda lues: print(f"  Lu {lues} videos..."),
+                                 instrumentation=instrumentation, relire_tout=options.relire_tout)
+    except (ErreurSheets, ImportError, OSError, ValueError) as e:
+        print(f"[ERREUR] {e}")
+        return
+    finally:
+        instrumentation.arreter()
+        if instrumentation.actif:
+            instrumentation.ecrire_rapport(options.rapport or '-')
+
+    if stats['mode'] == 'complet':
+        print("[INFO] Premier passage ou mots-cles modifies : filtrage complet")
+    elif stats['lecture'] == 'suite':
+        print(f"[INFO] {stats['deja_traitees']} videos deja traitees, {stats['total']} nouvelles lues a la suite")
+    else:
+        print(f"[INFO] {stats['deja_traitees']} videos inchangees, {stats['total']} nouvelles ou modifiees")
+    print("Resultats:")
+    print(f"   - Videos gardees: {stats['gardees']}")
+    print(f"   - Videos rejetees: {stats['rejetees']}")
+    print(f"   - Cellules ecrites: {stats['cellules_ecrites']} ({stats['requetes']} requetes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dédoublonnage des vidéos par `id`, d'un fichier à l'autre
+Les ids déjà vus sont mémorisés sous une forme compacte, en mémoire ou sur
+disque, pour écarter les doublons avant la recherche des mots-clés :
+    EnsembleIds : empreintes 64 bits des ids (aucun faux positif en pratique)
+    FiltreBloom : filtre de Bloom, environ 2 octets par id pour 0,1 % de faux
+                  positifs (une vidéo nouvelle est alors écartée à tort)
+Seule la première occurrence d'un id est gardée. Une ligne sans id est
+toujours gardée. Bibliothèque standard uniquement.
+"""
+
+import hashlib
+import math
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from typing import Iterable, Optional, Union
+
+# En-têtes des fichiers des ids vus
+ENTETE_ENSEMBLE = b'IDSVUS1\n'
+ENTETE_BLOOM = b'BLOOMID1\n'
+
+# Nombre de cases initial de la table d'EnsembleIds (puissance de deux)
+TAILLE_TABLE_INITIALE = 1024
+
+# Dimensionnement par défaut du filtre de Bloom
+CAPACITE_BLOOM = 10_000_000
+TAUX_FAUX_POSITIFS = 0.001
+
+
+def empreinte_id(identifiant: str, taille: int = 8) -> bytes:
+    """Empreinte de `taille` octets d'un id (stable d'un processus à l'autre, contrairement à hash())"""
+    return hashlib.blake2b(identifiant.encode('utf-8'), digest_size=taille).digest()
+
+
+def _ecrire_atomique(chemin: str, morceaux: Iterable[bytes]):
+    """Écrit un fichier de façon atomique (fichier temporaire renommé)"""
+    dossier = os.path.dirname(os.path.abspath(chemin))
+    descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix='.tmp')
+    with os.fdopen(descripteur, 'wb') as fichier:
+        for morceau in morceaux:
+            fichier.write(morceau)
+    os.replace(temporaire, chemin)
+
+
+class EnsembleIds:
+    """
+    Ids déjà vus, mémorisés par leur empreinte 64 bits
+
+    Les empreintes sont des entiers rangés dans une table de hachage à
+    adressage ouvert (array('Q'), sondage linéaire, 0 pour une case libre)
+    remplie aux deux tiers au plus : de 12 à 24 octets par id en mémoire, quelle
+    que soit la longueur des ids ; sur disque, 8 octets par id. Deux ids
+    distincts n'ont la même empreinte qu'avec une probabilité négligeable (de
+    l'ordre de 10^-6 pour dix millions d'ids).
+    """
+
+    __slots__ = ('_table', '_masque', '_nombre', '_limite')
+
+    def __init__(self, empreintes: Iterable[int] = ()):
+        """
+        Args:
+            empreintes: Empreintes déjà vues (entiers de 64 bits, voir charger_ids_vus)
+        """
+        empreintes = empreintes if isinstance(empreintes, array) else array('Q', empreintes)
+        taille = TAILLE_TABLE_INITIALE
+        while 2 * taille < 3 * len(empreintes):
+            taille *= 2
+        self._remplir(taille, empreintes)
+
+    def __len__(self) -> int:
+        return self._nombre
+
+    def _remplir(self, taille: int, empreintes: Iterable[int]):
+        """Nouvelle table de `taille` cases (puissance de deux) contenant les empreintes"""
+        table = array('Q', bytes(8 * taille))
+        masque = taille - 1
+        nombre = 0
+        for empreinte in empreintes:
+            # 0 marque une case libre : l'empreinte 0 est confondue avec 1
+            empreinte = empreinte or 1
+            position = empreinte & masque
+            valeur = table[position]
+            while valeur and valeur != empreinte:
+                position = (position + 1) & masque
+                valeur = table[position]
+            if not valeur:
+                table[position] = empreinte
+                nombre += 1
+        self._table = table
+        self._masque = masque
+        self._nombre = nombre
+        self._limite = 2 * taille // 3
+
+    def nouveau(self, identifiant: str) -> bool:
+        """Vrai si l'id n'avait pas encore été vu ; il est alors mémorisé"""
+        empreinte = int.from_bytes(empreinte_id(identifiant), 'big') or 1
+        table = self._table
+        masque = self._masque
+        # Les empreintes sont uniformes : leurs bits de poids faible donnent directement la case
+        position = empreinte & masque
+        valeur = table[position]
+        while valeur:
+            if valeur == empreinte:
+                return False
+            position = (position + 1) & masque
+            valeur = table[position]
+        table[position] = empreinte
+        self._nombre += 1
+        if self._nombre > self._limite:
+            # Table doublée, les empreintes y sont replacées
+            self._remplir(2 * len(table), filter(None, table))
+        return True
+
+    def enregistrer(self, chemin: str):
+        """Écrit les empreintes dans un fichier (lu par charger_ids_vus)"""
+        # Entiers triés écrits en gros-boutiste : les empreintes en octets, dans l'ordre
+        empreintes = array('Q', sorted(filter(None, self._table)))
+        if sys.byteorder == 'little':
+            empreintes.byteswap()
+        _ecrire_atomique(chemin, (ENTETE_ENSEMBLE, empreintes.tobytes()))
+
+
+class FiltreBloom:
+    """
+    Ids déjà vus, mémorisés dans un filtre de Bloom de taille fixe
+
+    Dimensionné pour `capacite` ids avec un taux de faux positifs donné :
+    au-delà de la capacité, le taux augmente. Un faux positif écarte une
+    vidéo nouvelle comme si elle était un doublon ; un doublon n'est jamais
+    gardé.
+    """
+
+    __slots__ = ('bits', 'nb_bits', 'nb_hachages', 'nb_elements')
+
+    def __init__(self, capacite: int = CAPACITE_BLOOM, taux_faux_positifs: float = TAUX_FAUX_POSITIFS,
+                 bits: Optional[bytearray] = None, nb_hachages: Optional[int] = None, nb_elements: int = 0):
+        """
+        Args:
+            capacite: Nombre d'ids prévu
+            taux_faux_positifs: Taux de faux positifs visé à pleine capacité
+            bits, nb_hachages, nb_elements: État d'un filtre relu (voir charger_ids_vus)
+        """
+        if bits is None:
+            nb_bits = max(8, math.ceil(-capacite * math.log(taux_faux_positifs) / math.log(2) ** 2))
+            bits = bytearray((nb_bits + 7) // 8)
+            nb_hachages = max(1, round(nb_bits / max(1, capacite) * math.log(2)))
+        self.bits = bits
+        self.nb_bits = len(bits) * 8
+        self.nb_hachages = nb_hachages
+        self.nb_elements = nb_elements
+
+    def __len__(self) -> int:
+        """Nombre d'ids ajoutés (les faux positifs n'en font pas partie)"""
+        return self.nb_elements
+
+    def nouveau(self, identifiant: str) -> bool:
+        """Vrai si l'id n'avait (probablement) pas encore été vu ; il est alors mémorisé"""
+        empreinte = empreinte_id(identifiant, 16)
+        # Double hachage : k positions h1 + i * h2 tirées de deux valeurs de 64 bits
+        h1 = int.from_bytes(empreinte[:8], 'little')
+        h2 = int.from_bytes(empreinte[8:], 'little') | 1
+        bits = self.bits
+        nb_bits = self.nb_bits
+        nouveau = False
+        for position in range(h1, h1 + self.nb_hachages * h2, h2):
+            position %= nb_bits
+            octet = bits[position >> 3]
+            masque = 1 << (position & 7)
+            if not octet & masque:
+                bits[position >> 3] = octet | masque
+                nouveau = True
+        self.nb_elements += nouveau
+        return nouveau
+
+    def enregistrer(self, chemin: str):
+        """Écrit le filtre dans un fichier (lu par charger_ids_vus)"""
+        _ecrire_atomique(chemin, (ENTETE_BLOOM, struct.pack('<IQ', self.nb_hachages, self.nb_elements),
+                                  bytes(self.bits)))
+
+
+IdsVus = Union[EnsembleIds, FiltreBloom]
+
+
+def charger_ids_vus(chemin: str) -> Optional[IdsVus]:
+    """
+    Relit des ids vus enregistrés par EnsembleIds.enregistrer ou FiltreBloom.enregistrer
+
+    Returns:
+        Les ids vus, ou None si le fichier est absent
+
+    Raises:
+        ValueError: Si le fichier n'est pas un fichier d'ids vus
+    """
+    try:
+        with open(chemin, 'rb') as fichier:
+            contenu = fichier.read()
+    except FileNotFoundError:
+        return None
+
+    if contenu.startswith(ENTETE_ENSEMBLE):
+        if (len(contenu) - len(ENTETE_ENSEMBLE)) % 8:
+            raise ValueError(f"{chemin} est tronqué")
+        empreintes = array('Q')
+        empreintes.frombytes(contenu[len(ENTETE_ENSEMBLE):])
+        if sys.byteorder == 'little':
+            empreintes.byteswap()
+        return EnsembleIds(empreintes)
+    if contenu.startswith(ENTETE_BLOOM):
+        debut = len(ENTETE_BLOOM) + struct.calcsize('<IQ')
+        nb_hachages, nb_elements = struct.unpack('<IQ', contenu[len(ENTETE_BLOOM):debut])
+        return FiltreBloom(bits=bytearray(contenu[debut:]), nb_hachages=nb_hachages, nb_elements=nb_elements)
+    raise ValueError(f"{chemin} n'est pas un fichier d'ids vus")
+
+
+def creer_ids_vus(fichier: Optional[str] = None, bloom: bool = False,
+                  capacite: int = CAPACITE_BLOOM) -> IdsVus:
+    """
+    Ids vus relus depuis `fichier` s'il existe, sinon un ensemble vide
+
+    Args:
+        fichier: Fichier des ids vus lors des filtrages précédents
+        bloom: Filtre de Bloom plutôt qu'ensemble d'empreintes (fichier nouveau seulement)
+        capacite: Nombre d'ids prévu pour le filtre de Bloom
+    """
+    ids_vus = charger_ids_vus(fichier) if fichier else None
+    if ids_vus is not None:
+        return ids_vus
+    return FiltreBloom(capacite) if bloom else EnsembleIds()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+File de travaux en arrière-plan pour l'interface web
+Les filtrages sont exécutés par un petit nombre de threads ; la requête HTTP
+reçoit immédiatement un identifiant de travail et interroge ensuite son état.
+La file d'attente est bornée : au-delà, les nouveaux travaux sont refusés
+plutôt que d'accumuler des fichiers et de la mémoire.
+"""
+
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# États successifs d'un travail
+EN_ATTENTE = 'en_attente'
+EN_COURS = 'en_cours'
+TERMINE = 'termine'
+ERREUR = 'erreur'
+
+# Nombre de travaux finis dont l'état reste consultable
+CONSERVATION_DEFAUT = 100
+
+
+def nouvel_identifiant() -> str:
+    """Identifiant de travail (32 caractères hexadécimaux, utilisable comme nom de dossier)"""
+    return uuid.uuid4().hex
+
+
+class FilePleine(Exception):
+    """La file d'attente a atteint sa taille maximale"""
+
+
+class Travail:
+    """
+    Un filtrage soumis à la file
+
+    La fonction exécutée reçoit le travail en premier argument et peut mettre
+    à jour `progression` (0 à 1) et `lignes_traitees` au fil de l'exécution.
+    """
+
+    def __init__(self, identifiant: str):
+        self.id = identifiant
+        self.etat = EN_ATTENTE
+        self.progression = 0.0
+        self.lignes_traitees = 0
+        self.resultat: Any = None
+        self.erreur: Optional[str] = None
+        self.cree_le = time.time()
+        self.debut: Optional[float] = None
+        self.fin: Optional[float] = None
+
+    @property
+    def fini(self) -> bool:
+        return self.etat in (TERMINE, ERREUR)
+
+    def en_dict(self) -> Dict[str, Any]:
+        """État du travail, sérialisable en JSON"""
+        maintenant = self.fin or time.time()
+        return {
+            'id': self.id,
+            'etat': self.etat,
+            'progression': round(self.progression, 4),
+            'lignes_traitees': self.lignes_traitees,
+            'attente_s': round((self.debut or maintenant) - self.cree_le, 3),
+            'duree_s': round(maintenant - self.debut, 3) if self.debut else None,
+            'resultat': self.resultat if self.etat == TERMINE else None,
+            'erreur': self.erreur,
+        }
+
+
+class FileTravaux:
+    """
+    Pool de threads alimenté par une file d'attente bornée
+
+    Des threads suffisent : la recherche des gros fichiers peut elle-même
+    utiliser le moteur 'parallele' (processus), et les threads partagent
+    directement l'état des travaux avec les requêtes qui l'interrogent.
+
+    Usage :
+        travaux = FileTravaux(nb_workers=2, taille_file=8)
+        travail = travaux.soumettre(fonction, fichier_data)   # fonction(travail, fichier_data)
+        travaux.obtenir(travail.id).en_dict()
+    """
+
+    def __init__(self, nb_workers: int = 2, taille_file: int = 8, conservation: int = CONSERVATION_DEFAUT):
+        self.nb_workers = max(1, nb_workers)
+        self.conservation = conservation
+        self._file: queue.Queue = queue.Queue(maxsize=max(1, taille_file))
+        self._travaux: 'OrderedDict[str, Travail]' = OrderedDict()
+        self._verrou = threading.Lock()
+        self._threads = []
+
+    def _demarrer_threads(self):
+        # Démarrage à la première soumission : rien ne tourne à l'import (fork des serveurs WSGI)
+        if self._threads:
+            return
+        for numero in range(self.nb_workers):
+            thread = threading.Thread(target=self._boucle, name=f"filtrage-{numero}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def pleine(self) -> bool:
+        """Vrai si un nouveau travail serait refusé"""
+        return self._file.full()
+
+    def soumettre(self, fonction: Callable[..., Any], *args, identifiant: Optional[str] = None, **kwargs) -> Travail:
+        """
+        Ajoute un travail à la file
+
+        Args:
+            fonction: Fonction exécutée, appelée avec (travail, *args, **kwargs)
+            identifiant: Identifiant du travail (nouvel_identifiant() par défaut)
+
+        Raises:
+            FilePleine: Si la file d'attente est pleine
+        """
+        travail = Travail(identifiant or nouvel_identifiant())
+        with self._verrou:
+            self._demarrer_threads()
+            try:
+                self._file.put_nowait((travail, fonction, args, kwargs))
+            except queue.Full:
+                raise FilePleine(f"File d'attente pleine ({self._file.maxsize} travaux)") from None
+            self._travaux[travail.id] = travail
+        return travail
+
+    def enregistrer_termine(self, resultat: Any, identifiant: Optional[str] = None) -> Travail:
+        """Enregistre un travail déjà terminé (résultat obtenu sans filtrage, par exemple depuis un cache)"""
+        travail = Travail(identifiant or nouvel_identifiant())
+        travail.debut = travail.fin = travail.cree_le
+        travail.progression = 1.0
+        travail.resultat = resultat
+        travail.etat = TERMINE
+        with self._verrou:
+            self._travaux[travail.id] = travail
+            self._oublier_anciens()
+        return travail
+
+    def en_cours(self, identifiant: str) -> bool:
+        """Vrai si le travail est en attente ou en cours d'exécution"""
+        travail = self.obtenir(identifiant)
+        return travail is not None and not travail.fini
+
+    def obtenir(self, identifiant: str) -> Optional[Travail]:
+        """Travail correspondant à l'identifiant (None s'il est inconnu ou oublié)"""
+        with self._verrou:
+            return self._travaux.get(identifiant)
+
+    def _oublier_anciens(self):
+        """Ne conserve que les `conservation` derniers travaux finis"""
+        finis = [identifiant for identifiant, travail in self._travaux.items() if travail.fini]
+        for identifiant in finis[:max(0, len(finis) - self.conservation)]:
+            del self._travaux[identifiant]
+
+    def _boucle(self):
+        while True:
+            travail, fonction, args, kwargs = self._file.get()
+            travail.etat = EN_COURS
+            travail.debut = time.time()
+            try:
+                travail.resultat = fonction(travail, *args, **kwargs)
+                travail.progression = 1.0
+                travail.etat = TERMINE
+            except Exception as e:
+                travail.erreur = str(e)
+                travail.etat = ERREUR
+            finally:
+                travail.fin = time.time()
+                self._file.task_done()
+                with self._verrou:
+                    self._oublier_anciens()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Filtrage incrémental de Data.csv
+Ne filtre que les vidéos dont l'`id` n'a pas encore été décidé et les ajoute au
+fichier résultat existant. Un fichier d'état mémorise les ids déjà traités et
+l'empreinte des mots-clés ; si les mots-clés changent, tout est refiltré.
+"""
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+from typing import Callable, Dict, Optional, Set
+
+import numpy as np
+import pandas as pd
+
+import moteur_filtrage as moteur
+from moteur_filtrage import AutomateMotsCles
+from formats_donnees import taille_source
+from instrumentation import INSTRUMENTATION_NULLE, InstrumentationNulle
+
+# À incrémenter si le format du fichier d'état change
+VERSION_ETAT = 1
+
+# Nombre de lignes lues à la fois
+TAILLE_BLOC_DEFAUT = 100_000
+
+
+def chemin_etat_defaut(fichier_sortie: str) -> str:
+    """Fichier d'état associé à un fichier résultat"""
+    return f"{fichier_sortie}.etat.json"
+
+
+def lire_etat(fichier_etat: str) -> Optional[Dict]:
+    """
+    Lit le fichier d'état
+
+    Returns:
+        Dict avec 'empreinte_mots_cles' et 'ids' (set), ou None s'il est absent ou invalide
+    """
+    try:
+        with open(fichier_etat, 'r', encoding='utf-8') as fichier:
+            etat = json.load(fichier)
+    except (OSError, ValueError):
+        return None
+
+    if etat.get('version') != VERSION_ETAT or 'empreinte_mots_cles' not in etat:
+        return None
+    return {'empreinte_mots_cles': etat['empreinte_mots_cles'], 'ids': set(etat.get('ids', []))}
+
+
+def ecrire_etat(fichier_etat: str, empreinte: str, ids: Set[str]):
+    """Écrit le fichier d'état de façon atomique (fichier temporaire renommé)"""
+    dossier = os.path.dirname(os.path.abspath(fichier_etat))
+    descripteur, temporaire = tempfile.mkstemp(dir=dossier, suffix='.tmp')
+    with os.fdopen(descripteur, 'w', encoding='utf-8') as fichier:
+        json.dump({'version': VERSION_ETAT, 'empreinte_mots_cles': empreinte, 'ids': sorted(ids)}, fichier)
+    os.replace(temporaire, fichier_etat)
+
+
+def _entete_csv(chemin: str) -> Optional[list]:
+    """Première ligne d'un CSV, ou None s'il n'existe pas"""
+    try:
+        with open(chemin, 'r', encoding='utf-8', newline='') as fichier:
+            return next(csv.reader(fichier), None)
+    except OSError:
+        return None
+
+
+def masque_ids_nouveaux(ids: pd.Series, ids_connus: Set[str], garder_sans_id: bool) -> np.ndarray:
+    """
+    Masque des lignes dont l'id n'est pas encore connu, ligne par ligne
+
+    Chaque id gardé est aussitôt ajouté à ids_connus : un id répété dans le même
+    bloc n'est gardé qu'une fois (comme moteur_filtrage.masque_nouveaux).
+
+    Args:
+        ids: Colonne 'id' du bloc
+        ids_connus: Ids déjà décidés, complétés par ceux du bloc
+        garder_sans_id: Garder les lignes sans id (filtrage complet)
+    """
+    def nouveau(identifiant: str) -> bool:
+        if identifiant in ids_connus:
+            return False
+        ids_connus.add(identifiant)
+        return True
+
+    return np.fromiter((garder_sans_id if manquant else nouveau(valeur)
+                        for valeur, manquant in zip(ids.to_numpy(), ids.isna().to_numpy())),
+                       dtype=bool, count=len(ids))
+
+
+def filtrer_incremental(fichier_data: str, automate: AutomateMotsCles, fichier_sortie: str,
+                        fichier_etat: Optional[str] = None, taille_bloc: int = TAILLE_BLOC_DEFAUT,
+                        backend: Optional[str] = None, nb_workers: Optional[int] = 1,
+                        rappel: Optional[Callable[[int], None]] = None,
+                        instrumentation: InstrumentationNulle = INSTRUMENTATION_NULLE) -> Dict:
+    """
+    Filtre uniquement les vidéos nouvelles de Data.csv et les ajoute au résultat existant
+
+    Un filtrage complet est effectué si le fichier d'état ou le fichier
+    résultat est absent, si les mots-clés ont changé ou si les colonnes de
+    Data.csv ne correspondent plus à celles du résultat. Data.csv est lu par
+    blocs, colonnes en texte, comme pour filtrer_par_blocs. Seule la première
+    ligne de chaque `id` est filtrée, y compris dans un même bloc ; les
+    lignes sans `id` ne sont traitées que lors d'un filtrage complet.
+
+    Args:
+        fichier_data: Chemin vers le fichier Data.csv
+        automate: Mots-clés compilés
+        fichier_sortie: Fichier résultat (videos_filtrees.csv)
+        fichier_etat: Fichier d'état (par défaut <fichier_sortie>.etat.json)
+        taille_bloc: Nombre de lignes lues à la fois
+        backend: Moteur de recherche (voir moteur_filtrage.BACKENDS)
+        nb_workers: Nombre de processus pour le moteur 'parallele'
+        rappel: Fonction appelée après chaque bloc avec le nombre de lignes lues
+        instrumentation: Reçoit les durées des étapes et les compteurs
+
+    Returns:
+        Statistiques des vidéos filtrées lors de cet appel, plus 'deja_traitees'
+        (vidéos reprises de l'état) et 'mode' ('complet' ou 'incremental')
+    """
+    fichier_etat = fichier_etat or chemin_etat_defaut(fichier_sortie)
+    empreinte = moteur.empreinte_mots_cles(automate)
+
+    # Décider entre filtrage complet et incrémental
+    etat = lire_etat(fichier_etat)
+    entete_sortie = _entete_csv(fichier_sortie)
+    colonnes_data = list(pd.read_csv(fichier_data, nrows=0, dtype=str).columns)
+    incremental = (
+        etat is not None
+        and etat['empreinte_mots_cles'] == empreinte
+        and entete_sortie == colonnes_data + ['decision']
+    )
+    ids_connus = etat['ids'] if incremental else set()
+    deja_traitees = len(ids_connus)
+
+    backend = moteur.choisir_backend(backend, nb_workers)
+    # Pool créé au premier bloc assez grand (voir moteur.filtrer_par_blocs)
+    parallele = backend == 'parallele' and moteur.nombre_workers(nb_workers) > 1
+    pool = None
+
+    gardees = 0
+    nouvelles = 0
+    lues = 0
+    entete_a_ecrire = not incremental
+    # Lignes écrites dans un fichier temporaire, ajoutées au résultat une fois le
+    # filtrage terminé : un arrêt en cours de route ne laisse aucune ligne que le
+    # filtrage suivant, faute d'état à jour, ajouterait une seconde fois
+    descripteur, temporaire = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(fichier_sortie)),
+                                               suffix='.tmp')
+    try:
+        with os.fdopen(descripteur, 'w', encoding='utf-8', newline='') as sortie:
+            lecteur = pd.read_csv(fichier_data, dtype=str, chunksize=taille_bloc)
+            for bloc in moteur.lire_blocs(lecteur, instrumentation):
+                lues += len(bloc)
+                if 'id' in bloc.columns:
+                    nouveaux = masque_ids_nouveaux(bloc['id'], ids_connus, garder_sans_id=not incremental)
+                    if not nouveaux.all():
+                        bloc = bloc[nouveaux].copy()
+
+                if len(bloc):
+                    if parallele and pool is None and len(bloc) >= moteur.SEUIL_PARALLELE:
+                        pool = moteur.creer_pool(automate, nb_workers)
+                    with instrumentation.etape('recherche'):
+                        masque = moteur.calculer_masque_backend(bloc, automate, backend, nb_workers, pool)
+                    with instrumentation.etape('decision'):
+                        moteur.appliquer_decision(bloc, masque)
+                    with instrumentation.etape('ecriture'):
+                        bloc.to_csv(sortie, index=False, header=entete_a_ecrire)
+                    entete_a_ecrire = False
+                    gardees += int(masque.sum())
+                    nouvelles += len(bloc)
+
+                if rappel is not None:
+                    rappel(lues)
+
+            # Data.csv vide : écrire au moins l'en-tête lors d'un filtrage complet
+            # (fin de ligne de pandas, os.linesep, comme les autres lignes)
+            if entete_a_ecrire:
+                csv.writer(sortie, lineterminator=os.linesep).writerow(colonnes_data + ['decision'])
+
+        with instrumentation.etape('ecriture'):
+            with open(temporaire, 'rb') as lignes, open(fichier_sortie, 'ab' if incremental else 'wb') as sortie:
+                shutil.copyfileobj(lignes, sortie)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        os.remove(temporaire)
+
+    # L'état n'est mis à jour qu'une fois le résultat écrit
+    with instrumentation.etape('etat'):
+        ecrire_etat(fichier_etat, empreinte, ids_connus)
+
+    instrumentation.compter('lignes', nouvelles)
+    instrumentation.compter('lignes_lues', lues)
+    instrumentation.compter('gardees', gardees)
+    instrumentation.compter('octets_lus', taille_source(fichier_data))
+
+    return {
+        'gardees': gardees,
+        'rejetees': nouvelles - gardees,
+        'total': nouvelles,
+        'mots_cles': len(automate),
+        'deja_traitees': deja_traitees,
+        'mode': 'incremental' if incremental else 'complet'
+    }
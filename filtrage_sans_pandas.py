@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Filtrage avec la bibliothèque standard uniquement (module csv, sans pandas)
+Pour les chemins où l'import de pandas coûte plus cher que le filtrage lui-même
+(API serverless, petits fichiers). Les mots-clés et les textes analysés sont
+identiques à ceux du moteur pandas : mêmes valeurs manquantes ('nan'), même
+conversion des mots-clés numériques, même normalisation.
+"""
+
+import csv
+import os
+import re
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Union
+
+from automate_mots_cles import (AutomateMotsCles, ReglesChamps, nettoyer_regle, normaliser_texte,
+                                statistiques_mots_cles)
+from deduplication import IdsVus
+
+# Valeurs lues comme manquantes par pandas.read_csv (pandas._libs.parsers.STR_NA_VALUES)
+VALEURS_MANQUANTES = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null',
+})
+
+# Colonnes analysées, comme dans moteur_filtrage.construire_textes
+COLONNE_TITRE = 'title'
+COLONNE_CHAINE = 'channelName'
+
+COLONNE_DECISION = 'decision'
+
+# Colonne identifiant les vidéos, comme moteur_filtrage.COLONNE_ID
+COLONNE_ID = 'id'
+
+# Valeurs de la colonne 'decision' (moteur_filtrage.appliquer_decision), indexées par la décision
+DECISIONS = ('Rejeté', 'Gardé')
+
+# Colonne des mots-clés trouvés, comme moteur_filtrage.COLONNE_CORRESPONDANCES
+COLONNE_CORRESPONDANCES = 'matched_keywords'
+SEPARATEUR_CORRESPONDANCES = '; '
+
+_ENTIER = re.compile(r'\s*[+-]?\d+\s*')
+_REEL = re.compile(r'\s*[+-]?(\d+\.?\d*([eE][+-]?\d+)?|\.\d+([eE][+-]?\d+)?|inf|infinity)\s*', re.IGNORECASE)
+
+
+def convertir_comme_pandas(valeurs: List[Optional[str]]) -> list:
+    """
+    Reproduit l'inférence de type de pandas.read_csv pour une colonne
+
+    Une colonne entièrement numérique devient des entiers ("007" -> 7), ou
+    des réels s'il y a des valeurs manquantes ou décimales ("7" -> 7.0) ;
+    sinon les textes sont conservés. Les valeurs manquantes deviennent None.
+    """
+    presentes = [valeur for valeur in valeurs if valeur is not None and valeur not in VALEURS_MANQUANTES]
+    manquantes = len(presentes) != len(valeurs)
+    resultat: list = [None] * len(valeurs)
+    if presentes and all(_ENTIER.fullmatch(valeur) for valeur in presentes):
+        convertir = (lambda valeur: float(int(valeur))) if manquantes else int
+    elif presentes and all(_REEL.fullmatch(valeur) for valeur in presentes):
+        convertir = float
+    else:
+        convertir = str
+
+    for position, valeur in enumerate(valeurs):
+        if valeur is not None and valeur not in VALEURS_MANQUANTES:
+            resultat[position] = convertir(valeur)
+    return resultat
+
+
+def nettoyer_mots_cles(valeurs: Iterable) -> Set[str]:
+    """
+    Mots-clés normalisés et expressions sous forme canonique (nettoyer_regle),
+    sans valeurs vides ou manquantes
+
+    Raises:
+        ExpressionInvalide: Si une expression booléenne est mal formée
+    """
+    mots_cles = set()
+    for valeur in valeurs:
+        if valeur is not None:
+            mot = nettoyer_regle(str(valeur))
+            if mot:
+                mots_cles.add(mot)
+    return mots_cles
+
+
+def lignes_csv(source: Union[str, IO[str]]) -> Iterator[List[str]]:
+    """Lignes d'un CSV (texte ou fichier texte ouvert), sans les lignes vides comme pandas"""
+    if isinstance(source, str):
+        source = source.lstrip('\ufeff').splitlines(keepends=True)
+    for ligne in csv.reader(source):
+        if ligne:
+            yield ligne
+
+
+def mots_cles_depuis_csv(source: Union[str, IO[str]]) -> Set[str]:
+    """
+    Mots-clés d'un CSV : colonne 'keyword' ou, à défaut, la première colonne
+
+    Même résultat que moteur_filtrage.charger_mots_cles pour les fichiers de
+    mots-clés usuels, sans importer pandas.
+
+    Args:
+        source: Contenu du CSV ou fichier texte ouvert
+
+    Raises:
+        ValueError: Si le CSV est vide
+    """
+    return mots_cles_depuis_lignes(lignes_csv(source))
+
+
+def mots_cles_depuis_lignes(lignes: Iterable[List[str]]) -> Set[str]:
+    """
+    Mots-clés de lignes déjà découpées (en-tête puis valeurs, sans lignes vides)
+
+    Même traitement que mots_cles_depuis_csv, pour des lignes venant d'une
+    autre source (plage d'une feuille de calcul, par exemple).
+
+    Raises:
+        ValueError: S'il n'y a aucune ligne
+    """
+    lignes = iter(lignes)
+    entete = next(lignes, None)
+    if entete is None:
+        raise ValueError("No columns to parse from file")
+
+    colonne = entete.index('keyword') if 'keyword' in entete else 0
+    valeurs = [ligne[colonne] if colonne < len(ligne) else None for ligne in lignes]
+    return nettoyer_mots_cles(convertir_comme_pandas(valeurs))
+
+
+def texte_csv(valeur: Optional[str]) -> str:
+    """Valeur d'un champ CSV telle que lue par pandas avec dtype=str puis formatée ('nan' si manquante)"""
+    return 'nan' if valeur is None or valeur in VALEURS_MANQUANTES else valeur
+
+
+def texteur_csv(entete: Sequence[str]) -> Callable[[Sequence[str]], str]:
+    """
+    Fonction donnant le texte analysé pour les lignes d'un CSV de vidéos
+
+    Le texte est celui de moteur_filtrage.construire_textes :
+    f"{title} {channelName}", chaque partie normalisée (normaliser_texte),
+    '' pour une colonne absente et 'nan' pour une valeur manquante.
+    """
+    colonne_titre = entete.index(COLONNE_TITRE) if COLONNE_TITRE in entete else None
+    colonne_chaine = entete.index(COLONNE_CHAINE) if COLONNE_CHAINE in entete else None
+
+    def champ(ligne: Sequence[str], colonne: Optional[int]) -> str:
+        if colonne is None:
+            return ''
+        return normaliser_texte(texte_csv(ligne[colonne] if colonne < len(ligne) else None))
+
+    def texte(ligne: Sequence[str]) -> str:
+        return f"{champ(ligne, colonne_titre)} {champ(ligne, colonne_chaine)}"
+
+    return texte
+
+
+def textes_champs_csv(entete: Sequence[str], champs: Sequence[str]) -> Callable[[Sequence[str]], List[str]]:
+    """
+    Fonction donnant les textes normalisés des champs d'une ligne (règles par champ)
+
+    Comme moteur_filtrage.construire_textes_champs : une valeur manquante donne ''.
+
+    Raises:
+        ValueError: Si un champ n'est pas une colonne du CSV
+    """
+    absents = [champ for champ in champs if champ not in entete]
+    if absents:
+        raise ValueError(f"Champs absents du fichier: {absents}")
+    colonnes = [entete.index(champ) for champ in champs]
+
+    def textes(ligne: Sequence[str]) -> List[str]:
+        return [normaliser_texte('' if ligne[colonne] in VALEURS_MANQUANTES else ligne[colonne])
+                for colonne in colonnes]
+
+    return textes
+
+
+def decideur_csv(entete: Sequence[str], automate: AutomateMotsCles) -> Callable[[Sequence[str]], bool]:
+    """Fonction de décision (True : gardée) pour les lignes d'un CSV de vidéos (texte : voir texteur_csv)"""
+    texte = texteur_csv(entete)
+    contient = automate.contient
+
+    def decider(ligne: Sequence[str]) -> bool:
+        return contient(texte(ligne))
+
+    return decider
+
+
+def decisions_csv(entete: Sequence[str], lignes: Iterable[Sequence[str]],
+                  automate: AutomateMotsCles) -> Iterator[bool]:
+    """Décision (True : gardée) pour chaque ligne d'un CSV de vidéos (voir decideur_csv)"""
+    return map(decideur_csv(entete, automate), lignes)
+
+
+class CsvNonGere(ValueError):
+    """Le CSV utilise une particularité que seul le lecteur pandas reproduit (colonnes dupliquées, sans nom...)"""
+
+
+def _colonnes_sortie(entete: List[str], colonnes: Optional[List[str]]) -> List[int]:
+    """Positions des colonnes écrites, dans l'ordre de df[colonnes] (toutes si colonnes est None)"""
+    if len(set(entete)) != len(entete) or not all(entete):
+        # pandas renomme les colonnes dupliquées ('a.1') ou sans nom ('Unnamed: 1')
+        raise CsvNonGere("Noms de colonnes dupliqués ou vides")
+    if not colonnes:
+        return list(range(len(entete)))
+    if len(set(colonnes)) != len(colonnes):
+        raise CsvNonGere("Colonnes demandées en double")
+    manquantes = [colonne for colonne in colonnes if colonne not in entete]
+    if manquantes:
+        raise ValueError(f"Colonnes absentes du fichier: {manquantes}")
+    return [entete.index(colonne) for colonne in colonnes]
+
+
+def filtrer_csv(source: IO[str], automate: Union[AutomateMotsCles, ReglesChamps], sortie: IO[str],
+                colonnes: Optional[List[str]] = None, correspondances: bool = False,
+                ids_vus: Optional[IdsVus] = None) -> Dict[str, int]:
+    """
+    Filtre un CSV de vidéos ligne par ligne et écrit le résultat au fil de l'eau
+
+    Produit octet pour octet le fichier de moteur_filtrage.filtrer suivi de
+    DataFrame.to_csv(index=False) : valeurs recopiées telles quelles (lecture
+    avec dtype=str), valeurs manquantes écrites vides, colonne 'decision'
+    ajoutée (ou remplacée si elle existe déjà), même guillemets et même fin de
+    ligne. La mémoire utilisée ne dépend pas de la taille du fichier.
+
+    Args:
+        source: CSV des vidéos ouvert en texte (encoding='utf-8-sig', newline='')
+        automate: Mots-clés compilés, ou règles par champ : colonne du
+            résultat de chaque règle ajoutée après 'decision' (voir
+            moteur_filtrage.filtrer)
+        sortie: Fichier de sortie ouvert en texte (newline='')
+        colonnes: Colonnes à conserver (toutes si None)
+        correspondances: Ajoute la colonne 'matched_keywords' et les
+            statistiques par mot-clé (voir moteur_filtrage.filtrer)
+        ids_vus: Ids déjà vus : les lignes dont l'id a déjà été vu sont
+            écartées avant la recherche (voir moteur_filtrage.filtrer)
+
+    Returns:
+        Statistiques, identiques à celles de moteur_filtrage.statistiques
+
+    Raises:
+        ValueError: Si le CSV est vide ou si des colonnes demandées (ou des
+            champs des règles, ou 'id' pour le dédoublonnage) sont absentes
+        CsvNonGere: Si le résultat de pandas ne peut pas être reproduit ; le
+            fichier de sortie est alors incomplet
+    """
+    # pandas ignore les lignes vides ou faites uniquement d'espaces
+    lignes = (ligne for ligne in csv.reader(source) if len(ligne) > 1 or (ligne and ligne[0].strip()))
+    entete = next(lignes, None)
+    if entete is None:
+        raise ValueError("No columns to parse from file")
+
+    regles = automate if isinstance(automate, ReglesChamps) else None
+    if regles is not None and correspondances:
+        raise ValueError("Les règles par champ ne prennent pas de correspondances")
+    positions = _colonnes_sortie(entete, colonnes)
+    noms = [entete[position] for position in positions]
+    ajoutees = [COLONNE_DECISION] + ([COLONNE_CORRESPONDANCES] if correspondances else [])
+    if regles is not None:
+        ajoutees.extend(regles.colonnes)
+    for nom in ajoutees:
+        if nom not in noms:
+            noms.append(nom)
+    # Colonnes ajoutées (ou remplacées si elles existent déjà), comme DataFrame.assign
+    position_decision = noms.index(COLONNE_DECISION)
+    position_correspondances = noms.index(COLONNE_CORRESPONDANCES) if correspondances else None
+    positions_regles = [noms.index(nom) for nom in regles.colonnes] if regles is not None else []
+    if ids_vus is not None and COLONNE_ID not in entete:
+        raise ValueError(f"Colonne {COLONNE_ID} absente : dédoublonnage impossible")
+    position_id = entete.index(COLONNE_ID) if ids_vus is not None else None
+
+    nb_colonnes = len(entete)
+    ecrivain = csv.writer(sortie, lineterminator=os.linesep)
+    ecrivain.writerow(noms)
+
+    gardees = 0
+    total = 0
+    doublons = 0
+    if regles is not None:
+        textes = textes_champs_csv(entete, regles.champs)
+        trouvees_champs = [0] * len(positions_regles)
+    else:
+        decider = decideur_csv(entete, automate)
+        texte = texteur_csv(entete)
+    occurrences: Dict[str, int] = {}
+    for ligne in lignes:
+        total += 1
+        if len(ligne) > nb_colonnes:
+            # pandas refuse la ligne, ou prend la première colonne pour index
+            raise CsvNonGere(f"Ligne {total + 1} : {len(ligne)} champs pour {nb_colonnes} colonnes")
+        if len(ligne) < nb_colonnes:
+            ligne = ligne + [''] * (nb_colonnes - len(ligne))
+        # Doublon écarté avant la recherche ; une ligne sans id est toujours gardée
+        if (position_id is not None and ligne[position_id] not in VALEURS_MANQUANTES
+                and not ids_vus.nouveau(ligne[position_id])):
+            doublons += 1
+            continue
+
+        if regles is not None:
+            garder, resultats = regles.decider(textes(ligne))
+        elif correspondances:
+            trouves = automate.correspondances(texte(ligne))
+            for mot in trouves:
+                occurrences[mot] = occurrences.get(mot, 0) + 1
+            garder = bool(trouves)
+        else:
+            garder = decider(ligne)
+        gardees += garder
+        # Valeurs manquantes écrites vides, comme les NaN de DataFrame.to_csv
+        valeurs = ['' if ligne[position] in VALEURS_MANQUANTES else ligne[position] for position in positions]
+        valeurs.extend([''] * (len(noms) - len(valeurs)))
+        valeurs[position_decision] = DECISIONS[garder]
+        if correspondances:
+            valeurs[position_correspondances] = SEPARATEUR_CORRESPONDANCES.join(trouves)
+        if regles is not None:
+            for numero, (position, trouvee) in enumerate(zip(positions_regles, resultats)):
+                valeurs[position] = str(trouvee)
+                trouvees_champs[numero] += trouvee
+        ecrivain.writerow(valeurs)
+
+    total -= doublons
+    stats = {
+        'gardees': gardees,
+        'rejetees': total - gardees,
+        'total': total,
+        'mots_cles': len(automate)
+    }
+    if correspondances:
+        stats.update(statistiques_mots_cles(occurrences, automate))
+    if regles is not None:
+        stats['champs'] = dict(zip(regles.colonnes, trouvees_champs))
+    if ids_vus is not None:
+        stats['doublons'] = doublons
+    return stats
@@ -3,42 +3,57 @@
 """
 Programme de filtrage de vidéos basé sur des mots-clés
 Filtre les vidéos du fichier Data.csv en fonction des mots-clés du fichier keywords.csv
+
+Les CSV simples sont filtrés avec la bibliothèque standard (filtrage_sans_pandas),
+sans importer pandas : l'import de pandas coûte plus cher que le filtrage des
+petits fichiers. pandas n'est importé que pour les options qui en ont besoin.
 """
 
-import pandas as pd
+import argparse
+import csv
 import re
 import os
-from typing import List, Set
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from automate_mots_cles import AutomateMotsCles, ReglesChamps, compiler_mots_cles
+from cache_mots_cles import cle_contenu, ecrire_cache, lire_cache
+from deduplication import CAPACITE_BLOOM, IdsVus, creer_ids_vus
+from filtrage_sans_pandas import CsvNonGere, filtrer_csv, mots_cles_depuis_csv
+from formats_donnees import FORMATS, detecter_format
+from instrumentation import INSTRUMENTATION_NULLE, PROFILS, InstrumentationNulle, creer_instrumentation
+
+# Moteurs de recherche de moteur_filtrage.BACKENDS (nommés ici pour ne pas importer pandas)
+BACKENDS = ('automate', 'boucle', 'parallele', 'vectorise')
+
+# Valeurs de --moteur-csv
+MOTEURS_CSV = ('auto', 'pandas', 'standard')
+
 
-def charger_mots_cles(fichier_keywords: str) -> Set[str]:
+def __getattr__(nom: str):
+    # contient_mots_cles reste réexporté, sans importer pandas avec le module
+    if nom == 'contient_mots_cles':
+        from moteur_filtrage import contient_mots_cles
+        return contient_mots_cles
+    raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
+
+def charger_mots_cles(fichier_keywords: str, avec_pandas: bool = True) -> Set[str]:
     """
     Charge les mots-clés depuis le fichier CSV keywords.csv
     
     Args:
         fichier_keywords: Chemin vers le fichier keywords.csv
+        avec_pandas: Lire le fichier avec pandas (sinon avec le module csv, même résultat)
         
     Returns:
-        Set des mots-clés en minuscules pour la comparaison
+        Set des mots-clés normalisés pour la comparaison
     """
     try:
-        # Lire le fichier keywords.csv
-        df_keywords = pd.read_csv(fichier_keywords)
-        
-        # Extraire tous les mots-clés (suppose qu'il y a une colonne 'keyword' ou la première colonne)
-        if 'keyword' in df_keywords.columns:
-            mots_cles = df_keywords['keyword'].tolist()
+        if avec_pandas:
+            import moteur_filtrage as moteur
+            mots_cles_clean = moteur.charger_mots_cles(fichier_keywords)
         else:
-            # Utiliser la première colonne si pas de colonne 'keyword'
-            mots_cles = df_keywords.iloc[:, 0].tolist()
-        
-        # Nettoyer et convertir en minuscules
-        mots_cles_clean = set()
-        for mot in mots_cles:
-            if pd.notna(mot):  # Ignorer les valeurs NaN
-                mot_clean = str(mot).strip().lower()
-                if mot_clean:  # Ignorer les chaînes vides
-                    mots_cles_clean.add(mot_clean)
-        
+            with open(fichier_keywords, 'r', encoding='utf-8-sig', newline='') as fichier:
+                mots_cles_clean = mots_cles_depuis_csv(fichier)
         print(f"[OK] {len(mots_cles_clean)} mots-cles charges depuis {fichier_keywords}")
         return mots_cles_clean
         
@@ -49,31 +64,161 @@ def charger_mots_cles(fichier_keywords: str) -> Set[str]:
         print(f"[ERREUR] Lors du chargement des mots-cles: {e}")
         return set()
 
-def contient_mots_cles(texte: str, mots_cles: Set[str]) -> bool:
+def charger_automate(fichier_keywords: str, avec_pandas: bool = True) -> AutomateMotsCles:
     """
-    Vérifie si un texte contient au moins un des mots-clés
+    Charge les mots-clés compilés, depuis le cache si keywords.csv n'a pas changé
     
     Args:
-        texte: Texte à analyser
-        mots_cles: Set des mots-clés à rechercher
+        fichier_keywords: Chemin vers le fichier keywords.csv
+        avec_pandas: Lire le fichier avec pandas en l'absence de cache
         
     Returns:
-        True si au moins un mot-clé est trouvé, False sinon
+        Automate compilé (vide en cas d'erreur)
     """
-    if pd.isna(texte) or not isinstance(texte, str):
-        return False
+    try:
+        with open(fichier_keywords, 'rb') as fichier:
+            contenu = fichier.read()
+    except FileNotFoundError:
+        print(f"[ERREUR] Fichier {fichier_keywords} non trouve")
+        return compiler_mots_cles(set())
     
-    # Convertir en minuscules et nettoyer
-    texte_clean = str(texte).lower()
+    cle = cle_contenu(contenu)
+    automate = lire_cache(cle)
+    if automate is not None:
+        print(f"[OK] {len(automate)} mots-cles charges depuis le cache ({fichier_keywords})")
+        return automate
     
-    # Rechercher chaque mot-clé dans le texte
-    for mot_cle in mots_cles:
-        if mot_cle in texte_clean:
-            return True
+    automate = compiler_mots_cles(charger_mots_cles(fichier_keywords, avec_pandas))
+    if automate:
+        ecrire_cache(cle, automate)
+    return automate
+
+def charger_regles_champs(champs: List[Tuple[str, str, bool]], avec_pandas: bool = True) -> Optional[ReglesChamps]:
+    """
+    Charge les règles par champ (--champ et --exclure)
+
+    Args:
+        champs: Triplets (champ, fichier des mots-clés, exclusion)
+        avec_pandas: Lire les fichiers avec pandas en l'absence de cache
+
+    Returns:
+        Règles compilées, ou None si un fichier n'a donné aucun mot-clé ou si
+        les règles sont invalides
+    """
+    automates: Dict[str, AutomateMotsCles] = {}
+    for _, fichier, _ in champs:
+        if fichier not in automates:
+            automates[fichier] = charger_automate(fichier, avec_pandas)
+    vides = [fichier for fichier, automate in automates.items() if not automate]
+    if vides:
+        print(f"[ERREUR] Aucun mot-cle dans: {vides}")
+        return None
+    try:
+        return ReglesChamps((champ, automates[fichier], exclure) for champ, fichier, exclure in champs)
+    except ValueError as e:
+        print(f"[ERREUR] {e}")
+        return None
+
+# Colonnes attendues dans Data.csv
+COLONNES_ATTENDUES = ['title', 'id', 'url', 'viewcount', 'date', 'channelName', 'channelUrl', 'numberOfSubscribers', 'duration']
+
+# Nombre de lignes lues à la fois en mode streaming
+TAILLE_BLOC_DEFAUT = 100_000
+
+def verifier_colonnes(colonnes: List[str]):
+    """Signale les colonnes attendues absentes de Data.csv"""
+    colonnes_manquantes = [col for col in COLONNES_ATTENDUES if col not in colonnes]
     
-    return False
+    if colonnes_manquantes:
+        print(f"[ATTENTION] Colonnes manquantes: {colonnes_manquantes}")
+        print(f"Colonnes disponibles: {list(colonnes)}")
+
+def afficher_resultats(fichier_sortie: str, stats: Dict[str, int]):
+    """Affiche les statistiques du filtrage"""
+    print(f"\n[OK] Fichier sauvegarde: {fichier_sortie}")
+    print("Resultats:")
+    print(f"   - Videos gardees: {stats['gardees']}")
+    print(f"   - Videos rejetees: {stats['rejetees']}")
+    print(f"   - Total: {stats['total']}")
+    if 'doublons' in stats:
+        print(f"   - Doublons ecartes (id deja vu): {stats['doublons']}")
+    taux = stats['gardees'] / stats['total'] * 100 if stats['total'] else 0
+    print(f"   - Taux de conservation: {taux:.1f}%")
+    if 'champs' in stats:
+        print("Videos trouvees par regle:")
+        for colonne, videos in stats['champs'].items():
+            print(f"   - {colonne}: {videos} videos")
+    if 'mots_cles_frequents' in stats:
+        print("Mots-cles les plus trouves:")
+        for mot_cle, videos in stats['mots_cles_frequents']:
+            print(f"   - {mot_cle}: {videos} videos")
+        print(f"   - Mots-cles sans aucune video: {stats['mots_cles_sans_correspondance']}")
+
+def raison_pandas(fichier_data: str, fichier_sortie: str, taille_bloc: Optional[int] = None,
+                  nb_workers: int = 1, backend: Optional[str] = None, incremental: bool = False,
+                  format_entree: Optional[str] = None, format_sortie: Optional[str] = None) -> Optional[str]:
+    """
+    Option qui nécessite pandas, ou None si le filtrage peut se passer de pandas
 
-def filtrer_videos(fichier_data: str, fichier_keywords: str, fichier_sortie: str = "videos_filtrees.csv"):
+    Le chemin sans pandas lit et écrit du CSV ligne par ligne avec l'automate,
+    dans un seul processus : il couvre le mode par défaut et --colonnes.
+    """
+    if incremental:
+        return "mode incremental"
+    if taille_bloc:
+        return "mode par blocs"
+    if backend not in (None, 'automate'):
+        return f"moteur de recherche {backend}"
+    if nb_workers != 1:
+        return "plusieurs processus"
+    for fichier, format_donnees in ((fichier_data, format_entree), (fichier_sortie, format_sortie)):
+        format_donnees = detecter_format(fichier, format_donnees)
+        if format_donnees != 'csv':
+            return f"format {format_donnees}"
+    return None
+
+def filtrer_csv_standard(fichier_data: str, automate: Union[AutomateMotsCles, ReglesChamps], fichier_sortie: str,
+                         colonnes: Optional[List[str]] = None,
+                         instrumentation: InstrumentationNulle = INSTRUMENTATION_NULLE,
+                         correspondances: bool = False, ids_vus: Optional[IdsVus] = None) -> Dict[str, int]:
+    """
+    Filtre Data.csv avec la bibliothèque standard, sans importer pandas
+
+    Le fichier de sortie est identique octet pour octet à celui du chemin pandas.
+
+    Raises:
+        CsvNonGere: Si le CSV nécessite pandas
+        Les erreurs de lecture ; le fichier de sortie partiel est alors supprimé
+    """
+    with open(fichier_data, 'r', encoding='utf-8-sig', newline='') as source:
+        if not colonnes:
+            verifier_colonnes(next(csv.reader(source), []))
+            source.seek(0)
+        try:
+            with instrumentation.etape('filtrage'), \
+                    open(fichier_sortie, 'w', encoding='utf-8', newline='') as sortie:
+                stats = filtrer_csv(source, automate, sortie, colonnes, correspondances, ids_vus)
+        except Exception:
+            if os.path.exists(fichier_sortie):
+                os.remove(fichier_sortie)
+            raise
+
+    instrumentation.compter('lignes', stats['total'])
+    instrumentation.compter('gardees', stats['gardees'])
+    instrumentation.compter('octets_lus', os.path.getsize(fichier_data))
+    if 'doublons' in stats:
+        instrumentation.compter('doublons', stats['doublons'])
+    return stats
+
+def filtrer_videos(fichier_data: str, fichier_keywords: str, fichier_sortie: str = "videos_filtrees.csv",
+                   taille_bloc: Optional[int] = None, nb_workers: int = 1, backend: Optional[str] = None,
+                   incremental: bool = False, fichier_etat: Optional[str] = None,
+                   format_entree: Optional[str] = None, format_sortie: Optional[str] = None,
+                   colonnes: Optional[List[str]] = None, moteur_csv: str = 'auto',
+                   correspondances: bool = False, champs: Optional[List[Tuple[str, str, bool]]] = None,
+                   dedoublonner: bool = False, fichier_ids_vus: Optional[str] = None,
+                   bloom: Optional[int] = None,
+                   instrumentation: InstrumentationNulle = INSTRUMENTATION_NULLE):
     """
     Filtre les vidéos en fonction des mots-clés
     
@@ -81,18 +226,173 @@ def filtrer_videos(fichier_data: str, fichier_keywords: str, fichier_sortie: str
         fichier_data: Chemin vers le fichier Data.csv
         fichier_keywords: Chemin vers le fichier keywords.csv
         fichier_sortie: Nom du fichier de sortie
+        taille_bloc: Si renseigné, lit Data.csv par blocs de cette taille
+            (mémoire bornée) au lieu de le charger entièrement
+        nb_workers: Nombre de processus pour la recherche des mots-clés
+            (1 : séquentiel, 0 : tous les cœurs)
+        backend: Moteur de recherche (voir moteur_filtrage.BACKENDS)
+        incremental: Ne filtrer que les vidéos dont l'id n'a pas encore été
+            décidé et les ajouter au fichier de sortie existant
+        fichier_etat: Fichier d'état du mode incrémental
+            (par défaut <fichier_sortie>.etat.json)
+        format_entree: Format de Data.csv ('csv', 'parquet', 'arrow' ; déduit de l'extension si absent)
+        format_sortie: Format du fichier de sortie (déduit de l'extension si absent)
+        colonnes: Colonnes à conserver dans le fichier de sortie (toutes si None)
+        moteur_csv: 'standard' pour filtrer sans pandas, 'pandas', ou 'auto' :
+            sans pandas si aucune option ne le nécessite (voir raison_pandas)
+        correspondances: Ajoute la colonne 'matched_keywords' (tous les
+            mots-clés trouvés) et affiche les mots-clés les plus trouvés
+        champs: Règles par champ (champ, fichier des mots-clés, exclusion)
+            utilisées à la place de fichier_keywords : chaque fichier est
+            recherché dans son seul champ et le résultat de chaque règle est
+            ajouté en colonne ('match_title', 'blocked_channelUrl'...)
+        dedoublonner: Écarte, avant la recherche, les vidéos dont l'id a déjà
+            été vu (seule la première occurrence est gardée)
+        fichier_ids_vus: Fichier des ids vus, relu au début et mis à jour à la
+            fin : les vidéos déjà vues lors des filtrages précédents sont
+            aussi écartées (implique dedoublonner)
+        bloom: Capacité du filtre de Bloom utilisé pour mémoriser les ids
+            (ensemble d'empreintes 64 bits si None)
+        instrumentation: Reçoit les durées des étapes et les compteurs
+            (sans effet par défaut)
     """
     print("Demarrage du filtrage des videos...")
     
-    # Charger les mots-clés
-    mots_cles = charger_mots_cles(fichier_keywords)
-    if not mots_cles:
+    raison = raison_pandas(fichier_data, fichier_sortie, taille_bloc, nb_workers, backend, incremental,
+                           format_entree, format_sortie)
+    if moteur_csv == 'standard' and raison:
+        print(f"[ERREUR] Filtrage sans pandas impossible avec: {raison}")
+        return
+    standard = moteur_csv != 'pandas' and raison is None
+    
+    # Charger les mots-clés compilés une seule fois pour toutes les vidéos
+    with instrumentation.etape('chargement_mots_cles'):
+        if champs:
+            automate = charger_regles_champs(champs, avec_pandas=not standard)
+        else:
+            automate = charger_automate(fichier_keywords, avec_pandas=not standard)
+    if not automate:
         print("❌ Aucun mot-clé chargé. Arrêt du programme.")
         return
+    instrumentation.compter('mots_cles', len(automate))
+    
+    # Les modes par blocs et incrémental lisent et écrivent du CSV en flux
+    if (incremental or taille_bloc) and (
+            detecter_format(fichier_data, format_entree) != 'csv'
+            or detecter_format(fichier_sortie, format_sortie) != 'csv'
+            or colonnes):
+        print("[ERREUR] Les modes par blocs et incremental ne gerent que des CSV complets (sans --colonnes)")
+        return
+    if incremental and (correspondances or champs):
+        print("[ERREUR] Le mode incremental ne gere pas --correspondances ni les regles par champ")
+        return
+    if correspondances and champs:
+        print("[ERREUR] --correspondances ne se combine pas avec --champ/--exclure")
+        return
+    dedoublonner = dedoublonner or bool(fichier_ids_vus) or bloom is not None
+    if incremental and dedoublonner:
+        print("[ERREUR] Le mode incremental ecarte deja les ids traites : dedoublonnage inutile")
+        return
+
+    def nouveaux_ids_vus() -> Optional[IdsVus]:
+        if not dedoublonner:
+            return None
+        ids_vus = creer_ids_vus(fichier_ids_vus, bloom is not None, bloom or CAPACITE_BLOOM)
+        if len(ids_vus):
+            print(f"[OK] {len(ids_vus)} ids deja vus charges depuis {fichier_ids_vus}")
+        return ids_vus
+
+    def enregistrer_ids_vus(ids_vus: Optional[IdsVus]):
+        if fichier_ids_vus and ids_vus is not None:
+            ids_vus.enregistrer(fichier_ids_vus)
+            print(f"[OK] {len(ids_vus)} ids vus enregistres dans {fichier_ids_vus}")
+
+    try:
+        ids_vus = nouveaux_ids_vus()
+    except (OSError, ValueError) as e:
+        print(f"[ERREUR] Lors du chargement des ids vus: {e}")
+        return
+    
+    # Chemin sans pandas : CSV lu et écrit ligne par ligne
+    if standard:
+        print("\nAnalyse des videos (sans pandas)...")
+        try:
+            stats = filtrer_csv_standard(fichier_data, automate, fichier_sortie, colonnes, instrumentation,
+                                         correspondances, ids_vus)
+            print(f"[OK] {stats['total']} videos analysees depuis {fichier_data}")
+            enregistrer_ids_vus(ids_vus)
+            afficher_resultats(fichier_sortie, stats)
+            return
+        except FileNotFoundError:
+            print(f"[ERREUR] Fichier {fichier_data} non trouve")
+            return
+        except CsvNonGere as e:
+            if moteur_csv == 'standard':
+                print(f"[ERREUR] Filtrage sans pandas impossible: {e}")
+                return
+            print(f"[INFO] {e} : filtrage avec pandas")
+            # Les ids vus pendant la tentative sans pandas sont oubliés
+            ids_vus = nouveaux_ids_vus()
+        except Exception as e:
+            print(f"[ERREUR] Lors du filtrage: {e}")
+            return
+    
+    # Les autres modes utilisent pandas, importé seulement ici
+    import moteur_filtrage as moteur
+    from filtrage_incremental import chemin_etat_defaut, filtrer_incremental
+    from formats_donnees import ecrire_donnees, lire_colonnes, lire_donnees
+    
+    # Mode incrémental : seules les nouvelles vidéos sont filtrées
+    if incremental:
+        fichier_etat = fichier_etat or chemin_etat_defaut(fichier_sortie)
+        print(f"\nAnalyse incrementale des videos (etat: {fichier_etat})...")
+        try:
+            verifier_colonnes(lire_colonnes(fichier_data, 'csv'))
+            stats = filtrer_incremental(
+                fichier_data, automate, fichier_sortie, fichier_etat,
+                taille_bloc=taille_bloc or TAILLE_BLOC_DEFAUT, backend=backend, nb_workers=nb_workers,
+                instrumentation=instrumentation
+            )
+        except FileNotFoundError:
+            print(f"[ERREUR] Fichier {fichier_data} non trouve")
+            return
+        except Exception as e:
+            print(f"[ERREUR] Lors du filtrage incremental: {e}")
+            return
+        if stats['mode'] == 'complet':
+            print("[INFO] Premier passage ou mots-cles modifies : filtrage complet")
+        else:
+            print(f"[INFO] {stats['deja_traitees']} videos deja traitees, {stats['total']} nouvelles")
+        afficher_resultats(fichier_sortie, stats)
+        return
+    
+    # Mode streaming : mémoire constante quelle que soit la taille du fichier
+    if taille_bloc:
+        print(f"\nAnalyse des videos par blocs de {taille_bloc} lignes...")
+        try:
+            verifier_colonnes(lire_colonnes(fichier_data, 'csv'))
+            stats = moteur.filtrer_par_blocs(
+                fichier_data, automate, fichier_sortie, taille_bloc,
+                backend=backend, nb_workers=nb_workers,
+                rappel=lambda total: print(f"  Traite {total} videos..."),
+                instrumentation=instrumentation, correspondances=correspondances, ids_vus=ids_vus
+            )
+        except FileNotFoundError:
+            print(f"[ERREUR] Fichier {fichier_data} non trouve")
+            return
+        except Exception as e:
+            print(f"[ERREUR] Lors du filtrage par blocs: {e}")
+            return
+        enregistrer_ids_vus(ids_vus)
+        afficher_resultats(fichier_sortie, stats)
+        return
     
-    # Charger les données des vidéos
+    # Charger les données des vidéos (seulement les colonnes utiles si --colonnes)
     try:
-        df_data = pd.read_csv(fichier_data)
+        with instrumentation.etape('lecture'):
+            df_data = lire_donnees(fichier_data, format_entree, colonnes,
+                                   [champ for champ, _, _ in champs] if champs else None)
+        instrumentation.compter('octets_lus', os.path.getsize(fichier_data))
         print(f"[OK] {len(df_data)} videos chargees depuis {fichier_data}")
     except FileNotFoundError:
         print(f"[ERREUR] Fichier {fichier_data} non trouve")
@@ -101,80 +401,144 @@ def filtrer_videos(fichier_data: str, fichier_keywords: str, fichier_sortie: str
         print(f"[ERREUR] Lors du chargement des donnees: {e}")
         return
     
-    # Vérifier que les colonnes attendues existent
-    colonnes_attendues = ['title', 'id', 'url', 'viewcount', 'date', 'channelName', 'channelUrl', 'numberOfSubscribers', 'duration']
-    colonnes_manquantes = [col for col in colonnes_attendues if col not in df_data.columns]
-    
-    if colonnes_manquantes:
-        print(f"[ATTENTION] Colonnes manquantes: {colonnes_manquantes}")
-        print(f"Colonnes disponibles: {list(df_data.columns)}")
-    
-    # Créer une copie du DataFrame pour éviter de modifier l'original
-    df_resultat = df_data.copy()
-    
-    # Ajouter la colonne de décision
-    df_resultat['decision'] = 'Rejeté'  # Par défaut, toutes les vidéos sont rejetées
-    
-    # Compter les vidéos gardées et rejetées
-    gardees = 0
-    rejetees = 0
+    # Vérifier que les colonnes attendues existent (toutes lues si --colonnes est absent)
+    if not colonnes:
+        verifier_colonnes(list(df_data.columns))
     
     print("\nAnalyse des videos...")
     
-    # Analyser chaque vidéo
-    for index, row in df_data.iterrows():
-        # Vérifier dans le titre et le nom de la chaîne
-        titre = row.get('title', '')
-        channel_name = row.get('channelName', '')
-        
-        # Combiner titre et nom de chaîne pour l'analyse
-        texte_analyse = f"{titre} {channel_name}"
-        
-        if contient_mots_cles(texte_analyse, mots_cles):
-            df_resultat.at[index, 'decision'] = 'Gardé'
-            gardees += 1
-        else:
-            rejetees += 1
-        
-        # Afficher le progrès tous les 100 éléments
-        if (index + 1) % 100 == 0:
-            print(f"  Traite {index + 1}/{len(df_data)} videos...")
+    # Analyser toutes les vidéos (titre + nom de la chaîne, ou chaque champ des règles) avec le moteur choisi
+    try:
+        df_resultat, stats = moteur.filtrer(df_data, automate, backend=backend, nb_workers=nb_workers,
+                                            colonnes=colonnes, instrumentation=instrumentation,
+                                            correspondances=correspondances, ids_vus=ids_vus)
+    except Exception as e:
+        print(f"[ERREUR] Lors du filtrage: {e}")
+        return
     
     # Sauvegarder le résultat
     try:
-        df_resultat.to_csv(fichier_sortie, index=False, encoding='utf-8')
-        print(f"\n[OK] Fichier sauvegarde: {fichier_sortie}")
-        print(f"Resultats:")
-        print(f"   - Videos gardees: {gardees}")
-        print(f"   - Videos rejetees: {rejetees}")
-        print(f"   - Total: {len(df_data)}")
-        print(f"   - Taux de conservation: {(gardees/len(df_data)*100):.1f}%")
+        with instrumentation.etape('ecriture'):
+            ecrire_donnees(df_resultat, fichier_sortie, format_sortie)
+        enregistrer_ids_vus(ids_vus)
+        afficher_resultats(fichier_sortie, stats)
         
     except Exception as e:
         print(f"[ERREUR] Lors de la sauvegarde: {e}")
 
-def main():
+def regle_champ(valeur: str, exclure: bool) -> Tuple[str, str, bool]:
+    """Lit une option CHAMP=FICHIER de --champ ou --exclure"""
+    champ, egal, fichier = valeur.partition('=')
+    if not egal or not champ.strip() or not fichier.strip():
+        raise argparse.ArgumentTypeError(f"CHAMP=FICHIER attendu: {valeur}")
+    return champ.strip(), fichier.strip(), exclure
+
+def parser_arguments(arguments: Optional[List[str]] = None) -> argparse.Namespace:
+    """Lit les options de la ligne de commande"""
+    parser = argparse.ArgumentParser(description="Filtre les vidéos de Data.csv selon les mots-clés de keywords.csv")
+    parser.add_argument('--data', default="Data.csv", help="Fichier des vidéos (défaut: Data.csv)")
+    parser.add_argument('--keywords', default="keywords.csv", help="Fichier des mots-clés (défaut: keywords.csv)")
+    parser.add_argument('--sortie', default="videos_filtrees.csv", help="Fichier de sortie (défaut: videos_filtrees.csv)")
+    parser.add_argument('--taille-bloc', type=int, nargs='?', const=TAILLE_BLOC_DEFAUT, default=None,
+                        help=f"Lit Data.csv par blocs de N lignes pour borner la mémoire (défaut si N omis: {TAILLE_BLOC_DEFAUT})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Nombre de processus pour la recherche des mots-clés (0: tous les cœurs, défaut: 1)")
+    parser.add_argument('--backend', choices=BACKENDS, default=None,
+                        help="Moteur de recherche (défaut: automate, ou parallele si --workers différent de 1)")
+    parser.add_argument('--format-entree', choices=FORMATS, default=None,
+                        help="Format de --data (défaut: déduit de l'extension, .parquet/.arrow/.feather ou CSV)")
+    parser.add_argument('--format-sortie', choices=FORMATS, default=None,
+                        help="Format de --sortie (défaut: déduit de l'extension)")
+    parser.add_argument('--colonnes', type=lambda valeur: [nom.strip() for nom in valeur.split(',') if nom.strip()],
+                        default=None, help="Colonnes à conserver en sortie, séparées par des virgules (ex: id,title,url)")
+    parser.add_argument('--rapport', default=None,
+                        help="Écrit un rapport JSON (durée des étapes, compteurs) dans ce fichier ('-': sortie standard)")
+    parser.add_argument('--profil', choices=PROFILS, default=None,
+                        help="Ajoute au rapport un profil cProfile ou les allocations tracemalloc")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Ne filtre que les vidéos dont l'id est nouveau et les ajoute au fichier de sortie")
+    parser.add_argument('--etat', default=None,
+                        help="Fichier d'état du mode incrémental (défaut: <sortie>.etat.json)")
+    parser.add_argument('--moteur-csv', choices=MOTEURS_CSV, default='auto',
+                        help="Lecture/écriture des CSV : 'standard' sans pandas (démarrage rapide), 'pandas', "
+                             "ou 'auto' : sans pandas si aucune option ne le nécessite (défaut: auto)")
+    parser.add_argument('--correspondances', action='store_true',
+                        help="Ajoute la colonne matched_keywords (tous les mots-clés trouvés) "
+                             "et affiche les mots-clés les plus trouvés")
+    parser.add_argument('--champ', dest='champs', action='append', default=None, metavar='CHAMP=FICHIER',
+                        type=lambda valeur: regle_champ(valeur, exclure=False),
+                        help="Recherche les mots-clés de FICHIER dans la seule colonne CHAMP (répétable, "
+                             "remplace --keywords ; ex: title=keywords.csv)")
+    parser.add_argument('--exclure', dest='champs', action='append', metavar='CHAMP=FICHIER',
+                        type=lambda valeur: regle_champ(valeur, exclure=True),
+                        help="Rejette les vidéos dont la colonne CHAMP contient un mot-clé de FICHIER "
+                             "(répétable ; ex: channelUrl=chaines_bloquees.csv)")
+    parser.add_argument('--dedoublonner', action='store_true',
+                        help="Écarte avant la recherche les vidéos dont l'id a déjà été vu (première occurrence gardée)")
+    parser.add_argument('--ids-vus', default=None, metavar='FICHIER',
+                        help="Mémorise les ids vus dans ce fichier d'un filtrage à l'autre (implique --dedoublonner)")
+    parser.add_argument('--bloom', type=int, nargs='?', const=CAPACITE_BLOOM, default=None, metavar='CAPACITE',
+                        help="Mémorise les ids dans un filtre de Bloom (environ 2 octets par id, 0,1 %% de "
+                             f"faux positifs) prévu pour CAPACITE ids (défaut si omis: {CAPACITE_BLOOM})")
+    return parser.parse_args(arguments)
+
+def main(arguments: Optional[List[str]] = None):
     """Fonction principale"""
+    options = parser_arguments(arguments)
+    
     print("=" * 60)
     print("FILTREUR DE VIDEOS PAR MOTS-CLES")
     print("=" * 60)
     
     # Vérifier que les fichiers existent
-    fichier_data = "Data.csv"
-    fichier_keywords = "keywords.csv"
+    fichier_data = options.data
+    fichier_keywords = options.keywords
     
     if not os.path.exists(fichier_data):
         print(f"[ERREUR] Fichier {fichier_data} non trouve dans le repertoire courant")
-        print("   Assurez-vous que le fichier Data.csv est present")
+        print(f"   Assurez-vous que le fichier {fichier_data} est present")
         return
     
-    if not os.path.exists(fichier_keywords):
-        print(f"[ERREUR] Fichier {fichier_keywords} non trouve dans le repertoire courant")
-        print("   Assurez-vous que le fichier keywords.csv est present")
-        return
+    # Avec --champ/--exclure, les fichiers des règles remplacent keywords.csv
+    for fichier in ([fichier for _, fichier, _ in options.champs] if options.champs else [fichier_keywords]):
+        if not os.path.exists(fichier):
+            print(f"[ERREUR] Fichier {fichier} non trouve dans le repertoire courant")
+            print(f"   Assurez-vous que le fichier {fichier} est present")
+            return
+    
+    # Instrumentation sans effet si aucun rapport n'est demandé
+    instrumentation = creer_instrumentation(
+        actif=options.rapport is not None,
+        profil=options.profil,
+        contexte={
+            'interface': 'cli',
+            'data': fichier_data,
+            # Comme moteur_filtrage.choisir_backend, sans importer pandas
+            'backend': options.backend or ('automate' if options.workers == 1 else 'parallele'),
+            'workers': options.workers,
+            'mode': 'incremental' if options.incremental else ('blocs' if options.taille_bloc else 'memoire'),
+            'moteur_csv': options.moteur_csv,
+            'correspondances': options.correspondances,
+            'champs': [f"{'exclure' if exclure else 'champ'}:{champ}" for champ, _, exclure in options.champs or []],
+            'dedoublonnage': ('bloom' if options.bloom is not None else 'ensemble')
+                             if options.dedoublonner or options.ids_vus or options.bloom is not None else None,
+        }
+    )
+    instrumentation.demarrer()
     
     # Lancer le filtrage
-    filtrer_videos(fichier_data, fichier_keywords)
+    filtrer_videos(fichier_data, fichier_keywords, options.sortie,
+                   taille_bloc=options.taille_bloc, nb_workers=options.workers, backend=options.backend,
+                   incremental=options.incremental, fichier_etat=options.etat,
+                   format_entree=options.format_entree, format_sortie=options.format_sortie,
+                   colonnes=options.colonnes, moteur_csv=options.moteur_csv,
+                   correspondances=options.correspondances, champs=options.champs,
+                   dedoublonner=options.dedoublonner, fichier_ids_vus=options.ids_vus, bloom=options.bloom,
+                   instrumentation=instrumentation)
+    
+    instrumentation.arreter()
+    if instrumentation.actif:
+        instrumentation.ecrire_rapport(options.rapport or '-')
 
 if __name__ == "__main__":
     main()
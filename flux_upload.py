@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lecture en flux d'un formulaire multipart (upload de fichiers)
+Permet de filtrer un fichier envoyé au fur et à mesure de sa réception, sans le
+charger entièrement en mémoire ni l'enregistrer sur disque au préalable.
+"""
+
+import io
+from typing import BinaryIO, Iterator, Optional
+
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+# Taille des lectures sur le flux de la requête
+TAILLE_LECTURE = 64 * 1024
+
+
+class PartieFlux(io.RawIOBase):
+    """
+    Une partie (champ ou fichier) du formulaire, lisible comme un fichier binaire
+
+    Les données sont tirées du flux de la requête à la demande. La partie doit
+    être lue (ou abandonnée) avant de passer à la suivante.
+    """
+
+    def __init__(self, formulaire: 'FormulaireFlux', nom: str, nom_fichier: Optional[str]):
+        super().__init__()
+        self.nom = nom
+        self.nom_fichier = nom_fichier
+        self._formulaire = formulaire
+        self._tampon = b''
+        self._terminee = False
+        self.octets_lus = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, destination) -> int:
+        while not self._tampon and not self._terminee:
+            evenement = self._formulaire._evenement_suivant()
+            if not isinstance(evenement, Data):
+                raise ValueError("Formulaire multipart invalide : données de fichier attendues")
+            self._tampon = evenement.data
+            self._terminee = not evenement.more_data
+
+        taille = min(len(destination), len(self._tampon))
+        destination[:taille] = self._tampon[:taille]
+        self._tampon = self._tampon[taille:]
+        self.octets_lus += taille
+        return taille
+
+    def vider(self):
+        """Consomme le reste de la partie sans le conserver"""
+        while self.read(TAILLE_LECTURE):
+            pass
+
+
+class FormulaireFlux:
+    """
+    Parcourt les parties d'un corps multipart/form-data au fil de la lecture
+
+    Usage :
+        formulaire = FormulaireFlux(request.stream, boundary)
+        for partie in formulaire.parties():
+            if partie.nom == 'data_file':
+                pd.read_csv(partie, chunksize=...)
+    """
+
+    def __init__(self, flux: BinaryIO, frontiere: str, taille_lecture: int = TAILLE_LECTURE):
+        self._flux = flux
+        self._taille_lecture = taille_lecture
+        self._decodeur = MultipartDecoder(frontiere.encode('latin-1'))
+        self._fin_flux = False
+
+    def _evenement_suivant(self):
+        """Événement suivant du décodeur, en lisant le flux autant que nécessaire"""
+        while True:
+            evenement = self._decodeur.next_event()
+            if not isinstance(evenement, NeedData):
+                return evenement
+            if self._fin_flux:
+                raise ValueError("Formulaire multipart tronqué")
+            morceau = self._flux.read(self._taille_lecture)
+            if not morceau:
+                self._fin_flux = True
+                self._decodeur.receive_data(None)
+            else:
+                self._decodeur.receive_data(morceau)
+
+    def parties(self) -> Iterator[PartieFlux]:
+        """Itère sur les parties du formulaire, dans l'ordre d'envoi"""
+        while True:
+            evenement = self._evenement_suivant()
+            if isinstance(evenement, Epilogue):
+                return
+            if isinstance(evenement, (Field, File)):
+                partie = PartieFlux(self, evenement.name, getattr(evenement, 'filename', None))
+                yield partie
+                # Partie non lue entièrement par l'appelant : on la saute
+                partie.vider()
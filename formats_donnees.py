@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lecture et écriture des données vidéos en CSV, Parquet ou Arrow (Feather)
+Les CSV sont lus sans inférence de types (toutes les colonnes en texte) et
+seules les colonnes demandées sont analysées ; Parquet et Arrow nécessitent pyarrow.
+pandas et pyarrow ne sont importés qu'à la lecture ou à l'écriture : detecter_format
+et les constantes restent utilisables par le chemin sans pandas de la ligne de commande.
+"""
+
+import importlib.util
+import os
+from typing import IO, TYPE_CHECKING, List, Optional, Sequence, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Colonnes indispensables à la recherche des mots-clés
+COLONNES_RECHERCHE = ['title', 'channelName']
+
+# Extension -> format
+EXTENSIONS = {
+    '.csv': 'csv',
+    '.parquet': 'parquet',
+    '.pq': 'parquet',
+    '.arrow': 'arrow',
+    '.feather': 'arrow',
+    '.ipc': 'arrow',
+}
+FORMATS = ('csv', 'parquet', 'arrow')
+
+# Détecté sans importer pyarrow (plusieurs centaines de millisecondes)
+PYARROW_DISPONIBLE = importlib.util.find_spec('pyarrow') is not None
+
+Chemin = Union[str, os.PathLike]
+
+
+def detecter_format(chemin: Union[Chemin, IO], format_donnees: Optional[str] = None) -> str:
+    """
+    Format d'un fichier : celui demandé, sinon déduit de l'extension (CSV par défaut)
+
+    Raises:
+        ValueError: Si le format demandé est inconnu
+    """
+    if format_donnees:
+        if format_donnees not in FORMATS:
+            raise ValueError(f"Format inconnu: {format_donnees} (disponibles: {', '.join(FORMATS)})")
+        return format_donnees
+    if isinstance(chemin, (str, os.PathLike)):
+        return EXTENSIONS.get(os.path.splitext(os.fspath(chemin))[1].lower(), 'csv')
+    return 'csv'
+
+
+def _verifier_pyarrow(format_donnees: str):
+    if not PYARROW_DISPONIBLE:
+        raise ImportError(f"Le format {format_donnees} nécessite pyarrow (pip install pyarrow)")
+
+
+def taille_source(source: Union[Chemin, IO]) -> int:
+    """Taille en octets d'un fichier sur disque (0 si inconnue, par exemple pour un flux)"""
+    if isinstance(source, (str, os.PathLike)):
+        try:
+            return os.path.getsize(source)
+        except OSError:
+            return 0
+    return 0
+
+
+def lire_colonnes(source: Union[Chemin, IO], format_donnees: Optional[str] = None) -> List[str]:
+    """Noms des colonnes d'un fichier, sans lire les données"""
+    format_donnees = detecter_format(source, format_donnees)
+    if format_donnees == 'csv':
+        import pandas as pd
+        return list(pd.read_csv(source, nrows=0).columns)
+
+    _verifier_pyarrow(format_donnees)
+    if format_donnees == 'parquet':
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(source).names)
+    import pyarrow.ipc as ipc
+    return list(ipc.open_file(source).schema.names)
+
+
+def colonnes_a_lire(disponibles: List[str], colonnes: Optional[List[str]],
+                    recherche: Optional[Sequence[str]] = None) -> Optional[List[str]]:
+    """
+    Colonnes à charger pour produire `colonnes` en sortie (plus celles de la
+    recherche : `recherche`, ou COLONNES_RECHERCHE par défaut)
+
+    Returns:
+        Liste ordonnée comme dans le fichier, ou None pour toutes les colonnes
+    """
+    if not colonnes:
+        return None
+    manquantes = [colonne for colonne in colonnes if colonne not in disponibles]
+    if manquantes:
+        raise ValueError(f"Colonnes absentes du fichier: {manquantes}")
+    voulues = set(colonnes) | set(COLONNES_RECHERCHE if recherche is None else recherche)
+    return [colonne for colonne in disponibles if colonne in voulues]
+
+
+def lire_donnees(source: Union[Chemin, IO], format_donnees: Optional[str] = None,
+                 colonnes: Optional[List[str]] = None, recherche: Optional[Sequence[str]] = None) -> 'pd.DataFrame':
+    """
+    Lit les données vidéos
+
+    En CSV, toutes les colonnes sont lues comme du texte : les colonnes
+    simplement recopiées ne passent pas par l'inférence de types et sont
+    réécrites telles quelles. (Le lecteur pyarrow de pandas n'est pas utilisé :
+    il convertit les nombres avant d'appliquer dtype=str, "3" devient "3.0".)
+
+    Args:
+        source: Chemin ou fichier ouvert
+        format_donnees: 'csv', 'parquet' ou 'arrow' (déduit de l'extension si absent)
+        colonnes: Colonnes utiles en sortie ; seules celles-ci et les colonnes
+            de recherche sont lues (toutes si None)
+        recherche: Colonnes analysées (COLONNES_RECHERCHE par défaut ; les
+            champs de ReglesChamps)
+
+    Returns:
+        DataFrame des vidéos
+    """
+    import pandas as pd
+    format_donnees = detecter_format(source, format_donnees)
+    usecols = colonnes_a_lire(lire_colonnes(source, format_donnees), colonnes, recherche) if colonnes else None
+    if colonnes and hasattr(source, 'seek'):
+        source.seek(0)
+
+    if format_donnees == 'csv':
+        return pd.read_csv(source, dtype=str, usecols=usecols)
+
+    _verifier_pyarrow(format_donnees)
+    if format_donnees == 'parquet':
+        return pd.read_parquet(source, columns=usecols)
+    return pd.read_feather(source, columns=usecols)
+
+
+def ecrire_donnees(df: 'pd.DataFrame', destination: Union[Chemin, IO], format_donnees: Optional[str] = None):
+    """
+    Écrit le résultat du filtrage au format demandé (déduit de l'extension si absent)
+    """
+    format_donnees = detecter_format(destination, format_donnees)
+    if format_donnees == 'csv':
+        df.to_csv(destination, index=False, encoding='utf-8')
+        return
+
+    _verifier_pyarrow(format_donnees)
+    if format_donnees == 'parquet':
+        df.to_parquet(destination, index=False)
+    else:
+        df.reset_index(drop=True).to_feather(destination)
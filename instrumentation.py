@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Instrumentation du filtrage : chronomètres par étape, compteurs et profilage
+Par défaut, INSTRUMENTATION_NULLE ne fait rien (coût négligeable). Une
+Instrumentation active produit un rapport structuré (dict / JSON) à transmettre
+à un système de métriques.
+"""
+
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from typing import Any, Dict, Optional
+
+# Modes de profilage optionnels
+PROFILS = ('cprofile', 'tracemalloc')
+
+# Nombre de lignes conservées dans les extraits de profil
+LIGNES_PROFIL = 25
+
+_CONTEXTE_NUL = contextlib.nullcontext()
+
+
+class InstrumentationNulle:
+    """Instrumentation par défaut : toutes les opérations sont sans effet"""
+
+    actif = False
+
+    def etape(self, nom: str):
+        """Contexte chronométrant une étape (ici, sans effet)"""
+        return _CONTEXTE_NUL
+
+    def compter(self, nom: str, valeur: int = 1):
+        """Ajoute valeur au compteur nom (ici, sans effet)"""
+
+    def demarrer(self):
+        """Démarre le profilage éventuel (ici, sans effet)"""
+
+    def arreter(self):
+        """Arrête le profilage éventuel (ici, sans effet)"""
+
+    def rapport(self) -> Dict[str, Any]:
+        return {}
+
+
+INSTRUMENTATION_NULLE = InstrumentationNulle()
+
+
+class Instrumentation(InstrumentationNulle):
+    """
+    Instrumentation active
+
+    Usage :
+        instrumentation = Instrumentation(profil='cprofile')
+        instrumentation.demarrer()
+        with instrumentation.etape('lecture'):
+            ...
+        instrumentation.compter('lignes', 1000)
+        instrumentation.arreter()
+        rapport = instrumentation.rapport()
+    """
+
+    actif = True
+
+    def __init__(self, profil: Optional[str] = None, contexte: Optional[Dict[str, Any]] = None):
+        if profil is not None and profil not in PROFILS:
+            raise ValueError(f"Profil inconnu: {profil} (disponibles: {', '.join(PROFILS)})")
+        self.profil = profil
+        self.contexte = dict(contexte or {})
+        self.etapes: Dict[str, float] = {}
+        self.compteurs: Dict[str, int] = {}
+        self._debut: Optional[float] = None
+        self._duree_totale: Optional[float] = None
+        self._profileur: Optional[cProfile.Profile] = None
+        self._extrait_profil: Optional[str] = None
+        self._memoire: Optional[Dict[str, Any]] = None
+
+    @contextlib.contextmanager
+    def etape(self, nom: str):
+        """Chronomètre une étape ; les durées d'une même étape s'additionnent (mode par blocs)"""
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapes[nom] = self.etapes.get(nom, 0.0) + time.perf_counter() - debut
+
+    def compter(self, nom: str, valeur: int = 1):
+        self.compteurs[nom] = self.compteurs.get(nom, 0) + int(valeur)
+
+    def demarrer(self):
+        """Démarre le chronomètre global et le profilage demandé"""
+        self._debut = time.perf_counter()
+        if self.profil == 'cprofile':
+            self._profileur = cProfile.Profile()
+            self._profileur.enable()
+        elif self.profil == 'tracemalloc' and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def arreter(self):
+        """Arrête le profilage et fige les mesures du rapport"""
+        if self._debut is not None:
+            self._duree_totale = time.perf_counter() - self._debut
+
+        if self._profileur is not None:
+            self._profileur.disable()
+            sortie = io.StringIO()
+            pstats.Stats(self._profileur, stream=sortie).sort_stats('cumulative').print_stats(LIGNES_PROFIL)
+            self._extrait_profil = sortie.getvalue()
+            self._profileur = None
+
+        if self.profil == 'tracemalloc' and tracemalloc.is_tracing():
+            courant, pic = tracemalloc.get_traced_memory()
+            allocations = tracemalloc.take_snapshot().statistics('lineno')[:LIGNES_PROFIL]
+            tracemalloc.stop()
+            self._memoire = {
+                'courant_octets': courant,
+                'pic_octets': pic,
+                'principales_allocations': [str(statistique) for statistique in allocations],
+            }
+
+    def rapport(self) -> Dict[str, Any]:
+        """Rapport structuré, sérialisable en JSON"""
+        rapport: Dict[str, Any] = dict(self.contexte)
+        rapport['etapes_s'] = {nom: round(duree, 6) for nom, duree in self.etapes.items()}
+        rapport['compteurs'] = dict(self.compteurs)
+        if self._duree_totale is not None:
+            rapport['total_s'] = round(self._duree_totale, 6)
+            lignes = self.compteurs.get('lignes')
+            if lignes and self._duree_totale > 0:
+                rapport['lignes_par_s'] = round(lignes / self._duree_totale, 1)
+        if self._extrait_profil is not None:
+            rapport['cprofile'] = self._extrait_profil
+        if self._memoire is not None:
+            rapport['tracemalloc'] = self._memoire
+        return rapport
+
+    def ecrire_rapport(self, destination: str):
+        """Écrit le rapport en JSON ('-' : sortie standard)"""
+        contenu = json.dumps(self.rapport(), ensure_ascii=False, indent=2)
+        if destination == '-':
+            print(contenu)
+        else:
+            with open(destination, 'w', encoding='utf-8') as fichier:
+                fichier.write(contenu + '\n')
+
+
+def creer_instrumentation(actif: bool = False, profil: Optional[str] = None,
+                          contexte: Optional[Dict[str, Any]] = None) -> InstrumentationNulle:
+    """Instrumentation active si demandé (ou si un profil est choisi), nulle sinon"""
+    if actif or profil:
+        return Instrumentation(profil, contexte)
+    return INSTRUMENTATION_NULLE
@@ -0,0 +1,912 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Moteur de filtrage partagé par la ligne de commande, Flask et Streamlit
+Compile l'ensemble des mots-clés en un automate d'Aho-Corasick afin d'analyser
+chaque texte en un seul passage, quel que soit le nombre de mots-clés
+
+API :
+    charger_mots_cles(source)            -> set des mots-clés nettoyés
+    compiler_mots_cles(mots_cles)        -> AutomateMotsCles
+    filtrer(df ou chemin, automate, ...) -> (DataFrame avec 'decision', stats)
+    filtrer_compact(df ou chemin, automate, ...) -> ResultatFiltrage (données + masque)
+    ... correspondances=True             -> colonne 'matched_keywords' et vidéos trouvées par mot-clé
+    filtrer(df ou chemin, ReglesChamps(...), ...) -> mots-clés recherchés champ par champ
+    ... ids_vus=EnsembleIds()             -> doublons d'id écartés avant la recherche
+    filtrer_par_blocs(chemin, automate, sortie, ...) -> stats
+
+Moteurs de recherche disponibles (paramètre `backend`) :
+    'boucle'    : boucle Python mot-clé par mot-clé (implémentation de référence)
+    'vectorise' : expression régulière appliquée à toute la colonne par pandas
+    'automate'  : automate d'Aho-Corasick, un seul passage par texte (défaut)
+    'parallele' : automate réparti sur plusieurs processus
+"""
+
+import multiprocessing
+import os
+import threading
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import chain
+from typing import IO, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+import formats_donnees
+from deduplication import IdsVus
+from automate_mots_cles import (AutomateMotsCles, ExpressionInvalide, ReglesChamps,
+                                analyser_expression, compiler_mots_cles, empreinte_mots_cles, est_expression,
+                                nettoyer_regle, normaliser_texte, plan_vrai, statistiques_mots_cles)
+from instrumentation import INSTRUMENTATION_NULLE, InstrumentationNulle
+
+__all__ = [
+    # Réexportés depuis automate_mots_cles (utilisés sous la forme moteur.<nom>)
+    'AutomateMotsCles', 'ExpressionInvalide', 'ReglesChamps', 'compiler_mots_cles', 'empreinte_mots_cles',
+    'normaliser_texte', 'statistiques_mots_cles',
+    # API du moteur
+    'BACKEND_DEFAUT', 'COLONNE_CORRESPONDANCES', 'COLONNE_ID', 'SEPARATEUR_CORRESPONDANCES', 'SEUIL_PARALLELE',
+    'ResultatFiltrage', 'appliquer_decision', 'calculer_champs', 'calculer_champs_backend',
+    'calculer_correspondances', 'calculer_correspondances_backend', 'calculer_masque',
+    'calculer_masque_backend', 'calculer_masque_parallele', 'charger_mots_cles', 'choisir_backend',
+    'construire_textes', 'construire_textes_champs', 'contient_mots_cles', 'creer_pool', 'decision_categorielle',
+    'dedoublonner', 'executer_par_lots', 'filtrer', 'filtrer_compact', 'filtrer_par_blocs', 'lire_blocs',
+    'masque_nouveaux', 'nombre_workers', 'normaliser_colonne', 'statistiques',
+]
+
+
+def normaliser_colonne(serie: pd.Series) -> np.ndarray:
+    """
+    Normalise une colonne entière (voir normaliser_texte)
+
+    Chaque valeur distincte n'est normalisée qu'une fois (les noms de chaîne
+    se répètent beaucoup), puis le résultat est redistribué sur toutes les
+    lignes par indexation. Une valeur manquante donne 'nan', comme f"{valeur}".
+
+    Returns:
+        Tableau d'objets (textes normalisés), aligné sur la série
+    """
+    codes, valeurs = pd.factorize(serie, use_na_sentinel=False)
+    normalisees = np.array([normaliser_texte(f"{valeur}") for valeur in valeurs], dtype=object)
+    return normalisees[codes] if len(codes) else np.array([], dtype=object)
+
+
+def construire_textes(df_data: pd.DataFrame) -> pd.Series:
+    """
+    Construit en une fois la colonne "titre + nom de chaîne" normalisée
+
+    Le texte analysé est `f"{titre} {channel_name}"`, chaque partie étant
+    normalisée (normaliser_texte) colonne par colonne ; une colonne absente
+    donne '' et une valeur manquante 'nan'. Le résultat peut être conservé et
+    passé aux fonctions de recherche (paramètre `textes`) pour filtrer les
+    mêmes données plusieurs fois sans le recalculer.
+
+    Args:
+        df_data: DataFrame des vidéos
+
+    Returns:
+        Série des textes à analyser, alignée sur l'index de df_data
+    """
+    vide = np.full(len(df_data), '', dtype=object)
+    titres = normaliser_colonne(df_data['title']) if 'title' in df_data.columns else vide
+    chaines = normaliser_colonne(df_data['channelName']) if 'channelName' in df_data.columns else vide
+
+    return pd.Series(titres + ' ' + chaines, index=df_data.index, dtype=object)
+
+
+def construire_textes_champs(df_data: pd.DataFrame, champs: Iterable[str]) -> List[np.ndarray]:
+    """
+    Textes normalisés de chaque champ, sans les concaténer (règles par champ)
+
+    Contrairement à construire_textes, une valeur manquante donne '' : elle
+    ne peut être trouvée par aucun mot-clé.
+
+    Raises:
+        ValueError: Si un champ n'est pas une colonne des données
+    """
+    champs = list(champs)
+    absents = [champ for champ in champs if champ not in df_data.columns]
+    if absents:
+        raise ValueError(f"Champs absents du fichier: {absents}")
+    return [normaliser_colonne(df_data[champ].fillna('')) for champ in champs]
+
+
+def decisions_champs(regles: ReglesChamps, lignes: Iterable[Sequence[str]]) -> List[Tuple[bool, Tuple[bool, ...]]]:
+    """Décision et résultat de chaque règle pour des lignes de textes (un texte par champ de regles.champs)"""
+    decider = regles.decider
+    return [decider(textes) for textes in lignes]
+
+
+# Colonne identifiant les vidéos (dédoublonnage)
+COLONNE_ID = 'id'
+
+
+def masque_nouveaux(df_data: pd.DataFrame, ids_vus: IdsVus) -> np.ndarray:
+    """
+    Masque des vidéos dont l'id n'a pas encore été vu (voir deduplication)
+
+    Les ids des vidéos gardées sont ajoutés à ids_vus : une seule occurrence
+    de chaque id est gardée, dans ce DataFrame comme dans les suivants. Une
+    vidéo sans id est toujours gardée.
+
+    Raises:
+        ValueError: Si la colonne 'id' est absente
+    """
+    if COLONNE_ID not in df_data.columns:
+        raise ValueError(f"Colonne {COLONNE_ID} absente : dédoublonnage impossible")
+    serie = df_data[COLONNE_ID]
+    nouveau = ids_vus.nouveau
+    return np.fromiter((manquant or nouveau(f"{valeur}")
+                        for valeur, manquant in zip(serie.to_numpy(), serie.isna().to_numpy())),
+                       dtype=bool, count=len(serie))
+
+
+def dedoublonner(df_data: pd.DataFrame, ids_vus: Optional[IdsVus],
+                 instrumentation: InstrumentationNulle = INSTRUMENTATION_NULLE) -> Tuple[pd.DataFrame, int]:
+    """
+    Écarte les vidéos dont l'id a déjà été vu, avant toute recherche (étape 'dedoublonnage')
+
+    Returns:
+        Tuple (données sans les doublons, nombre de doublons écartés) ; les
+        données sont renvoyées telles quelles sans ids_vus ou sans doublon
+    """
+    if ids_vus is None:
+        return df_data, 0
+    with instrumentation.etape('dedoublonnage'):
+        nouveaux = masque_nouveaux(df_data, ids_vus)
+        doublons = len(nouveaux) - int(nouveaux.sum())
+        if doublons:
+            df_data = df_data[nouveaux]
+    instrumentation.compter('doublons', doublons)
+    return df_data, doublons
+
+
+def calculer_masque(df_data: pd.DataFrame, automate: AutomateMotsCles,
+                    textes: Optional[pd.Series] = None) -> np.ndarray:
+    """
+    Calcule le masque des vidéos gardées pour tout le DataFrame
+
+    Args:
+        df_data: DataFrame des vidéos
+        automate: Mots-clés compilés
+        textes: Textes déjà construits par construire_textes(df_data) (calculés si absents)
+
+    Returns:
+        Tableau booléen, True pour chaque vidéo à garder
+    """
+    if textes is None:
+        textes = construire_textes(df_data)
+    return np.fromiter(automate.masque(textes), dtype=bool, count=len(textes))
+
+
+def appliquer_decision(df_resultat: pd.DataFrame, masque: np.ndarray) -> pd.DataFrame:
+    """Ajoute la colonne 'decision' (Gardé/Rejeté) à partir du masque"""
+    df_resultat['decision'] = np.where(masque, 'Gardé', 'Rejeté')
+    return df_resultat
+
+
+# Valeurs de la colonne 'decision', dans l'ordre alphabétique (même tri que les textes)
+CATEGORIES_DECISION = ['Gardé', 'Rejeté']
+
+
+def decision_categorielle(masque: np.ndarray) -> pd.Categorical:
+    """Colonne 'decision' en catégories : un octet par vidéo au lieu d'une référence à un texte"""
+    return pd.Categorical.from_codes((~np.asarray(masque, dtype=bool)).astype(np.int8),
+                                     categories=CATEGORIES_DECISION)
+
+
+# Colonne des mots-clés trouvés (mode correspondances) et séparateur de ses valeurs
+COLONNE_CORRESPONDANCES = 'matched_keywords'
+SEPARATEUR_CORRESPONDANCES = '; '
+
+
+def correspondances_textes(automate: AutomateMotsCles, textes: Iterable[str]) -> Tuple[List[str], Counter]:
+    """
+    Mots-clés trouvés dans chaque texte et nombre de vidéos par mot-clé, en un seul passage
+
+    Returns:
+        Tuple (valeurs de la colonne 'matched_keywords', '' si aucun mot-clé ;
+        nombre de textes où chaque mot-clé ou expression est vrai)
+    """
+    correspondances = automate.correspondances
+    occurrences: Counter = Counter()
+    colonne = []
+    for texte in textes:
+        trouves = correspondances(texte)
+        occurrences.update(trouves)
+        colonne.append(SEPARATEUR_CORRESPONDANCES.join(trouves))
+    return colonne, occurrences
+
+
+# En dessous de ce nombre de lignes, le démarrage des processus coûte plus
+# cher que le filtrage lui-même
+SEUIL_PARALLELE = 50_000
+
+# Nombre de lots par processus, pour équilibrer la charge entre les cœurs
+LOTS_PAR_WORKER = 4
+
+# Automate partagé par les tâches d'un processus du pool (reçu une seule fois)
+_automate_worker: Union[AutomateMotsCles, ReglesChamps, None] = None
+
+
+def _initialiser_worker(automate: Union[AutomateMotsCles, ReglesChamps]):
+    """Installe l'automate dans le processus du pool au démarrage"""
+    global _automate_worker
+    _automate_worker = automate
+
+
+def _masque_lot(textes: List[str]) -> List[bool]:
+    """Tâche exécutée dans un processus du pool"""
+    return _automate_worker.masque(textes)
+
+
+def _correspondances_lot(textes: List[str]) -> Tuple[List[str], Counter]:
+    """Tâche exécutée dans un processus du pool (mode correspondances)"""
+    return correspondances_textes(_automate_worker, textes)
+
+
+def _champs_lot(lignes: List[Tuple[str, ...]]) -> List[Tuple[bool, Tuple[bool, ...]]]:
+    """Tâche exécutée dans un processus du pool (règles par champ)"""
+    return decisions_champs(_automate_worker, lignes)
+
+
+def nombre_workers(nb_workers: Optional[int] = None) -> int:
+    """Nombre de processus à utiliser (0 ou None : tous les cœurs)"""
+    return nb_workers or os.cpu_count() or 1
+
+
+def creer_pool(automate: Union[AutomateMotsCles, ReglesChamps], nb_workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    Crée un pool de processus partageant l'automate compilé
+
+    L'automate est transmis une seule fois à chaque processus lors de son
+    initialisation, au lieu d'être sérialisé avec chaque tâche. Si d'autres
+    threads tournent (serveur web : file de travaux, nettoyage), les processus
+    sont démarrés par 'spawn' : un fork copierait les verrous qu'ils tiennent
+    et pourrait bloquer. Sinon, le démarrage par défaut (plus rapide) est gardé.
+
+    Args:
+        automate: Mots-clés compilés (ou règles par champ)
+        nb_workers: Nombre de processus (0 ou None : tous les cœurs)
+
+    Returns:
+        Pool à réutiliser pour plusieurs appels à calculer_masque_parallele
+    """
+    return ProcessPoolExecutor(
+        max_workers=nombre_workers(nb_workers),
+        mp_context=multiprocessing.get_context('spawn') if threading.active_count() > 1 else None,
+        initializer=_initialiser_worker,
+        initargs=(automate,)
+    )
+
+
+def calculer_masque_parallele(df_data: pd.DataFrame, automate: AutomateMotsCles,
+                              nb_workers: Optional[int] = None,
+                              pool: Optional[Executor] = None,
+                              textes: Optional[pd.Series] = None) -> np.ndarray:
+    """
+    Calcule le masque des vidéos gardées en répartissant les lignes sur plusieurs cœurs
+
+    Les lignes sont découpées en lots contigus ; les résultats sont réassemblés
+    dans l'ordre d'origine. Sans pool fourni, les petits fichiers (ou un seul
+    worker) sont traités directement dans le processus courant.
+
+    Args:
+        df_data: DataFrame des vidéos
+        automate: Mots-clés compilés (doit être celui du pool s'il est fourni)
+        nb_workers: Nombre de processus (0 ou None : tous les cœurs)
+        pool: Pool créé par creer_pool, réutilisé d'un appel à l'autre
+        textes: Textes déjà construits par construire_textes(df_data) (calculés si absents)
+
+    Returns:
+        Tableau booléen, True pour chaque vidéo à garder
+    """
+    nb_workers = nombre_workers(nb_workers)
+    if pool is None and (nb_workers <= 1 or len(df_data) < SEUIL_PARALLELE):
+        return calculer_masque(df_data, automate, textes)
+
+    textes = (construire_textes(df_data) if textes is None else textes).tolist()
+    resultats = executer_par_lots(_masque_lot, textes, automate, nb_workers, pool)
+    return np.fromiter(chain.from_iterable(resultats), dtype=bool, count=len(textes))
+
+
+def executer_par_lots(tache: Callable[[list], object], elements: list,
+                      automate: Union[AutomateMotsCles, ReglesChamps], nb_workers: int,
+                      pool: Optional[Executor] = None) -> list:
+    """
+    Répartit des lots contigus d'éléments sur les processus du pool
+
+    Args:
+        tache: Fonction exécutée dans un processus du pool pour chaque lot
+        elements: Éléments à traiter (textes, lignes...)
+        automate: Mots-clés du pool temporaire créé si aucun pool n'est fourni
+        nb_workers: Nombre de processus
+        pool: Pool créé par creer_pool
+
+    Returns:
+        Résultat de chaque lot, dans l'ordre des éléments
+    """
+    taille_lot = max(1, -(-len(elements) // (nb_workers * LOTS_PAR_WORKER)))
+    lots = [elements[debut:debut + taille_lot] for debut in range(0, len(elements), taille_lot)]
+    if pool is None:
+        with creer_pool(automate, nb_workers) as pool_temporaire:
+            return list(pool_temporaire.map(tache, lots))
+    return list(pool.map(tache, lots))
+
+
+def calculer_correspondances(df_data: pd.DataFrame, automate: AutomateMotsCles,
+                             nb_workers: Optional[int] = 1, pool: Optional[Executor] = None,
+                             textes: Optional[pd.Series] = None) -> Tuple[np.ndarray, np.ndarray, Counter]:
+    """
+    Masque, mots-clés trouvés et vidéos par mot-clé, calculés pendant le même passage
+
+    Chaque texte est parcouru en entier par l'automate (pas d'arrêt au premier
+    mot-clé) ; avec un pool ou plusieurs workers, les lots sont répartis comme
+    dans calculer_masque_parallele et les compteurs additionnés.
+
+    Returns:
+        Tuple (masque des vidéos gardées, colonne 'matched_keywords',
+        nombre de vidéos trouvées par mot-clé)
+    """
+    textes = (construire_textes(df_data) if textes is None else textes).tolist()
+    nb_workers = nombre_workers(nb_workers)
+    if pool is None and (nb_workers <= 1 or len(textes) < SEUIL_PARALLELE):
+        colonne, occurrences = correspondances_textes(automate, textes)
+    else:
+        resultats = executer_par_lots(_correspondances_lot, textes, automate, nb_workers, pool)
+        colonne = list(chain.from_iterable(valeurs for valeurs, _ in resultats))
+        occurrences = sum((compteur for _, compteur in resultats), Counter())
+
+    colonne = np.array(colonne, dtype=object)
+    return colonne != '', colonne, occurrences
+
+
+def calculer_champs(df_data: pd.DataFrame, regles: ReglesChamps, nb_workers: Optional[int] = 1,
+                    pool: Optional[Executor] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Masque et résultat de chaque règle par champ, en un seul passage sur les lignes
+
+    Chaque champ est normalisé colonne par colonne puis, ligne par ligne,
+    parcouru par les automates de ses règles : aucun texte concaténé n'est
+    construit. Avec un pool ou plusieurs workers, les lots de lignes sont
+    répartis comme dans calculer_masque_parallele.
+
+    Returns:
+        Tuple (masque des vidéos gardées, {colonne de la règle: tableau booléen})
+    """
+    lignes = list(zip(*construire_textes_champs(df_data, regles.champs)))
+    nb_workers = nombre_workers(nb_workers)
+    if pool is None and (nb_workers <= 1 or len(lignes) < SEUIL_PARALLELE):
+        decisions = decisions_champs(regles, lignes)
+    else:
+        decisions = list(chain.from_iterable(executer_par_lots(_champs_lot, lignes, regles, nb_workers, pool)))
+
+    masque = np.fromiter((garder for garder, _ in decisions), dtype=bool, count=len(decisions))
+    resultats = np.array([resultats for _, resultats in decisions], dtype=bool).reshape(len(decisions),
+                                                                                           len(regles.colonnes))
+    return masque, {colonne: resultats[:, numero] for numero, colonne in enumerate(regles.colonnes)}
+
+
+# Type accepté pour les sources de données : DataFrame, chemin ou fichier ouvert
+Source = Union[pd.DataFrame, str, os.PathLike, IO]
+
+# Moteur utilisé quand aucun n'est précisé et qu'un seul processus est demandé
+BACKEND_DEFAUT = 'automate'
+
+
+def charger_mots_cles(source: Union[str, os.PathLike, IO]) -> Set[str]:
+    """
+    Charge les mots-clés depuis un CSV (colonne 'keyword' ou, à défaut, la première colonne)
+
+    Args:
+        source: Chemin ou fichier ouvert contenant le CSV des mots-clés
+
+    Returns:
+        Set des mots-clés normalisés (normaliser_texte) et des expressions
+        booléennes sous forme canonique (nettoyer_regle), sans valeurs vides
+
+    Raises:
+        ExpressionInvalide: Si une expression booléenne est mal formée
+        Les exceptions de pandas.read_csv (fichier absent, CSV invalide...)
+    """
+    df_keywords = pd.read_csv(source)
+
+    if 'keyword' in df_keywords.columns:
+        mots_cles = df_keywords['keyword'].tolist()
+    else:
+        mots_cles = df_keywords.iloc[:, 0].tolist()
+
+    # Normaliser comme les textes analysés (casse, accents, espaces)
+    mots_cles_clean = set()
+    for mot in mots_cles:
+        if pd.notna(mot):
+            mot_clean = nettoyer_regle(str(mot))
+            if mot_clean:
+                mots_cles_clean.add(mot_clean)
+
+    return mots_cles_clean
+
+
+def contient_mots_cles(texte: str, mots_cles: Union[Set[str], AutomateMotsCles]) -> bool:
+    """
+    Vérifie si un texte contient au moins un des mots-clés
+
+    Args:
+        texte: Texte à analyser
+        mots_cles: Automate compilé (recommandé) ou set des mots-clés (et expressions) à rechercher
+
+    Returns:
+        True si au moins un mot-clé est trouvé, False sinon
+    """
+    if pd.isna(texte) or not isinstance(texte, str):
+        return False
+
+    texte_clean = normaliser_texte(texte)
+
+    # Automate compilé : un seul passage sur le texte
+    if isinstance(mots_cles, AutomateMotsCles):
+        return mots_cles.contient(texte_clean)
+
+    for mot_cle in mots_cles:
+        if est_expression(mot_cle):
+            if plan_vrai(analyser_expression(mot_cle), texte_clean):
+                return True
+        elif mot_cle in texte_clean:
+            return True
+
+    return False
+
+
+def _masque_boucle(df_data: pd.DataFrame, automate: AutomateMotsCles,
+                   textes: Optional[pd.Series] = None, **_options) -> np.ndarray:
+    """Moteur 'boucle' : teste chaque mot-clé (puis chaque expression) sur chaque texte"""
+    mots_cles = automate.simples
+    plans = automate.plans
+    if textes is None:
+        textes = construire_textes(df_data)
+    return np.fromiter(
+        (any(mot_cle in texte for mot_cle in mots_cles) or any(plan_vrai(plan, texte) for plan in plans)
+         for texte in textes),
+        dtype=bool,
+        count=len(textes)
+    )
+
+
+def _masque_plan(plan, presences: Dict[str, np.ndarray]) -> np.ndarray:
+    """Évalue un plan d'expression colonne entière, à partir de la présence de chaque terme"""
+    nature, contenu = plan
+    if nature == 'terme':
+        return presences[contenu]
+    if nature == 'non':
+        return ~_masque_plan(contenu, presences)
+    operation = np.logical_and if nature == 'et' else np.logical_or
+    return operation.reduce([_masque_plan(sous_plan, presences) for sous_plan in contenu])
+
+
+def _masque_vectorise(df_data: pd.DataFrame, automate: AutomateMotsCles,
+                      textes: Optional[pd.Series] = None, **_options) -> np.ndarray:
+    """
+    Moteur 'vectorise' : une expression régulière appliquée à toute la colonne
+
+    Les expressions booléennes sont évaluées avec des opérations numpy sur la
+    présence de chacun de leurs termes (une recherche littérale par terme).
+    """
+    if textes is None:
+        textes = construire_textes(df_data)
+    masque = np.zeros(len(textes), dtype=bool)
+    if automate.simples:
+        masque |= textes.str.contains(automate.expression(), regex=True).to_numpy(dtype=bool)
+    if automate.plans:
+        presences = {terme: textes.str.contains(terme, regex=False).to_numpy(dtype=bool)
+                     for terme in automate.termes}
+        for plan in automate.plans:
+            masque |= _masque_plan(plan, presences)
+    return masque
+
+
+def _masque_automate(df_data: pd.DataFrame, automate: AutomateMotsCles,
+                     textes: Optional[pd.Series] = None, **_options) -> np.ndarray:
+    """Moteur 'automate' : Aho-Corasick dans le processus courant"""
+    return calculer_masque(df_data, automate, textes)
+
+
+def _masque_parallele(df_data: pd.DataFrame, automate: AutomateMotsCles,
+                      nb_workers: Optional[int] = None, pool: Optional[Executor] = None,
+                      textes: Optional[pd.Series] = None) -> np.ndarray:
+    """Moteur 'parallele' : Aho-Corasick réparti sur un pool de processus"""
+    return calculer_masque_parallele(df_data, automate, nb_workers, pool=pool, textes=textes)
+
+
+# Registre des moteurs : nom -> fonction (df_data, automate, nb_workers=, pool=, textes=) -> masque
+BACKENDS: Dict[str, Callable[..., np.ndarray]] = {
+    'boucle': _masque_boucle,
+    'vectorise': _masque_vectorise,
+    'automate': _masque_automate,
+    'parallele': _masque_parallele,
+}
+
+
+def choisir_backend(backend: Optional[str] = None, nb_workers: Optional[int] = 1) -> str:
+    """
+    Valide le nom du moteur ; sans précision, 'parallele' si plusieurs processus sont demandés
+
+    Raises:
+        ValueError: Si le moteur est inconnu
+    """
+    if backend is None:
+        return BACKEND_DEFAUT if nb_workers == 1 else 'parallele'
+    if backend not in BACKENDS:
+        raise ValueError(f"Moteur inconnu: {backend} (disponibles: {', '.join(BACKENDS)})")
+    return backend
+
+
+def calculer_masque_backend(df_data: pd.DataFrame, automate: AutomateMotsCles,
+                            backend: Optional[str] = None, nb_workers: Optional[int] = 1,
+                            pool: Optional[Executor] = None, textes: Optional[pd.Series] = None) -> np.ndarray:
+    """Calcule le masque des vidéos gardées avec le moteur choisi (textes : voir construire_textes)"""
+    backend = choisir_backend(backend, nb_workers)
+    return BACKENDS[backend](df_data, automate, nb_workers=nb_workers, pool=pool, textes=textes)
+
+
+def calculer_correspondances_backend(df_data: pd.DataFrame, automate: AutomateMotsCles,
+                                     backend: Optional[str] = None, nb_workers: Optional[int] = 1,
+                                     pool: Optional[Executor] = None,
+                                     textes: Optional[pd.Series] = None) -> Tuple[np.ndarray, np.ndarray, Counter]:
+    """
+    calculer_correspondances pour le moteur choisi
+
+    Seul l'automate sait énumérer tous les mots-clés d'un texte : le moteur
+    'parallele' répartit ce calcul sur ses processus, les autres moteurs le
+    font dans le processus courant.
+    """
+    if choisir_backend(backend, nb_workers) != 'parallele':
+        nb_workers, pool = 1, None
+    return calculer_correspondances(df_data, automate, nb_workers, pool, textes)
+
+
+def calculer_champs_backend(df_data: pd.DataFrame, regles: ReglesChamps,
+                            backend: Optional[str] = None, nb_workers: Optional[int] = 1,
+                            pool: Optional[Executor] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    calculer_champs pour le moteur choisi
+
+    Les règles par champ sont toujours évaluées par leurs automates : le
+    moteur 'parallele' répartit les lignes sur ses processus, les autres
+    moteurs les traitent dans le processus courant.
+    """
+    if choisir_backend(backend, nb_workers) != 'parallele':
+        nb_workers, pool = 1, None
+    return calculer_champs(df_data, regles, nb_workers, pool)
+
+
+def statistiques(masque: np.ndarray, automate: Union[AutomateMotsCles, ReglesChamps],
+                 occurrences: Optional[Dict[str, int]] = None,
+                 resultats_champs: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, int]:
+    """
+    Compteurs du filtrage au format attendu par les interfaces
+
+    Plus les mots-clés les plus trouvés en mode correspondances et, avec des
+    règles par champ, le nombre de vidéos trouvées par chaque règle ('champs').
+    """
+    gardees = int(masque.sum())
+    stats = {
+        'gardees': gardees,
+        'rejetees': len(masque) - gardees,
+        'total': len(masque),
+        'mots_cles': len(automate)
+    }
+    if occurrences is not None:
+        stats.update(statistiques_mots_cles(occurrences, automate))
+    if resultats_champs is not None:
+        stats['champs'] = {colonne: int(valeurs.sum()) for colonne, valeurs in resultats_champs.items()}
+    return stats
+
+
+class ResultatFiltrage:
+    """
+    Résultat compact d'un filtrage : les données d'origine et un masque booléen
+
+    Les données ne sont pas copiées et la colonne 'decision' n'existe pas en
+    mémoire : elle est produite (en catégories) seulement pour les lignes
+    exportées ou affichées. Le résultat occupe ainsi un octet par vidéo en plus
+    des données déjà chargées, au lieu d'une copie complète du DataFrame.
+
+    Les lignes sont désignées par leur position (tableaux d'entiers), ce qui
+    permet de mettre en cache des sélections et des tris sans copier de données.
+
+    En mode correspondances, `correspondances` contient la colonne
+    'matched_keywords' et `occurrences` le nombre de vidéos trouvées par
+    mot-clé (None sinon). Avec des règles par champ, `resultats_champs`
+    contient le résultat de chaque règle ({'match_title': tableau booléen...}),
+    exporté après 'decision'.
+    """
+
+    __slots__ = ('donnees', 'masque', 'stats', 'correspondances', 'occurrences', 'resultats_champs')
+
+    def __init__(self, donnees: pd.DataFrame, masque: np.ndarray, stats: Dict[str, int],
+                 correspondances: Optional[np.ndarray] = None, occurrences: Optional[Counter] = None,
+                 resultats_champs: Optional[Dict[str, np.ndarray]] = None):
+        self.donnees = donnees
+        self.masque = np.asarray(masque, dtype=bool)
+        self.stats = stats
+        self.correspondances = correspondances
+        self.occurrences = occurrences
+        self.resultats_champs = resultats_champs
+
+    def __len__(self) -> int:
+        return len(self.masque)
+
+    def _ajoutees(self) -> List[str]:
+        """Colonnes calculées : 'decision', puis 'matched_keywords' ou le résultat de chaque règle par champ"""
+        ajoutees = ['decision']
+        if self.correspondances is not None:
+            ajoutees.append(COLONNE_CORRESPONDANCES)
+        if self.resultats_champs is not None:
+            ajoutees.extend(self.resultats_champs)
+        return ajoutees
+
+    def _valeurs_ajoutees(self, nom: str, positions: Optional[np.ndarray] = None, categorielle: bool = True):
+        """Valeurs d'une colonne calculée pour les positions données"""
+        if nom == 'decision':
+            masque = self.masque if positions is None else self.masque[positions]
+            return decision_categorielle(masque) if categorielle else np.where(masque, 'Gardé', 'Rejeté')
+        valeurs = self.correspondances if nom == COLONNE_CORRESPONDANCES else self.resultats_champs[nom]
+        return valeurs if positions is None else valeurs[positions]
+
+    @property
+    def colonnes(self) -> List[str]:
+        """Colonnes du résultat exporté (données puis colonnes calculées, voir _ajoutees)"""
+        colonnes = list(self.donnees.columns)
+        return colonnes + [nom for nom in self._ajoutees() if nom not in colonnes]
+
+    def positions(self, decision: Optional[str] = None) -> np.ndarray:
+        """Positions des vidéos ayant la décision donnée (toutes si None ou "Tous")"""
+        if decision in (None, "Tous"):
+            return np.arange(len(self.masque))
+        if decision not in CATEGORIES_DECISION:
+            raise ValueError(f"Décision inconnue: {decision} (disponibles: {', '.join(CATEGORIES_DECISION)})")
+        return np.flatnonzero(self.masque if decision == 'Gardé' else ~self.masque)
+
+    def colonne(self, nom: str, positions: Optional[np.ndarray] = None) -> pd.Series:
+        """Une colonne du résultat (colonnes calculées comprises) pour les positions données"""
+        if nom in self._ajoutees():
+            index = self.donnees.index if positions is None else self.donnees.index[positions]
+            return pd.Series(self._valeurs_ajoutees(nom, positions), index=index, name=nom)
+        serie = self.donnees[nom]
+        return serie if positions is None else serie.iloc[positions]
+
+    def trier(self, positions: np.ndarray, colonne: str, decroissant: bool = False) -> np.ndarray:
+        """
+        Positions réordonnées selon une colonne (tri stable, valeurs manquantes en dernier)
+
+        Une colonne lue en texte dont toutes les valeurs sont des nombres
+        ('viewcount'...) est triée comme des nombres.
+        """
+        valeurs = self.colonne(colonne, positions).reset_index(drop=True)
+        if valeurs.dtype == object or pd.api.types.is_string_dtype(valeurs.dtype):
+            nombres = pd.to_numeric(valeurs, errors='coerce')
+            if nombres.notna().sum() == valeurs.notna().sum():
+                valeurs = nombres
+        ordre = valeurs.sort_values(ascending=not decroissant, kind='stable', na_position='last').index
+        return positions[ordre.to_numpy()]
+
+    def en_dataframe(self, positions: Optional[np.ndarray] = None, categorielle: bool = True) -> pd.DataFrame:
+        """
+        DataFrame exporté : les données avec la colonne 'decision' (et les autres colonnes calculées)
+
+        Args:
+            positions: Lignes à exporter, dans cet ordre (toutes si None)
+            categorielle: 'decision' en catégories (sinon en textes, comme appliquer_decision)
+        """
+        donnees = self.donnees if positions is None else self.donnees.iloc[positions]
+        return donnees.assign(**{nom: self._valeurs_ajoutees(nom, positions, categorielle)
+                                 for nom in self._ajoutees()})
+
+    def vers_csv(self, destination: Union[str, os.PathLike, IO, None] = None,
+                 positions: Optional[np.ndarray] = None) -> Optional[str]:
+        """CSV des lignes demandées, identique à celui d'un filtrage classique"""
+        return self.en_dataframe(positions).to_csv(destination, index=False)
+
+
+def filtrer_compact(donnees: Source, automate: Union[AutomateMotsCles, ReglesChamps], backend: Optional[str] = None,
+                    nb_workers: Optional[int] = 1, pool: Optional[Executor] = None,
+                    format_donnees: Optional[str] = None, colonnes: Optional[List[str]] = None,
+                    instrumentation: InstrumentationNulle = INSTRUMENTATION_NULLE,
+                    textes: Optional[pd.Series] = None, correspondances: bool = False,
+                    ids_vus: Optional[IdsVus] = None) -> ResultatFiltrage:
+    """
+    Filtre les vidéos sans copier les données (voir ResultatFiltrage)
+
+    Mêmes paramètres que filtrer ; avec `colonnes`, le résultat ne référence
+    que ces colonnes. `textes` (construire_textes des mêmes données) évite de
+    renormaliser des données déjà filtrées avec d'autres mots-clés.
+    """
+    par_champ = isinstance(automate, ReglesChamps)
+    if par_champ and (correspondances or textes is not None):
+        raise ValueError("Les règles par champ ne prennent ni correspondances ni textes concaténés")
+    if ids_vus is not None and textes is not None:
+        raise ValueError("Le dédoublonnage ne prend pas de textes déjà construits")
+    if isinstance(donnees, pd.DataFrame):
+        df_data = donnees
+    else:
+        with instrumentation.etape('lecture'):
+            df_data = formats_donnees.lire_donnees(donnees, format_donnees, colonnes,
+                                                   automate.champs if par_champ else None)
+        instrumentation.compter('octets_lus', formats_donnees.taille_source(donnees))
+    df_data, doublons = dedoublonner(df_data, ids_vus, instrumentation)
+
+    colonne = occurrences = resultats_champs = None
+    with instrumentation.etape('recherche'):
+        if par_champ:
+            masque, resultats_champs = calculer_champs_backend(df_data, automate, backend, nb_workers, pool)
+        elif correspondances:
+            masque, colonne, occurrences = calculer_correspondances_backend(df_data, automate, backend, nb_workers,
+                                                                            pool, textes)
+        else:
+            masque = calculer_masque_backend(df_data, automate, backend, nb_workers, pool, textes)
+
+    stats = statistiques(masque, automate, occurrences, resultats_champs)
+    if ids_vus is not None:
+        stats['doublons'] = doublons
+    instrumentation.compter('lignes', stats['total'])
+    instrumentation.compter('gardees', stats['gardees'])
+    return ResultatFiltrage(df_data[colonnes] if colonnes else df_data, masque, stats, colonne, occurrences,
+                            resultats_champs)
+
+
+def filtrer(donnees: Source, automate: Union[AutomateMotsCles, ReglesChamps], backend: Optional[str] = None,
+            nb_workers: Optional[int] = 1, pool: Optional[Executor] = None,
+            format_donnees: Optional[str] = None, colonnes: Optional[List[str]] = None,
+            instrumentation: InstrumentationNulle = INSTRUMENTATION_NULLE,
+            correspondances: bool = False, ids_vus: Optional[IdsVus] = None) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Filtre les vidéos en fonction des mots-clés compilés
+
+    Args:
+        donnees: DataFrame des vidéos, ou chemin/fichier (CSV, Parquet, Arrow) à lire
+        automate: Mots-clés compilés, recherchés dans "titre + nom de chaîne",
+            ou ReglesChamps : mots-clés recherchés champ par champ, le résultat
+            de chaque règle étant ajouté en colonne ('match_title'...)
+        backend: Moteur de recherche (voir BACKENDS)
+        nb_workers: Nombre de processus pour le moteur 'parallele' (0 : tous les cœurs)
+        pool: Pool de creer_pool à réutiliser pour le moteur 'parallele'
+        format_donnees: Format du fichier lu (déduit de l'extension si absent)
+        colonnes: Colonnes à conserver dans le résultat (toutes si None) ;
+            à la lecture d'un fichier, seules ces colonnes et celles de la
+            recherche sont chargées
+        instrumentation: Reçoit les durées des étapes 'lecture', 'recherche'
+            et 'decision' et les compteurs lignes, gardees et octets_lus
+        correspondances: Ajoute la colonne 'matched_keywords' (tous les
+            mots-clés et expressions trouvés, séparés par '; ') et, aux
+            statistiques, les mots-clés les plus trouvés ; la recherche se fait
+            alors avec l'automate (en parallèle pour le moteur 'parallele')
+        ids_vus: Ids déjà vus (deduplication.creer_ids_vus) : les vidéos dont
+            l'id a déjà été vu, dans ces données ou lors d'un filtrage
+            précédent, sont écartées avant la recherche et comptées dans
+            stats['doublons'] ; les ids des autres y sont ajoutés
+
+    Returns:
+        Tuple (copie des données avec la colonne 'decision', statistiques)
+    """
+    resultat = filtrer_compact(donnees, automate, backend, nb_workers, pool, format_donnees, colonnes,
+                               instrumentation, correspondances=correspondances, ids_vus=ids_vus)
+    with instrumentation.etape('decision'):
+        df_resultat = resultat.en_dataframe(categorielle=False)
+    return df_resultat, resultat.stats
+
+
+def lire_blocs(lecteur: Iterable[pd.DataFrame],
+               instrumentation: InstrumentationNulle = INSTRUMENTATION_NULLE) -> Iterable[pd.DataFrame]:
+    """Parcourt un lecteur par blocs en chronométrant la lecture de chaque bloc (étape 'lecture')"""
+    iterateur = iter(lecteur)
+    while True:
+        with instrumentation.etape('lecture'):
+            bloc = next(iterateur, None)
+        if bloc is None:
+            return
+        yield bloc
+
+
+def filtrer_par_blocs(fichier_data: Union[str, os.PathLike, IO], automate: Union[AutomateMotsCles, ReglesChamps],
+                      fichier_sortie: Union[str, os.PathLike, IO], taille_bloc: int,
+                      backend: Optional[str] = None, nb_workers: Optional[int] = 1,
+                      rappel: Optional[Callable[[int], None]] = None,
+                      instrumentation: InstrumentationNulle = INSTRUMENTATION_NULLE,
+                      correspondances: bool = False, ids_vus: Optional[IdsVus] = None) -> Dict[str, int]:
+    """
+    Filtre un CSV bloc par bloc et écrit chaque bloc dans le fichier de sortie
+
+    Seul un bloc de `taille_bloc` lignes est en mémoire à la fois, quelle que
+    soit la taille du fichier d'entrée. Les colonnes sont lues comme du texte
+    pour éviter que l'inférence de types diffère d'un bloc à l'autre.
+
+    Args:
+        fichier_data: Chemin ou fichier ouvert du CSV des vidéos
+        automate: Mots-clés compilés, ou règles par champ (voir filtrer)
+        fichier_sortie: Chemin ou fichier texte ouvert pour le CSV résultat
+        taille_bloc: Nombre de lignes lues à la fois
+        backend: Moteur de recherche (voir BACKENDS)
+        nb_workers: Nombre de processus pour le moteur 'parallele' (0 : tous les cœurs)
+        rappel: Fonction appelée après chaque bloc avec le nombre de lignes traitées
+        instrumentation: Reçoit les durées cumulées des étapes 'lecture',
+            'recherche', 'decision' et 'ecriture' et les compteurs
+        correspondances: Ajoute la colonne 'matched_keywords' (voir filtrer) ;
+            les vidéos trouvées par mot-clé sont cumulées d'un bloc à l'autre
+        ids_vus: Ids déjà vus (voir filtrer) : les doublons sont écartés de
+            chaque bloc avant la recherche, dans le processus principal, et ne
+            sont donc jamais envoyés au pool
+
+    Returns:
+        Statistiques cumulées, identiques à celles d'un filtrage en mémoire
+    """
+    backend = choisir_backend(backend, nb_workers)
+    par_champ = isinstance(automate, ReglesChamps)
+    if par_champ and correspondances:
+        raise ValueError("Les règles par champ ne prennent pas de correspondances")
+    gardees = 0
+    total = 0
+    doublons = 0
+    occurrences: Optional[Counter] = Counter() if correspondances else None
+    trouvees_champs: Optional[Counter] = Counter() if par_champ else None
+
+    # Un seul pool pour tous les blocs (l'automate n'est envoyé qu'une fois), créé
+    # au premier bloc assez grand : un petit fichier ne démarre aucun processus
+    parallele = backend == 'parallele' and nombre_workers(nb_workers) > 1
+    pool = None
+
+    sortie = open(fichier_sortie, 'w', encoding='utf-8', newline='') if isinstance(fichier_sortie, (str, os.PathLike)) else fichier_sortie
+    try:
+        lecteur = pd.read_csv(fichier_data, dtype=str, chunksize=taille_bloc)
+        entete_ecrite = False
+        for bloc in lire_blocs(lecteur, instrumentation):
+            bloc, doublons_bloc = dedoublonner(bloc, ids_vus, instrumentation)
+            doublons += doublons_bloc
+            if parallele and pool is None and len(bloc) >= SEUIL_PARALLELE:
+                pool = creer_pool(automate, nb_workers)
+            with instrumentation.etape('recherche'):
+                if par_champ:
+                    masque, resultats_champs = calculer_champs_backend(bloc, automate, backend, nb_workers, pool)
+                    trouvees_champs.update({nom: int(valeurs.sum()) for nom, valeurs in resultats_champs.items()})
+                elif correspondances:
+                    masque, colonne, occurrences_bloc = calculer_correspondances_backend(bloc, automate, backend,
+                                                                                         nb_workers, pool)
+                    occurrences.update(occurrences_bloc)
+                else:
+                    masque = calculer_masque_backend(bloc, automate, backend, nb_workers, pool)
+            with instrumentation.etape('decision'):
+                appliquer_decision(bloc, masque)
+                if correspondances:
+                    bloc[COLONNE_CORRESPONDANCES] = colonne
+                if par_champ:
+                    for nom, valeurs in resultats_champs.items():
+                        bloc[nom] = valeurs
+            with instrumentation.etape('ecriture'):
+                bloc.to_csv(sortie, index=False, header=not entete_ecrite)
+            entete_ecrite = True
+
+            gardees += int(masque.sum())
+            total += len(bloc)
+            if rappel is not None:
+                rappel(total + doublons)
+    finally:
+        if sortie is not fichier_sortie:
+            sortie.close()
+        if pool is not None:
+            pool.shutdown()
+
+    instrumentation.compter('lignes', total)
+    instrumentation.compter('gardees', gardees)
+    instrumentation.compter('octets_lus', formats_donnees.taille_source(fichier_data))
+    stats = {
+        'gardees': gardees,
+        'rejetees': total - gardees,
+        'total': total,
+        'mots_cles': len(automate)
+    }
+    if occurrences is not None:
+        stats.update(statistiques_mots_cles(occurrences, automate))
+    if trouvees_champs is not None:
+        stats['champs'] = {nom: trouvees_champs[nom] for nom in automate.colonnes}
+    if ids_vus is not None:
+        stats['doublons'] = doublons
+    return stats
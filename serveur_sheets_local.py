@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Imitation locale de l'API « values » de Google Sheets
+Sert des feuilles chargées depuis des CSV, pour essayer connecteur_sheets.py
+sans compte Google : values/{plage}, values:batchGet et values:batchUpdate, avec
+les mêmes réponses JSON que l'API (cellules vides en fin de ligne et lignes
+vides en fin de plage omises). Des erreurs 503 peuvent être simulées pour
+vérifier les nouvelles tentatives du client. Bibliothèque standard uniquement.
+
+Exemple :
+    python serveur_sheets_local.py --feuille Data=Data.csv --feuille keywords=keywords.csv --port 8765
+    FILTRE_SHEETS_URL=http://127.0.0.1:8765 python connecteur_sheets.py --classeur local
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import signal
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Plage A1 : 'Feuille'!A2:J100, Feuille!A:J, Feuille!2:5, Feuille!B3 ou Feuille seule
+_PLAGE = re.compile(r"^(?:'((?:[^']|'')+)'|([^!]+))(?:!([A-Z]*)(\d*)(?::([A-Z]*)(\d*))?)?$")
+_CHEMIN = re.compile(r"^/v4/spreadsheets/([^/]+)/values(?::(batchGet|batchUpdate)|/(.+))$")
+
+
+def numero_colonne(lettres: str) -> int:
+    """Numéro (à partir de 0) d'une colonne en notation A1 ('A' -> 0, 'AA' -> 26)"""
+    numero = 0
+    for lettre in lettres:
+        numero = numero * 26 + ord(lettre) - ord('A') + 1
+    return numero - 1
+
+
+def analyser_plage(plage: str) -> Tuple[str, int, Optional[int], int, Optional[int]]:
+    """
+    Découpe une plage A1
+
+    Returns:
+        Tuple (feuille, première ligne, dernière ligne ou None, première colonne,
+        dernière colonne ou None), lignes et colonnes à partir de 0
+
+    Raises:
+        ValueError: Si la plage est mal formée
+    """
+    correspondance = _PLAGE.match(plage)
+    if correspondance is None:
+        raise ValueError(f"Unable to parse range: {plage}")
+    cite, nom, col_debut, ligne_debut, col_fin, ligne_fin = correspondance.groups()
+    feuille = cite.replace("''", "'") if cite is not None else nom
+    if col_fin is None and ligne_fin is None:
+        # Cellule seule (B3) ou feuille entière
+        col_fin, ligne_fin = (col_debut, ligne_debut) if (col_debut or ligne_debut) else ('', '')
+    return (feuille,
+            int(ligne_debut) - 1 if ligne_debut else 0,
+            int(ligne_fin) - 1 if ligne_fin else None,
+            numero_colonne(col_debut) if col_debut else 0,
+            numero_colonne(col_fin) if col_fin else None)
+
+
+class ClasseurLocal:
+    """Feuilles en mémoire (listes de lignes de textes), partagées entre les requêtes"""
+
+    def __init__(self, feuilles: Dict[str, List[List[str]]]):
+        self.feuilles = feuilles
+        self.verrou = threading.Lock()
+
+    @classmethod
+    def depuis_csv(cls, fichiers: Dict[str, str]) -> 'ClasseurLocal':
+        """Classeur dont chaque feuille est chargée depuis un CSV ({nom de feuille: chemin})"""
+        feuilles = {}
+        for nom, chemin in fichiers.items():
+            with open(chemin, 'r', encoding='utf-8-sig', newline='') as fichier:
+                feuilles[nom] = [ligne for ligne in csv.reader(fichier)]
+        return cls(feuilles)
+
+    def _feuille(self, nom: str) -> List[List[str]]:
+        if nom not in self.feuilles:
+            raise ValueError(f"Unable to parse range: {nom}")
+        return self.feuilles[nom]
+
+    def lire(self, plage: str) -> Dict:
+        """Réponse de values.get pour une plage"""
+        nom, ligne_debut, ligne_fin, col_debut, col_fin = analyser_plage(plage)
+        with self.verrou:
+            lignes = self._feuille(nom)
+            fin = len(lignes) if ligne_fin is None else min(ligne_fin + 1, len(lignes))
+            valeurs = []
+            for ligne in lignes[ligne_debut:fin]:
+                cellules = ligne[col_debut:None if col_fin is None else col_fin + 1]
+                while cellules and cellules[-1] == '':
+                    cellules = cellules[:-1]
+                valeurs.append(cellules)
+        while valeurs and not valeurs[-1]:
+            valeurs.pop()
+        reponse = {'range': plage, 'majorDimension': 'ROWS'}
+        if valeurs:
+            reponse['values'] = valeurs
+        return reponse
+
+    def ecrire(self, plage: str, valeurs: List[List]) -> int:
+        """Écrit des valeurs à partir du coin haut gauche de la plage ; renvoie le nombre de cellules"""
+        nom, ligne_debut, _, col_debut, _ = analyser_plage(plage)
+        cellules = 0
+        with self.verrou:
+            lignes = self._feuille(nom)
+            for decalage, ligne_valeurs in enumerate(valeurs):
+                numero = ligne_debut + decalage
+                while len(lignes) <= numero:
+                    lignes.append([])
+                ligne = lignes[numero]
+                for position, valeur in enumerate(ligne_valeurs, start=col_debut):
+                    if len(ligne) <= position:
+                        ligne.extend([''] * (position + 1 - len(ligne)))
+                    ligne[position] = '' if valeur is None else str(valeur)
+                    cellules += 1
+        return cellules
+
+
+class GestionnaireSheets(BaseHTTPRequestHandler):
+    """Requêtes de l'API « values » ; le serveur porte le classeur, l'identifiant attendu et les compteurs"""
+
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        if self.server.verbeux:
+            super().log_message(format, *args)
+
+    def _repondre(self, statut: int, contenu: Dict):
+        corps = json.dumps(contenu, ensure_ascii=False).encode('utf-8')
+        self.send_response(statut)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(corps)))
+        self.end_headers()
+        self.wfile.write(corps)
+
+    def _erreur(self, statut: int, etat: str, message: str):
+        self._repondre(statut, {'error': {'code': statut, 'message': message, 'status': etat}})
+
+    def _traiter(self, methode: str):
+        serveur = self.server
+        with serveur.verrou:
+            serveur.requetes[methode] = serveur.requetes.get(methode, 0) + 1
+            numero = sum(serveur.requetes.values())
+        if self.headers.get('Content-Length'):
+            corps = self.rfile.read(int(self.headers['Content-Length']))
+        else:
+            corps = b''
+        if serveur.echecs and numero % serveur.echecs == 0:
+            self._erreur(503, 'UNAVAILABLE', "The service is currently unavailable.")
+            return
+
+        adresse = urlsplit(self.path)
+        chemin = _CHEMIN.match(adresse.path)
+        if chemin is None:
+            self._erreur(404, 'NOT_FOUND', f"Unknown path: {adresse.path}")
+            return
+        classeur, operation, plage = chemin.groups()
+        if classeur != serveur.classeur_id:
+            self._erreur(404, 'NOT_FOUND', "Requested entity was not found.")
+            return
+
+        try:
+            if methode == 'GET' and operation == 'batchGet':
+                plages = parse_qs(adresse.query).get('ranges', [])
+                self._repondre(200, {'spreadsheetId': classeur,
+                                     'valueRanges': [serveur.classeur.lire(p) for p in plages]})
+            elif methode == 'GET' and plage is not None:
+                self._repondre(200, serveur.classeur.lire(unquote(plage)))
+            elif methode == 'POST' and operation == 'batchUpdate':
+                donnees = json.loads(corps or b'{}').get('data', [])
+                cellules = sum(serveur.classeur.ecrire(element['range'], element.get('values', []))
+                               for element in donnees)
+                self._repondre(200, {'spreadsheetId': classeur, 'totalUpdatedCells': cellules,
+                                     'totalUpdatedRanges': len(donnees)})
+            else:
+                self._erreur(404, 'NOT_FOUND', f"Unsupported operation: {methode} {adresse.path}")
+        except (ValueError, KeyError, TypeError) as e:
+            self._erreur(400, 'INVALID_ARGUMENT', str(e))
+
+    def do_GET(self):
+        self._traiter('GET')
+
+    def do_POST(self):
+        self._traiter('POST')
+
+
+class ServeurSheetsLocal(ThreadingHTTPServer):
+    """
+    Serveur HTTP imitant l'API « values » pour un classeur
+
+    Usage :
+        serveur = ServeurSheetsLocal(ClasseurLocal.depuis_csv({'Data': 'Data.csv'}), port=0)
+        threading.Thread(target=serveur.serve_forever, daemon=True).start()
+        ClientSheets('local', serveur.url)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, classeur: ClasseurLocal, hote: str = '127.0.0.1', port: int = 8765,
+                 classeur_id: str = 'local', echecs: int = 0, verbeux: bool = False):
+        """
+        Args:
+            classeur: Feuilles servies
+            hote: Adresse d'écoute
+            port: Port d'écoute (0 : port libre choisi par le système)
+            classeur_id: Identifiant de classeur accepté
+            echecs: Si non nul, une requête sur `echecs` reçoit une erreur 503
+            verbeux: Journalise chaque requête
+        """
+        super().__init__((hote, port), GestionnaireSheets)
+        self.classeur = classeur
+        self.classeur_id = classeur_id
+        self.echecs = echecs
+        self.verbeux = verbeux
+        self.requetes: Dict[str, int] = {}
+        self.verrou = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        hote, port = self.server_address[:2]
+        return f"http://{hote}:{port}"
+
+
+def main(arguments: Optional[List[str]] = None):
+    """Point d'entrée en ligne de commande"""
+    parser = argparse.ArgumentParser(description="Imitation locale de l'API values de Google Sheets")
+    parser.add_argument('--feuille', action='append', required=True, metavar='NOM=FICHIER.csv',
+                        help="Feuille servie, chargée depuis un CSV (répétable)")
+    parser.add_argument('--hote', default='127.0.0.1', help="Adresse d'écoute (défaut: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8765, help="Port d'écoute (défaut: 8765)")
+    parser.add_argument('--classeur', default='local', help="Identifiant du classeur (défaut: local)")
+    parser.add_argument('--echecs', type=int, default=0,
+                        help="Renvoie une erreur 503 pour une requête sur N (défaut: 0, aucune)")
+    parser.add_argument('--sortie', default=None,
+                        help="Dossier où écrire chaque feuille en CSV à l'arrêt (Ctrl+C ou kill)")
+    options = parser.parse_args(arguments)
+
+    fichiers = dict(feuille.split('=', 1) for feuille in options.feuille)
+    serveur = ServeurSheetsLocal(ClasseurLocal.depuis_csv(fichiers), options.hote, options.port,
+                                 options.classeur, options.echecs, verbeux=True)
+    print(f"[OK] Classeur '{options.classeur}' ({', '.join(fichiers)}) servi sur {serveur.url}")
+
+    def arreter(*_):
+        raise KeyboardInterrupt
+
+    # kill (SIGTERM) arrête le serveur comme Ctrl+C, feuilles écrites comprises
+    signal.signal(signal.SIGTERM, arreter)
+    try:
+        serveur.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        serveur.server_close()
+        if options.sortie:
+            for nom, lignes in serveur.classeur.feuilles.items():
+                chemin = os.path.join(options.sortie, f"{nom}.csv")
+                with open(chemin, 'w', encoding='utf-8', newline='') as fichier:
+                    csv.writer(fichier).writerows(lignes)
+                print(f"[OK] Feuille {nom} ecrite dans {chemin}")
+
+
+if __name__ == '__main__':
+    main()
@@ -5,9 +5,18 @@ Application Streamlit - Filtreur de vidéos par mots-clés
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
+import gzip
+import hashlib
 import io
-from typing import Set
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import moteur_filtrage as moteur
+from automate_mots_cles import AutomateMotsCles, compiler_mots_cles
+from formats_donnees import lire_colonnes, lire_donnees
+from instrumentation import INSTRUMENTATION_NULLE, InstrumentationNulle, creer_instrumentation
+from cache_mots_cles import automate_depuis_cache
 
 # Configuration de la page
 st.set_page_config(
@@ -20,61 +29,124 @@ st.set_page_config(
 def charger_mots_cles(keywords_content: str) -> Set[str]:
     """Charge les mots-clés depuis le contenu CSV"""
     try:
-        df_keywords = pd.read_csv(io.StringIO(keywords_content))
-        
-        if 'keyword' in df_keywords.columns:
-            mots_cles = df_keywords['keyword'].tolist()
-        else:
-            mots_cles = df_keywords.iloc[:, 0].tolist()
-        
-        mots_cles_clean = set()
-        for mot in mots_cles:
-            if pd.notna(mot):
-                mot_clean = str(mot).strip().lower()
-                if mot_clean:
-                    mots_cles_clean.add(mot_clean)
-        
-        return mots_cles_clean
-        
+        return moteur.charger_mots_cles(io.StringIO(keywords_content))
     except Exception as e:
         st.error(f"Erreur lors du chargement des mots-clés: {e}")
         return set()
 
-def contient_mots_cles(texte: str, mots_cles: Set[str]) -> bool:
-    """Vérifie si un texte contient au moins un des mots-clés"""
-    if pd.isna(texte) or not isinstance(texte, str):
-        return False
-    
-    texte_clean = str(texte).lower()
-    
-    for mot_cle in mots_cles:
-        if mot_cle in texte_clean:
-            return True
-    
-    return False
-
-def filtrer_videos(df_data: pd.DataFrame, mots_cles: Set[str]) -> pd.DataFrame:
+def filtrer_videos(df_data: pd.DataFrame, mots_cles: Union[Set[str], AutomateMotsCles],
+                   instrumentation: InstrumentationNulle = INSTRUMENTATION_NULLE) -> pd.DataFrame:
     """Filtre les vidéos en fonction des mots-clés"""
-    df_resultat = df_data.copy()
-    df_resultat['decision'] = 'Rejeté'
-    
-    gardees = 0
-    rejetees = 0
-    
-    # Analyser chaque vidéo
-    for index, row in df_data.iterrows():
-        titre = row.get('title', '')
-        channel_name = row.get('channelName', '')
-        
-        texte_analyse = f"{titre} {channel_name}"
-        
-        if contient_mots_cles(texte_analyse, mots_cles):
-            df_resultat.at[index, 'decision'] = 'Gardé'
-            gardees += 1
-        else:
-            rejetees += 1
-    
-    return df_resultat, gardees, rejetees
+    df_resultat, stats = moteur.filtrer(df_data, compiler_mots_cles(mots_cles), instrumentation=instrumentation)
+    return df_resultat, stats['gardees'], stats['rejetees']
+
+# Tailles de page proposées pour le tableau des résultats
+LIGNES_PAR_PAGE = [50, 100, 500, 1000]
+
+# Choix "pas de tri" du tableau des résultats
+ORDRE_ORIGINE = "(ordre d'origine)"
+
+# Nombre de fichiers et de résultats conservés en mémoire d'une interaction à l'autre
+MAX_ENTREES_CACHE = 4
+
+def empreinte_upload(fichier) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier uploadé, calculée une seule fois par fichier"""
+    empreintes = st.session_state.setdefault('empreintes_uploads', {})
+    if fichier.file_id not in empreintes:
+        empreintes[fichier.file_id] = hashlib.sha256(fichier.getvalue()).hexdigest()
+    return empreintes[fichier.file_id]
+
+# Les DataFrames sont mis en cache avec st.cache_resource : ils sont renvoyés sans
+# copie à chaque réexécution (st.cache_data les désérialiserait à chaque fois) et
+# ne doivent donc pas être modifiés. Les arguments préfixés par _ ne font pas partie
+# de la clé : celle-ci est l'empreinte du contenu, calculée une fois par upload.
+
+@st.cache_resource(max_entries=MAX_ENTREES_CACHE, show_spinner=False)
+def colonnes_data(empreinte: str, _contenu: bytes) -> List[str]:
+    """Noms des colonnes de Data.csv (seule la ligne d'en-tête est analysée)"""
+    return lire_colonnes(io.BytesIO(_contenu))
+
+@st.cache_resource(max_entries=MAX_ENTREES_CACHE, show_spinner=False)
+def lire_data(empreinte: str, _contenu: bytes, colonnes: Tuple[str, ...] = ()) -> pd.DataFrame:
+    """
+    Data.csv analysé comme par la ligne de commande, colonnes en texte (seulement
+    les colonnes conservées et celles de la recherche si colonnes est donné)
+    """
+    return lire_donnees(io.BytesIO(_contenu), 'csv', list(colonnes) or None)
+
+@st.cache_resource(max_entries=MAX_ENTREES_CACHE, show_spinner=False)
+def textes_data(empreinte: str, colonnes: Tuple[str, ...], _df_data: pd.DataFrame) -> pd.Series:
+    """Textes normalisés (titre + chaîne) de Data.csv, réutilisés quel que soit le keywords.csv"""
+    return moteur.construire_textes(_df_data)
+
+@st.cache_resource(max_entries=MAX_ENTREES_CACHE, show_spinner=False)
+def compiler_keywords(empreinte: str, _contenu: bytes) -> AutomateMotsCles:
+    """Mots-clés compilés, depuis le cache disque si ce fichier est déjà connu"""
+    keywords_content = _contenu.decode('utf-8')
+    return automate_depuis_cache(_contenu, lambda: charger_mots_cles(keywords_content))
+
+# Le résultat ne copie pas Data.csv : il le référence avec un masque des vidéos
+# gardées (moteur.ResultatFiltrage). Sélections et tris sont des tableaux de
+# positions ; la colonne 'decision' n'est produite que pour la page affichée et
+# les exports.
+
+@st.cache_resource(max_entries=MAX_ENTREES_CACHE, show_spinner=False)
+def filtrer_upload(cle_resultat: str, _df_data: pd.DataFrame, _automate: AutomateMotsCles,
+                   colonnes: Tuple[str, ...] = (), _textes: Optional[pd.Series] = None,
+                   _instrumentation: InstrumentationNulle = INSTRUMENTATION_NULLE,
+                   correspondances: bool = False) -> moteur.ResultatFiltrage:
+    """Résultat du filtrage d'un Data.csv par un keywords.csv (avec matched_keywords si correspondances)"""
+    return moteur.filtrer_compact(_df_data, _automate, colonnes=list(colonnes) or None,
+                                  instrumentation=_instrumentation, textes=_textes, correspondances=correspondances)
+
+@st.cache_resource(max_entries=MAX_ENTREES_CACHE * 3, show_spinner=False)
+def selection_decision(cle_resultat: str, decision: str, _resultat: moteur.ResultatFiltrage) -> np.ndarray:
+    """Positions des vidéos ayant la décision choisie ("Tous" : toutes)"""
+    return _resultat.positions(decision)
+
+@st.cache_resource(max_entries=MAX_ENTREES_CACHE * 3, show_spinner=False)
+def trier_selection(cle_resultat: str, decision: str, colonne: str, decroissant: bool,
+                    _resultat: moteur.ResultatFiltrage, _positions: np.ndarray) -> np.ndarray:
+    """Positions de la sélection triée sur une colonne (tri stable, valeurs manquantes en dernier)"""
+    return _resultat.trier(_positions, colonne, decroissant)
+
+@st.cache_data(max_entries=MAX_ENTREES_CACHE * 3, show_spinner=False)
+def exporter_csv(cle_resultat: str, decision: str, _resultat: moteur.ResultatFiltrage, _positions: np.ndarray,
+                 compresse: bool = False) -> bytes:
+    """CSV (éventuellement gzip) d'une sélection du résultat, produit une seule fois par sélection"""
+    contenu = _resultat.vers_csv(positions=_positions).encode('utf-8')
+    return gzip.compress(contenu, compresslevel=6, mtime=0) if compresse else contenu
+
+def bouton_export(label: str, cle_resultat: str, decision: str, resultat: moteur.ResultatFiltrage,
+                  positions: np.ndarray, nom_fichier: str, compresse: bool = False, **options):
+    """
+    Bouton de téléchargement dont le fichier n'est produit qu'au clic
+
+    Le contenu est généré par exporter_csv, donc une seule fois par sélection
+    et par format, quel que soit le nombre de réexécutions ou de clics.
+    """
+    st.download_button(
+        label=label,
+        data=lambda: exporter_csv(cle_resultat, decision, resultat, positions, compresse),
+        file_name=nom_fichier + ('.csv.gz' if compresse else '.csv'),
+        mime="application/gzip" if compresse else "text/csv",
+        **options
+    )
+
+def afficher_mots_cles_frequents(stats: Dict, nb_metriques: int = 5):
+    """Mots-clés les plus trouvés : les premiers en métriques, les suivants dans un tableau"""
+    frequents = stats['mots_cles_frequents']
+    st.subheader("🏷️ Mots-clés les plus trouvés")
+    if frequents:
+        for colonne, (mot_cle, videos) in zip(st.columns(min(nb_metriques, len(frequents))), frequents):
+            with colonne:
+                st.metric(mot_cle, videos)
+        if len(frequents) > nb_metriques:
+            st.dataframe(pd.DataFrame(frequents, columns=["Mot-clé", "Vidéos"]), hide_index=True,
+                         use_container_width=True)
+    else:
+        st.info("Aucun mot-clé trouvé")
+    st.caption(f"{stats['mots_cles_sans_correspondance']} mots-clés n'ont trouvé aucune vidéo")
 
 def main():
     """Fonction principale de l'application Streamlit"""
@@ -99,7 +171,14 @@ def main():
         """)
         
         st.markdown("---")
-        st.markdown("**💡 Astuce :** Le programme analyse le titre et le nom de la chaîne de chaque vidéo.")
+        st.markdown("**💡 Astuce :** Le programme analyse le titre et le nom de la chaîne de chaque vidéo, sans tenir compte des majuscules ni des accents.")
+        
+        st.markdown("---")
+        mesures_actives = st.checkbox("⏱️ Mesures de performance", value=False,
+                                      help="Affiche la durée de chaque étape et les compteurs du filtrage")
+        correspondances = st.checkbox("🏷️ Mots-clés trouvés", value=False, key="correspondances",
+                                      help="Ajoute la colonne matched_keywords (tous les mots-clés trouvés) "
+                                           "et les mots-clés les plus trouvés")
     
     # Zone principale
     col1, col2 = st.columns(2)
@@ -112,6 +191,14 @@ def main():
             key="data_file",
             help="Fichier contenant les données de vos vidéos"
         )
+        colonnes_conservees = []
+        if data_file is not None:
+            colonnes_conservees = st.multiselect(
+                "Colonnes conservées (toutes si vide)",
+                colonnes_data(empreinte_upload(data_file), data_file.getvalue()),
+                key="colonnes_conservees",
+                help="Seules ces colonnes (et celles de la recherche) sont chargées en mémoire"
+            )
     
     with col2:
         st.header("🔑 Fichier keywords.csv")
@@ -129,20 +216,32 @@ def main():
     with col2:
         if st.button("🚀 Filtrer les Vidéos", type="primary", use_container_width=True):
             if data_file is not None and keywords_file is not None:
+                instrumentation = creer_instrumentation(actif=mesures_actives, contexte={'interface': 'streamlit'})
+                instrumentation.demarrer()
                 try:
-                    # Charger les données
+                    # Charger les données (analysées une seule fois par contenu de fichier)
                     with st.spinner("Chargement des fichiers..."):
-                        df_data = pd.read_csv(data_file)
-                        keywords_content = keywords_file.read().decode('utf-8')
-                        mots_cles = charger_mots_cles(keywords_content)
+                        empreinte_data = empreinte_upload(data_file)
+                        empreinte_keywords = empreinte_upload(keywords_file)
+                        colonnes = tuple(colonnes_conservees)
+                        with instrumentation.etape('lecture'):
+                            df_data = lire_data(empreinte_data, data_file.getvalue(), colonnes)
+                        instrumentation.compter('octets_lus', data_file.size)
+                        with instrumentation.etape('chargement_mots_cles'):
+                            mots_cles = compiler_keywords(empreinte_keywords, keywords_file.getvalue())
                     
                     if not mots_cles:
                         st.error("❌ Aucun mot-clé valide trouvé dans le fichier keywords.csv")
                         return
                     
-                    # Filtrer les vidéos
+                    # Filtrer les vidéos (résultat réutilisé si ces deux fichiers ont déjà été filtrés)
+                    cle_resultat = f"{empreinte_data}:{empreinte_keywords}:{','.join(colonnes)}:{correspondances:d}"
                     with st.spinner("Filtrage en cours..."):
-                        df_resultat, gardees, rejetees = filtrer_videos(df_data, mots_cles)
+                        with instrumentation.etape('normalisation'):
+                            textes = textes_data(empreinte_data, colonnes, df_data)
+                        resultat = filtrer_upload(cle_resultat, df_data, mots_cles, colonnes, textes,
+                                                  instrumentation, correspondances)
+                        gardees, rejetees = resultat.stats['gardees'], resultat.stats['rejetees']
                     
                     # Afficher les résultats
                     st.success("✅ Filtrage terminé avec succès !")
@@ -162,29 +261,29 @@ def main():
                     with col4:
                         st.metric("🔑 Mots-clés", len(mots_cles))
                     
+                    # Mots-clés les plus trouvés (mode correspondances)
+                    if 'mots_cles_frequents' in resultat.stats:
+                        afficher_mots_cles_frequents(resultat.stats)
+                    
                     # Afficher un aperçu des données
                     st.subheader("📋 Aperçu des données filtrées")
-                    st.dataframe(df_resultat.head(10), use_container_width=True)
+                    st.dataframe(resultat.en_dataframe(np.arange(min(10, len(resultat)))), use_container_width=True)
+                    
+                    # Bouton de téléchargement (le CSV n'est produit qu'au clic)
+                    bouton_export("📥 Télécharger videos_filtrees.csv", cle_resultat, "Tous", resultat,
+                                  selection_decision(cle_resultat, "Tous", resultat), "videos_filtrees",
+                                  type="primary", use_container_width=True)
                     
-                    # Bouton de téléchargement
-                    csv_result = df_resultat.to_csv(index=False, encoding='utf-8')
-                    st.download_button(
-                        label="📥 Télécharger videos_filtrees.csv",
-                        data=csv_result,
-                        file_name="videos_filtrees.csv",
-                        mime="text/csv",
-                        type="primary",
-                        use_container_width=True
-                    )
+                    # Rapport de performance
+                    instrumentation.arreter()
+                    if instrumentation.actif:
+                        with st.expander("⏱️ Mesures de performance", expanded=True):
+                            st.json(instrumentation.rapport())
                     
                     # Stocker les résultats dans la session
-                    st.session_state.df_resultat = df_resultat
-                    st.session_state.stats = {
-                        'total': df_data.shape[0],
-                        'gardees': gardees,
-                        'rejetees': rejetees,
-                        'mots_cles': len(mots_cles)
-                    }
+                    st.session_state.resultat = resultat
+                    st.session_state.cle_resultat = cle_resultat
+                    st.session_state.stats = dict(resultat.stats, total=df_data.shape[0])
                     
                 except Exception as e:
                     st.error(f"❌ Erreur lors du traitement: {str(e)}")
@@ -192,12 +291,15 @@ def main():
                 st.warning("⚠️ Veuillez sélectionner les deux fichiers CSV")
     
     # Afficher les résultats stockés si disponibles
-    if 'df_resultat' in st.session_state:
+    if 'resultat' in st.session_state:
         st.markdown("---")
         st.subheader("📊 Résultats détaillés")
         
-        # Filtres
-        col1, col2 = st.columns(2)
+        resultat = st.session_state.resultat
+        cle_resultat = st.session_state.cle_resultat
+        
+        # Filtres et tri
+        col1, col2, col3 = st.columns([2, 2, 1])
         
         with col1:
             decision_filter = st.selectbox(
@@ -207,28 +309,53 @@ def main():
             )
         
         with col2:
-            if decision_filter != "Tous":
-                df_filtered = st.session_state.df_resultat[
-                    st.session_state.df_resultat['decision'] == decision_filter
-                ]
-            else:
-                df_filtered = st.session_state.df_resultat
-            
-            st.info(f"📈 {len(df_filtered)} vidéos affichées")
+            colonne_tri = st.selectbox(
+                "Trier par",
+                [ORDRE_ORIGINE] + resultat.colonnes,
+                key="colonne_tri"
+            )
+        
+        with col3:
+            decroissant = st.checkbox("Ordre décroissant", key="tri_decroissant",
+                                      disabled=colonne_tri == ORDRE_ORIGINE)
+        
+        positions_selection = selection_decision(cle_resultat, decision_filter, resultat)
+        if colonne_tri != ORDRE_ORIGINE:
+            positions_affichees = trier_selection(cle_resultat, decision_filter, colonne_tri, decroissant,
+                                                  resultat, positions_selection)
+        else:
+            positions_affichees = positions_selection
+        
+        # Pagination : seule la page courante est envoyée au navigateur
+        col1, col2, col3 = st.columns([1, 1, 2])
+        
+        with col1:
+            lignes_par_page = st.selectbox("Lignes par page", LIGNES_PAR_PAGE, key="lignes_par_page")
+        
+        nb_pages = max(1, -(-len(positions_affichees) // lignes_par_page))
+        with col2:
+            page = st.number_input("Page", min_value=1, max_value=nb_pages, value=1, step=1, key="page")
+        
+        debut = (min(page, nb_pages) - 1) * lignes_par_page
+        fin = min(debut + lignes_par_page, len(positions_affichees))
+        with col3:
+            st.info(f"📈 {len(positions_selection)} vidéos sélectionnées — lignes {debut + 1 if fin else 0} à {fin} "
+                    f"(page {min(page, nb_pages)}/{nb_pages})")
         
         # Tableau des résultats
-        st.dataframe(df_filtered, use_container_width=True)
+        st.dataframe(resultat.en_dataframe(positions_affichees[debut:fin]), use_container_width=True)
         
-        # Bouton de téléchargement des résultats filtrés
+        # Téléchargement de la sélection, produit seulement à la demande
         if decision_filter != "Tous":
-            csv_filtered = df_filtered.to_csv(index=False, encoding='utf-8')
-            st.download_button(
-                label=f"📥 Télécharger vidéos {decision_filter.lower()}s",
-                data=csv_filtered,
-                file_name=f"videos_{decision_filter.lower()}s.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
+            nom_fichier = f"videos_{decision_filter.lower()}s"
+            col1, col2 = st.columns(2)
+            with col1:
+                bouton_export(f"📥 Télécharger vidéos {decision_filter.lower()}s", cle_resultat, decision_filter,
+                              resultat, positions_selection, nom_fichier, use_container_width=True)
+            with col2:
+                bouton_export(f"🗜️ Télécharger vidéos {decision_filter.lower()}s (gzip)", cle_resultat,
+                              decision_filter, resultat, positions_selection, nom_fichier, compresse=True,
+                              use_container_width=True)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fichiers résultats de l'interface web : téléchargement et nettoyage
+Les résultats sont envoyés par morceaux, compressés en gzip si le navigateur
+l'accepte, avec prise en charge des requêtes HTTP Range (reprise des
+téléchargements interrompus). Les fichiers plus anciens qu'une durée de vie
+donnée sont supprimés en arrière-plan.
+"""
+
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+import time
+from typing import Callable, Optional
+
+from flask import Request, Response, send_file
+
+# Niveau de compression gzip (1 : rapide ... 9 : compact)
+NIVEAU_GZIP = 6
+
+# En dessous de cette taille, la compression ne vaut pas la peine
+TAILLE_MIN_GZIP = 4096
+
+EXTENSION_GZIP = '.gz'
+
+# Taille des morceaux lus lors de la compression
+TAILLE_MORCEAU = 1024 * 1024
+
+
+def preparer_gzip(chemin: str, niveau: int = NIVEAU_GZIP) -> str:
+    """
+    Version gzip d'un fichier résultat, créée si absente ou plus ancienne que le fichier
+
+    La version compressée est conservée à côté du fichier : elle est calculée
+    une seule fois, et les requêtes Range portent sur un contenu stable.
+
+    Returns:
+        Chemin du fichier compressé
+    """
+    chemin_gzip = chemin + EXTENSION_GZIP
+    try:
+        if os.path.getmtime(chemin_gzip) >= os.path.getmtime(chemin):
+            return chemin_gzip
+    except OSError:
+        pass
+
+    # Fichier temporaire renommé : un téléchargement concurrent ne voit jamais une version partielle
+    descripteur, temporaire = tempfile.mkstemp(dir=os.path.dirname(chemin_gzip), suffix='.tmp')
+    try:
+        with open(chemin, 'rb') as source, os.fdopen(descripteur, 'wb') as destination:
+            with gzip.GzipFile(fileobj=destination, mode='wb', compresslevel=niveau, mtime=0) as compresse:
+                shutil.copyfileobj(source, compresse, TAILLE_MORCEAU)
+        os.replace(temporaire, chemin_gzip)
+    except BaseException:
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        raise
+    return chemin_gzip
+
+
+def accepte_gzip(requete: Request) -> bool:
+    """Vrai si le client accepte un contenu encodé en gzip"""
+    return requete.accept_encodings['gzip'] > 0
+
+
+def envoyer_fichier(requete: Request, chemin: str, nom_telechargement: str, mimetype: str = 'text/csv') -> Response:
+    """
+    Réponse de téléchargement d'un fichier résultat
+
+    Le fichier est lu par morceaux (jamais chargé en mémoire). Si le client
+    accepte gzip, la version compressée est envoyée avec Content-Encoding: gzip ;
+    les requêtes Range et conditionnelles portent alors sur cette version.
+    """
+    compresser = accepte_gzip(requete) and os.path.getsize(chemin) >= TAILLE_MIN_GZIP
+    # Chemin absolu : send_file résout un chemin relatif depuis le dossier de l'application, pas le dossier courant
+    source = os.path.abspath(preparer_gzip(chemin) if compresser else chemin)
+
+    reponse = send_file(source, mimetype=mimetype, as_attachment=True, download_name=nom_telechargement,
+                        conditional=True, etag=True)
+    if compresser:
+        reponse.headers['Content-Encoding'] = 'gzip'
+    reponse.vary.add('Accept-Encoding')
+    return reponse
+
+
+def derniere_modification(chemin: str) -> float:
+    """Date de dernière modification d'un fichier, ou du plus récent fichier d'un dossier"""
+    date = os.path.getmtime(chemin)
+    if os.path.isdir(chemin):
+        for racine, _, fichiers in os.walk(chemin):
+            for nom in fichiers:
+                try:
+                    date = max(date, os.path.getmtime(os.path.join(racine, nom)))
+                except OSError:
+                    continue
+    return date
+
+
+def supprimer(chemin: str):
+    """Supprime un fichier ou un dossier (sans erreur s'il a déjà disparu)"""
+    if os.path.isdir(chemin):
+        shutil.rmtree(chemin, ignore_errors=True)
+    else:
+        try:
+            os.remove(chemin)
+        except OSError:
+            pass
+
+
+def nettoyer_dossier(dossier: str, age_max: float, en_cours: Optional[Callable[[str], bool]] = None) -> int:
+    """
+    Supprime les entrées du dossier non modifiées depuis age_max secondes
+
+    Args:
+        dossier: Dossier des uploads et résultats
+        age_max: Durée de vie en secondes
+        en_cours: Fonction indiquant, d'après son nom, qu'une entrée est encore utilisée
+
+    Returns:
+        Nombre d'entrées supprimées
+    """
+    if not os.path.isdir(dossier):
+        return 0
+
+    limite = time.time() - age_max
+    supprimees = 0
+    for nom in os.listdir(dossier):
+        if en_cours is not None and en_cours(nom):
+            continue
+        chemin = os.path.join(dossier, nom)
+        try:
+            if derniere_modification(chemin) >= limite:
+                continue
+        except OSError:
+            continue
+        supprimer(chemin)
+        supprimees += 1
+    return supprimees
+
+
+class NettoyagePeriodique:
+    """
+    Thread qui appelle nettoyer_dossier à intervalle régulier
+
+    Démarré à la première utilisation, comme la file de travaux, pour que rien
+    ne tourne à l'import.
+    """
+
+    def __init__(self, dossier: str, age_max: float, en_cours: Optional[Callable[[str], bool]] = None,
+                 intervalle: Optional[float] = None):
+        self.dossier = dossier
+        self.age_max = age_max
+        self.en_cours = en_cours
+        self.intervalle = intervalle if intervalle is not None else max(1.0, min(age_max / 4, 600.0))
+        self._thread: Optional[threading.Thread] = None
+        self._verrou = threading.Lock()
+
+    def demarrer(self):
+        with self._verrou:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._boucle, name="nettoyage-uploads", daemon=True)
+                self._thread.start()
+
+    def _boucle(self):
+        while True:
+            time.sleep(self.intervalle)
+            try:
+                nettoyer_dossier(self.dossier, self.age_max, self.en_cours)
+            except Exception as e:
+                print(f"[ATTENTION] Nettoyage des fichiers temporaires impossible: {e}")
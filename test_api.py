@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de l'API serverless (api/index.py), appelée directement avec une requête simulée
+"""
+
+import importlib.util
+import json
+import os
+
+import pytest
+
+CHEMIN_API = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'api', 'index.py')
+
+DATA_CSV = (
+    "title,id,channelName\n"
+    "Apprendre Python,v1,Code\n"
+    "Recette de crêpes,v2,Cuisine\n"
+    "Tutoriel JavaScript,v3,Web\n"
+)
+
+
+class Requete:
+    """Requête minimale telle que reçue par handler"""
+
+    def __init__(self, method, path, headers, body):
+        self.method = method
+        self.path = path
+        self.headers = headers
+        self.body = body
+
+
+@pytest.fixture(scope='module')
+def api():
+    spec = importlib.util.spec_from_file_location('api_index', CHEMIN_API)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def appeler(api, corps, path='/api/filter', method='POST', content_type='application/json'):
+    corps = corps if isinstance(corps, str) else json.dumps(corps)
+    return api.handler(Requete(method, path, {'Content-Type': content_type}, corps))
+
+
+def test_lignes_json(api):
+    """Décisions dans l'ordre des lignes ; un titre 0 est un texte, un champ null est vide"""
+    reponse = appeler(api, {'keywords': ['python', '0'], 'rows': [
+        {'title': 'Apprendre Python', 'channelName': 'Code'},
+        {'title': 'Cuisine', 'channelName': None},
+        {'title': 0},
+    ]})
+    assert reponse['statusCode'] == 200
+    contenu = json.loads(reponse['body'])
+    assert contenu['decisions'] == ['Gardé', 'Rejeté', 'Gardé']
+    assert contenu['stats'] == {'gardees': 2, 'rejetees': 1, 'total': 3, 'mots_cles': 2}
+
+
+def test_data_csv_comme_filtrer_csv(api):
+    """data_csv et keywords_csv donnent les décisions de l'interface en ligne de commande"""
+    reponse = appeler(api, {'keywords_csv': "keyword\npython\ntutoriel\n", 'data_csv': DATA_CSV})
+    assert json.loads(reponse['body'])['decisions'] == ['Gardé', 'Rejeté', 'Gardé']
+
+
+def test_sortie_csv(api):
+    """Corps text/csv : CSV avec 'decision', statistiques en en-têtes sans soulignés"""
+    reponse = appeler(api, DATA_CSV, path='/api/filter?keywords=python,tutoriel&format=csv',
+                      content_type='text/csv')
+    assert reponse['statusCode'] == 200
+    assert reponse['body'].splitlines()[1] == 'Apprendre Python,v1,Code,Gardé'
+    assert reponse['headers']['X-Filtre-Mots-Cles'] == '2'
+    assert reponse['headers']['X-Filtre-Gardees'] == '2'
+    assert not [nom for nom in reponse['headers'] if '_' in nom]
+
+
+def test_expression(api):
+    """Les expressions booléennes sont acceptées, et refusées (400) si mal formées"""
+    lignes = [{'title': 'python pour debutants'}, {'title': 'python shorts'}]
+    reponse = appeler(api, {'keywords': ['python NOT shorts'], 'rows': lignes})
+    assert json.loads(reponse['body'])['decisions'] == ['Gardé', 'Rejeté']
+    assert appeler(api, {'keywords': ['python AND (cours'], 'rows': lignes})['statusCode'] == 400
+
+
+@pytest.mark.parametrize('corps', [
+    {'keywords': 'python', 'rows': [{'title': 'p'}]},
+    {'keywords': ['python', 3], 'rows': [{'title': 'p'}]},
+    {'keywords': ['python'], 'rows': ['Apprendre Python']},
+    {'keywords': ['python'], 'rows': {'title': 'Apprendre Python'}},
+    {'keywords': ['python'], 'data_csv': ['title']},
+    {'keywords': [], 'rows': []},
+    {'keywords': ['python']},
+    [],
+])
+def test_requetes_invalides(api, corps):
+    """Types inattendus refusés avec 400 au lieu d'être interprétés"""
+    reponse = appeler(api, corps)
+    assert reponse['statusCode'] == 400
+    assert 'error' in json.loads(reponse['body'])
+
+
+def test_trop_de_lignes(api, monkeypatch):
+    monkeypatch.setattr(api, 'MAX_LIGNES', 2)
+    assert appeler(api, {'keywords': ['python'], 'data_csv': DATA_CSV})['statusCode'] == 413
+
+
+def test_routes(api):
+    """Méthode refusée, route inconnue et pré-vérification CORS"""
+    assert appeler(api, '', method='GET')['statusCode'] == 405
+    assert appeler(api, '', path='/inconnue', method='GET')['statusCode'] == 404
+    assert appeler(api, '', method='OPTIONS')['statusCode'] == 200
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests des routes de l'interface web Flask (/upload, /jobs, /download)
+"""
+
+import hashlib
+import io
+import time
+
+import pandas as pd
+import pytest
+
+import cache_mots_cles
+import cache_resultats
+import moteur_filtrage as moteur
+
+DATA = (
+    "title,id,channelName\n"
+    "Apprendre Python,v1,Code\n"
+    "Recette de crêpes,v2,Cuisine\n"
+    "Tutoriel JavaScript,v3,Web\n"
+).encode('utf-8')
+
+KEYWORDS = b"keyword\npython\ntutoriel\n"
+
+
+@pytest.fixture
+def application(tmp_path, monkeypatch):
+    """Module app, avec uploads/ et les caches dans un dossier temporaire"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cache_mots_cles, 'DOSSIER_CACHE', str(tmp_path / 'cache'))
+    monkeypatch.setattr(cache_resultats, 'DOSSIER_CACHE', str(tmp_path / 'cache' / 'resultats'))
+    import app
+    app.app.config['TESTING'] = True
+    return app
+
+
+def formulaire(data=DATA, keywords=KEYWORDS, keywords_en_premier=True, empreinte=None):
+    """Champs du formulaire d'upload, dans l'ordre d'envoi (empreinte annoncée : avant Data.csv)"""
+    fichiers = [('keywords_file', (io.BytesIO(keywords), 'keywords.csv')),
+                ('data_file', (io.BytesIO(data), 'Data.csv'))]
+    champs = fichiers if keywords_en_premier else fichiers[::-1]
+    if empreinte is not None:
+        champs = [('data_sha256', empreinte)] + champs
+    return dict(champs)
+
+
+def resultat_attendu():
+    automate = moteur.compiler_mots_cles({'python', 'tutoriel'})
+    df_resultat, _ = moteur.filtrer(pd.read_csv(io.BytesIO(DATA), dtype=str), automate)
+    return df_resultat.to_csv(index=False).encode('utf-8')
+
+
+def job_id_de(page: bytes) -> str:
+    """Identifiant du filtrage repris du lien de téléchargement de result.html"""
+    debut = page.index(b'/download/') + len(b'/download/')
+    return page[debut:debut + 32].decode('ascii')
+
+
+@pytest.mark.parametrize('keywords_en_premier', [True, False])
+def test_upload(application, keywords_en_premier):
+    """Le filtrage synchrone affiche les statistiques et le fichier téléchargé est le résultat attendu"""
+    client = application.app.test_client()
+    reponse = client.post('/upload', data=formulaire(keywords_en_premier=keywords_en_premier),
+                          content_type='multipart/form-data')
+    assert reponse.status_code == 200
+    assert 'Filtrage terminé' in reponse.get_data(as_text=True)
+
+    telechargement = client.get(f"/download/{job_id_de(reponse.data)}")
+    assert telechargement.status_code == 200
+    assert telechargement.data == resultat_attendu()
+
+
+def test_upload_filtre_sans_enregistrer_data(application, monkeypatch):
+    """/upload filtre Data.csv pendant sa réception, sans l'écrire sur disque"""
+    def interdit(*args, **kwargs):
+        raise AssertionError("Data.csv enregistré avant le filtrage")
+    monkeypatch.setattr(application, 'enregistrer_data', interdit)
+
+    client = application.app.test_client()
+    reponse = client.post('/upload', data=formulaire(), content_type='multipart/form-data')
+    assert 'Filtrage terminé' in reponse.get_data(as_text=True)
+    assert client.get(f"/download/{job_id_de(reponse.data)}").data == resultat_attendu()
+
+
+def test_upload_sert_le_cache(application, monkeypatch):
+    """Avec l'empreinte de Data.csv annoncée, un résultat déjà calculé est servi sans nouveau filtrage"""
+    client = application.app.test_client()
+    empreinte = hashlib.sha256(DATA).hexdigest()
+    premiere = client.post('/upload', data=formulaire(), content_type='multipart/form-data')
+    assert premiere.status_code == 200
+
+    def interdit(*args, **kwargs):
+        raise AssertionError("filtrage relancé malgré le cache")
+    monkeypatch.setattr(application, 'filtrer_flux', interdit)
+
+    seconde = client.post('/upload', data=formulaire(empreinte=empreinte.upper()),
+                          content_type='multipart/form-data')
+    assert seconde.status_code == 200
+    assert 'Filtrage terminé' in seconde.get_data(as_text=True)
+    assert client.get(f"/download/{job_id_de(seconde.data)}").data == resultat_attendu()
+
+    # Une empreinte qui n'est pas celle du fichier envoyé ne sert pas le résultat en cache
+    autre = client.post('/upload', data=formulaire(data=DATA + b"Autre,v4,Web\n", empreinte=empreinte),
+                        content_type='multipart/form-data')
+    assert autre.status_code == 302
+    assert client.post('/upload', data=formulaire(empreinte='abc'),
+                       content_type='multipart/form-data').status_code == 302
+
+
+def test_upload_incomplet(application):
+    """Sans Data.csv, retour à l'accueil avec un message d'erreur"""
+    client = application.app.test_client()
+    reponse = client.post('/upload', data={'keywords_file': (io.BytesIO(KEYWORDS), 'keywords.csv')},
+                          content_type='multipart/form-data')
+    assert reponse.status_code == 302
+
+
+def test_jobs(application):
+    """Un travail soumis se termine et son résultat est téléchargeable ; le second envoi vient du cache"""
+    client = application.app.test_client()
+    reponse = client.post('/jobs', data=formulaire(), content_type='multipart/form-data')
+    assert reponse.status_code == 202
+    etat = reponse.get_json()
+
+    limite = time.monotonic() + 30
+    while etat['etat'] != 'termine':
+        assert etat['etat'] != 'erreur', etat
+        assert time.monotonic() < limite
+        time.sleep(0.05)
+        etat = client.get(etat['statut_url']).get_json()
+    assert etat['resultat']['gardees'] == 2
+    assert client.get(etat['resultat_url']).data == resultat_attendu()
+
+    en_cache = client.post('/jobs', data=formulaire(), content_type='multipart/form-data')
+    assert en_cache.status_code == 200
+    assert client.get(en_cache.get_json()['resultat_url']).data == resultat_attendu()
+
+    annonce = client.post('/jobs', data=formulaire(empreinte=hashlib.sha256(DATA).hexdigest()),
+                          content_type='multipart/form-data')
+    assert annonce.status_code == 200
+    assert client.get(annonce.get_json()['resultat_url']).data == resultat_attendu()
+
+
+def test_jobs_formulaire_invalide(application):
+    """Un fichier qui n'est pas un CSV est refusé avec 400"""
+    client = application.app.test_client()
+    reponse = client.post('/jobs', data={'keywords_file': (io.BytesIO(KEYWORDS), 'keywords.txt')},
+                          content_type='multipart/form-data')
+    assert reponse.status_code == 400
+    assert 'erreur' in reponse.get_json()
+
+
+def test_download_identifiant_invalide(application):
+    """Un identifiant qui n'est pas un identifiant de travail ne sert aucun fichier"""
+    client = application.app.test_client()
+    assert client.get('/download/inconnu').status_code == 302
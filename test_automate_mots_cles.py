@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de l'automate de recherche des mots-clés
+"""
+
+import pickle
+
+import pytest
+
+from automate_mots_cles import (AutomateMotsCles, ExpressionInvalide, ReglesChamps, analyser_expression,
+                                compiler_mots_cles, ecrire_expression, nettoyer_regle, normaliser_texte, plan_vrai)
+
+MOTS_CLES = {'python', 'java', 'javascript', 'he', 'she', 'his', 'hers', 'c++'}
+
+TEXTES = [
+    'tutoriel python pour debutants',
+    'apprendre javascript',
+    'ushers',
+    'cours de c++ moderne',
+    'cuisine facile',
+    'pyth on',
+    '',
+]
+
+
+def test_meme_resultat_que_la_boucle():
+    """L'automate donne le même résultat que `mot_cle in texte` pour chaque mot-clé"""
+    automate = compiler_mots_cles(MOTS_CLES)
+    for texte in TEXTES:
+        assert automate.contient(texte) == any(mot in texte for mot in MOTS_CLES), texte
+    assert automate.masque(TEXTES) == [any(mot in texte for mot in MOTS_CLES) for texte in TEXTES]
+
+
+def test_mots_cles_suffixes():
+    """Un mot-clé suffixe d'un autre est trouvé grâce aux liens d'échec"""
+    automate = AutomateMotsCles({'she', 'he', 'hers'})
+    assert automate.contient('ahe')
+    assert automate.contient('shx he')
+    assert not automate.contient('sh')
+    assert automate.correspondances('ushers') == ['he', 'hers', 'she']
+
+
+def test_sans_mot_cle_et_mot_cle_vide():
+    """Sans mot-clé rien n'est trouvé ; un mot-clé vide est présent partout, comme `'' in texte`"""
+    assert not AutomateMotsCles(set()).contient('python')
+    assert AutomateMotsCles({''}).contient('')
+
+
+def test_serialisation():
+    """L'automate envoyé aux processus du pool se comporte comme l'original"""
+    automate = compiler_mots_cles(MOTS_CLES)
+    copie = pickle.loads(pickle.dumps(automate))
+    assert copie.mots_cles == automate.mots_cles
+    assert copie.masque(TEXTES) == automate.masque(TEXTES)
+
+
+def test_compiler_automate_existant():
+    """compiler_mots_cles renvoie tel quel un automate déjà compilé"""
+    automate = compiler_mots_cles(MOTS_CLES)
+    assert compiler_mots_cles(automate) is automate
+
+
+def test_priorite_des_operateurs():
+    """AND (ou NOT seul) est prioritaire sur OR ; les mots consécutifs forment un seul terme normalisé"""
+    assert analyser_expression('python AND NOT shorts OR "c++" AND cours') == ('ou', (
+        ('et', (('terme', 'python'), ('non', ('terme', 'shorts')))),
+        ('et', (('terme', 'c++'), ('terme', 'cours'))),
+    ))
+    assert analyser_expression('Python  Débutant NOT (Shorts OR Live)') == ('et', (
+        ('terme', 'python debutant'),
+        ('non', ('ou', (('terme', 'shorts'), ('terme', 'live')))),
+    ))
+
+
+def test_termes_entre_guillemets():
+    """Parenthèses et opérateurs entre guillemets sont du texte ; "" est un guillemet"""
+    assert analyser_expression('"a (b)" OR "dit ""bonjour""" OR "AND"') == ('ou', (
+        ('terme', 'a (b)'), ('terme', 'dit "bonjour"'), ('terme', 'and')))
+
+
+@pytest.mark.parametrize('expression', [
+    'python AND', '(python', 'python)', 'AND python', 'python OR ""', '"python', 'python NOT',
+])
+def test_expressions_invalides(expression):
+    with pytest.raises(ExpressionInvalide):
+        analyser_expression(expression)
+
+
+@pytest.mark.parametrize('expression', [
+    'python AND NOT (shorts OR live)',
+    'NOT (a AND b) OR "c (d)"',
+    '(a OR b) AND (c OR NOT d)',
+])
+def test_forme_canonique_relue_a_l_identique(expression):
+    """ecrire_expression puis analyser_expression redonnent le même plan"""
+    plan = analyser_expression(expression)
+    assert analyser_expression(ecrire_expression(plan)) == plan
+    assert nettoyer_regle(ecrire_expression(plan)) == ecrire_expression(plan)
+
+
+def test_expressions_dans_l_automate():
+    """L'automate évalue les expressions comme plan_vrai, à côté des mots-clés simples"""
+    regles = {'cuisine', 'python NOT shorts', 'NOT (java OR python) AND cours', 'tutoriel AND (c++ OR rust)'}
+    automate = compiler_mots_cles(regles)
+    plans = [analyser_expression(regle) for regle in automate.expressions]
+    textes = TEXTES + ['python shorts', 'cours de piano', 'cours python', 'tutoriel rust', 'cuisine shorts']
+    for texte in map(normaliser_texte, textes):
+        attendu = any(mot in texte for mot in automate.simples) or any(plan_vrai(plan, texte) for plan in plans)
+        assert automate.contient(texte) == attendu, texte
+    assert automate.correspondances('python tuto cuisine') == ['cuisine', 'python NOT shorts']
+
+
+def test_regles_champs():
+    """Un mot-clé n'est cherché que dans son champ ; une règle d'exclusion l'emporte"""
+    regles = ReglesChamps([('title', {'python'}, False), ('channelName', {'python'}, True),
+                           ('title', {'shorts'}, True)])
+    assert regles.champs == ('title', 'channelName')
+    assert regles.colonnes == ('match_title', 'blocked_channelName', 'blocked_title')
+    assert regles.decider(('python pour debutants', 'code')) == (True, (True, False, False))
+    assert regles.decider(('python shorts', 'code')) == (False, (True, False, True))
+    assert regles.decider(('cours', 'python')) == (False, (False, True, False))
+    # Pas de correspondance à cheval sur deux champs
+    assert not regles.decider(('pyt', 'hon'))[0]
+    with pytest.raises(ValueError):
+        ReglesChamps([('title', {'a'}, False), ('title', {'b'}, False)])
+
+
+def test_regles_champs_un_seul_passage(monkeypatch):
+    """Inclusion et exclusion d'un même champ : un automate, un passage, les deux colonnes remplies"""
+    regles = ReglesChamps([('title', {'python', 'tutoriel', 'cours NOT gratuit'}, False),
+                           ('title', {'python', 'shorts', 'NOT cours'}, True)])
+    textes = ['python', 'tutoriel shorts', 'cours gratuit', 'cours payant', 'cuisine', '']
+    attendus = [tuple(automate.contient(texte) for _, automate, _ in regles.regles) for texte in textes]
+
+    # Un seul parcours par champ : contient n'est plus appelé pour les champs à plusieurs règles
+    monkeypatch.setattr(AutomateMotsCles, 'contient', lambda *args: pytest.fail("champ parcouru par règle"))
+    for texte, attendu in zip(textes, attendus):
+        assert regles.decider((texte,))[1] == attendu, texte
+    # 'python' est sur les deux listes : match_title et blocked_title sont vrais, la vidéo est rejetée
+    assert regles.decider(('apprendre python',)) == (False, (True, True))
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du banc de mesure du filtrage (benchmarks/bench_filtrage.py)
+"""
+
+import json
+
+from benchmarks.bench_filtrage import lancer
+
+
+def lire_resultats(chemin):
+    with open(chemin, 'r', encoding='utf-8') as fichier:
+        return [json.loads(ligne) for ligne in fichier]
+
+
+def test_parallele_au_dela_du_seuil(tmp_path):
+    """Chaque cas tourne hors d'un pool démon : le moteur 'parallele' peut démarrer le sien"""
+    sortie = str(tmp_path / 'resultats.jsonl')
+    echecs = lancer([500], [10], ['automate', 'parallele'], 2, str(tmp_path / 'donnees'), sortie,
+                    seuil_parallele=100)
+    resultats = lire_resultats(sortie)
+    assert echecs == 0
+    assert [resultat.get('erreur') for resultat in resultats] == [None, None]
+    assert resultats[1]['workers'] == 2 and resultats[1]['seuil_parallele'] == 100
+    assert resultats[0]['gardees'] == resultats[1]['gardees']
+
+
+def test_cas_en_echec_enregistre(tmp_path):
+    """Un cas en échec est enregistré avec son erreur et les cas suivants sont mesurés"""
+    sortie = str(tmp_path / 'resultats.jsonl')
+    echecs = lancer([200], [10], ['inconnu', 'automate'], 1, str(tmp_path / 'donnees'), sortie)
+    resultats = lire_resultats(sortie)
+    assert echecs == 1
+    assert resultats[0]['erreur'].startswith('ValueError: Moteur inconnu')
+    assert 'erreur' not in resultats[1] and resultats[1]['total_s'] > 0
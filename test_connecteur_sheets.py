@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du connecteur Google Sheets, contre l'imitation locale de l'API (serveur_sheets_local.py)
+"""
+
+import threading
+
+import pytest
+
+from automate_mots_cles import compiler_mots_cles
+from connecteur_sheets import ClientSheets, synchroniser
+from serveur_sheets_local import ClasseurLocal, ServeurSheetsLocal, analyser_plage
+
+pytest.importorskip('requests')
+
+FEUILLE = [
+    ['title', 'id', 'channelName'],
+    ['Apprendre Python', 'v1', 'Code'],
+    ['Recette de crêpes', 'v2', 'Cuisine'],
+    ['Tutoriel JavaScript', 'v3', 'Web'],
+]
+
+
+@pytest.fixture
+def serveur():
+    """Serveur local sur un port libre, arrêté à la fin du test"""
+    serveur = ServeurSheetsLocal(ClasseurLocal({'Data': [list(ligne) for ligne in FEUILLE]}), port=0)
+    thread = threading.Thread(target=serveur.serve_forever, daemon=True)
+    thread.start()
+    yield serveur
+    serveur.shutdown()
+    serveur.server_close()
+    thread.join()
+
+
+def test_synchronisation_incrementale(serveur, tmp_path):
+    """Colonne 'decision' ajoutée, puis seules les lignes ajoutées sont refiltrées, les modifiées avec relire_tout"""
+    automate = compiler_mots_cles({'python', 'tutoriel'})
+    etat = str(tmp_path / 'etat.json')
+    feuille = serveur.classeur.feuilles['Data']
+
+    with ClientSheets('local', serveur.url) as client:
+        stats = synchroniser(client, automate, 'Data', etat, lignes_par_page=2)
+        assert (stats['mode'], stats['total'], stats['gardees']) == ('complet', 3, 2)
+        assert [ligne[3] for ligne in feuille] == ['decision', 'Gardé', 'Rejeté', 'Gardé']
+
+        stats = synchroniser(client, automate, 'Data', etat, lignes_par_page=2)
+        assert (stats['mode'], stats['total'], stats['deja_traitees']) == ('incremental', 0, 3)
+        assert stats['cellules_ecrites'] == 0
+
+        feuille[2][0] = 'Python en cuisine'
+        feuille.append(['Randonnée', 'v4', 'Nature'])
+        stats = synchroniser(client, automate, 'Data', etat, lignes_par_page=2)
+        assert (stats['lecture'], stats['total'], stats['gardees'], stats['deja_traitees']) == ('suite', 1, 0, 3)
+        assert [ligne[3] for ligne in feuille[1:]] == ['Gardé', 'Rejeté', 'Gardé', 'Rejeté']
+
+        stats = synchroniser(client, automate, 'Data', etat, lignes_par_page=2, relire_tout=True)
+        assert (stats['lecture'], stats['total'], stats['gardees'], stats['deja_traitees']) == ('complete', 1, 1, 3)
+        assert [ligne[3] for ligne in feuille[1:]] == ['Gardé', 'Gardé', 'Gardé', 'Rejeté']
+
+
+def test_lecture_a_la_suite(serveur, tmp_path, monkeypatch):
+    """Seules les lignes à partir de la dernière lue sont lues ; feuille raccourcie : relecture complète"""
+    automate = compiler_mots_cles({'python', 'tutoriel'})
+    etat = str(tmp_path / 'etat.json')
+    feuille = serveur.classeur.feuilles['Data']
+    feuille.extend([f'Tutoriel {numero}', f'w{numero}', 'Web'] for numero in range(20))
+    lire = serveur.classeur.lire
+    debuts = []
+
+    def lire_compte(plage):
+        """Note le numéro de la première ligne de chaque plage lue"""
+        debuts.append(analyser_plage(plage)[1] + 1)
+        return lire(plage)
+
+    monkeypatch.setattr(serveur.classeur, 'lire', lire_compte)
+
+    with ClientSheets('local', serveur.url) as client:
+        synchroniser(client, automate, 'Data', etat, lignes_par_page=4)
+        feuille.append(['Python avancé', 'v5', 'Code'])
+        debuts.clear()
+        stats = synchroniser(client, automate, 'Data', etat, lignes_par_page=4)
+        assert (stats['lecture'], stats['total'], stats['deja_traitees']) == ('suite', 1, 23)
+        assert debuts[0] == 1 and min(debuts[1:]) == 24
+        assert feuille[-1][3] == 'Gardé'
+
+        del feuille[10:]
+        debuts.clear()
+        stats = synchroniser(client, automate, 'Data', etat, lignes_par_page=4)
+        assert (stats['lecture'], stats['total'], stats['deja_traitees']) == ('complete', 0, 9)
+        assert 2 in debuts
+
+
+def test_simulation_sans_ecriture(serveur, tmp_path):
+    """ecrire=False calcule les statistiques sans toucher à la feuille"""
+    with ClientSheets('local', serveur.url) as client:
+        stats = synchroniser(client, compiler_mots_cles({'python'}), 'Data', str(tmp_path / 'etat.json'),
+                             ecrire=False)
+    assert (stats['gardees'], stats['cellules_ecrites']) == (1, 0)
+    assert serveur.classeur.feuilles['Data'] == FEUILLE
+    assert not (tmp_path / 'etat.json').exists()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du dédoublonnage par id : ensemble d'empreintes, filtre de Bloom, relances
+"""
+
+import io
+
+import pandas as pd
+import pytest
+
+import moteur_filtrage as moteur
+from deduplication import (ENTETE_ENSEMBLE, EnsembleIds, FiltreBloom, charger_ids_vus, creer_ids_vus,
+                           empreinte_id)
+from filtrage_sans_pandas import filtrer_csv
+
+DATA = (
+    "title,id,channelName\n"
+    "Apprendre Python,v1,Code\n"
+    "Recette de crêpes,v2,Cuisine\n"
+    "Apprendre Python (rediffusion),v1,Code\n"
+    "Tutoriel sans id,,Web\n"
+    "Tutoriel JavaScript,v3,Web\n"
+    "Tutoriel sans id,,Web\n"
+)
+
+
+def test_ensemble_ids():
+    """Seule la première occurrence d'un id est nouvelle, la table grandit sans rien perdre"""
+    ids_vus = EnsembleIds()
+    ids = [f"video-{numero}" for numero in range(5_000)]
+    assert all(ids_vus.nouveau(identifiant) for identifiant in ids)
+    assert not any(ids_vus.nouveau(identifiant) for identifiant in ids)
+    assert len(ids_vus) == 5_000
+
+
+def test_ensemble_ids_enregistre(tmp_path):
+    """Fichier : en-tête puis empreintes de 8 octets triées ; relu, il connaît les mêmes ids"""
+    ids_vus = EnsembleIds()
+    for identifiant in ('v3', 'v1', 'v2', 'v1'):
+        ids_vus.nouveau(identifiant)
+    chemin = str(tmp_path / 'ids_vus.bin')
+    ids_vus.enregistrer(chemin)
+
+    with open(chemin, 'rb') as fichier:
+        assert fichier.read() == ENTETE_ENSEMBLE + b''.join(sorted(empreinte_id(i) for i in ('v1', 'v2', 'v3')))
+    relus = charger_ids_vus(chemin)
+    assert isinstance(relus, EnsembleIds) and len(relus) == 3
+    assert not relus.nouveau('v2')
+    assert relus.nouveau('v4')
+
+
+def test_fichier_invalide(tmp_path):
+    chemin = tmp_path / 'ids_vus.bin'
+    assert charger_ids_vus(str(chemin)) is None
+    chemin.write_bytes(ENTETE_ENSEMBLE + b'\x00' * 5)
+    with pytest.raises(ValueError):
+        charger_ids_vus(str(chemin))
+    chemin.write_bytes(b'autre chose')
+    with pytest.raises(ValueError):
+        charger_ids_vus(str(chemin))
+
+
+def test_filtre_bloom(tmp_path):
+    """Aucun doublon n'est gardé (pas de faux négatif), y compris après relecture"""
+    bloom = FiltreBloom(capacite=1_000)
+    ids = [f"video-{numero}" for numero in range(1_000)]
+    nouveaux = sum(bloom.nouveau(identifiant) for identifiant in ids)
+    assert nouveaux >= 990
+    assert not any(bloom.nouveau(identifiant) for identifiant in ids)
+
+    chemin = str(tmp_path / 'bloom.bin')
+    bloom.enregistrer(chemin)
+    relu = creer_ids_vus(chemin)
+    assert isinstance(relu, FiltreBloom) and len(relu) == nouveaux
+    assert not any(relu.nouveau(identifiant) for identifiant in ids)
+
+
+def test_comme_drop_duplicates():
+    """Même résultat que drop_duplicates sur 'id', les lignes sans id étant toutes gardées"""
+    df_data = pd.read_csv(io.StringIO(DATA), dtype=str)
+    masque = moteur.masque_nouveaux(df_data, EnsembleIds())
+    attendu = ~df_data['id'].duplicated() | df_data['id'].isna()
+    assert masque.tolist() == attendu.tolist()
+
+
+def test_relances_sans_doublon(tmp_path):
+    """Les ids enregistrés lors d'un filtrage sont écartés du suivant"""
+    automate = moteur.compiler_mots_cles({'python', 'tutoriel'})
+    chemin = str(tmp_path / 'ids_vus.bin')
+
+    ids_vus = creer_ids_vus(chemin)
+    df_resultat, stats = moteur.filtrer(io.StringIO(DATA), automate, format_donnees='csv', ids_vus=ids_vus)
+    assert (stats['total'], stats['doublons']) == (5, 1)
+    assert df_resultat['id'].dropna().tolist() == ['v1', 'v2', 'v3']
+    ids_vus.enregistrer(chemin)
+
+    suite = DATA + "Python avancé,v4,Code\n"
+    df_resultat, stats = moteur.filtrer(io.StringIO(suite), automate, format_donnees='csv',
+                                        ids_vus=creer_ids_vus(chemin))
+    assert (stats['doublons'], stats['gardees']) == (4, 3)
+    assert df_resultat['id'].dropna().tolist() == ['v4']
+
+
+def test_sans_pandas_identique():
+    """filtrer_csv écarte les mêmes doublons que le moteur pandas"""
+    automate = moteur.compiler_mots_cles({'python', 'tutoriel'})
+    df_resultat, stats_pandas = moteur.filtrer(io.StringIO(DATA), automate, format_donnees='csv',
+                                               ids_vus=EnsembleIds())
+    sortie = io.StringIO(newline='')
+    stats = filtrer_csv(io.StringIO(DATA, newline=''), automate, sortie, ids_vus=EnsembleIds())
+    assert sortie.getvalue() == df_resultat.to_csv(index=False)
+    assert stats == stats_pandas
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du filtrage incrémental : relances, nouvelles vidéos, arrêt en cours de route
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+import moteur_filtrage as moteur
+from filtrage_incremental import chemin_etat_defaut, filtrer_incremental
+
+COLONNES = ['title', 'id', 'channelName']
+
+VIDEOS = [
+    ['Apprendre Python', 'v1', 'Code'],
+    ['Recette de crêpes', 'v2', 'Cuisine'],
+    ['Tutoriel JavaScript', 'v3', 'Web'],
+    ['Randonnée en forêt', 'v4', 'Nature'],
+]
+
+
+def ecrire_data(chemin, lignes):
+    pd.DataFrame(lignes, columns=COLONNES).to_csv(chemin, index=False)
+
+
+@pytest.fixture
+def automate():
+    return moteur.compiler_mots_cles({'python', 'tutoriel'})
+
+
+def test_relances(tmp_path, automate):
+    """Premier passage complet, puis seules les vidéos nouvelles sont filtrées et ajoutées"""
+    data = tmp_path / 'Data.csv'
+    sortie = str(tmp_path / 'videos_filtrees.csv')
+    ecrire_data(data, VIDEOS[:2])
+
+    stats = filtrer_incremental(str(data), automate, sortie)
+    assert (stats['mode'], stats['total'], stats['gardees']) == ('complet', 2, 1)
+
+    stats = filtrer_incremental(str(data), automate, sortie)
+    assert (stats['mode'], stats['total'], stats['deja_traitees']) == ('incremental', 0, 2)
+
+    ecrire_data(data, VIDEOS)
+    stats = filtrer_incremental(str(data), automate, sortie)
+    assert (stats['mode'], stats['total'], stats['gardees']) == ('incremental', 2, 1)
+
+    # Même résultat qu'un filtrage complet de toutes les vidéos
+    attendu, _ = moteur.filtrer(pd.read_csv(data, dtype=str), automate)
+    with open(sortie, 'r', encoding='utf-8', newline='') as fichier:
+        assert fichier.read() == attendu.to_csv(index=False)
+
+
+def test_mots_cles_modifies(tmp_path, automate):
+    """Des mots-clés différents refiltrent toutes les vidéos"""
+    data = tmp_path / 'Data.csv'
+    sortie = str(tmp_path / 'videos_filtrees.csv')
+    ecrire_data(data, VIDEOS)
+    filtrer_incremental(str(data), automate, sortie)
+
+    stats = filtrer_incremental(str(data), moteur.compiler_mots_cles({'crepes'}), sortie)
+    assert (stats['mode'], stats['total'], stats['gardees']) == ('complet', 4, 1)
+    assert len(pd.read_csv(sortie)) == 4
+
+
+def test_arret_en_cours_sans_doublon(tmp_path, automate, monkeypatch):
+    """Un filtrage interrompu ne laisse aucune ligne dans le résultat ni dans l'état"""
+    data = tmp_path / 'Data.csv'
+    sortie = str(tmp_path / 'videos_filtrees.csv')
+    ecrire_data(data, VIDEOS[:2])
+    filtrer_incremental(str(data), automate, sortie)
+    with open(sortie, 'rb') as fichier:
+        avant = fichier.read()
+    with open(chemin_etat_defaut(sortie), 'rb') as fichier:
+        etat_avant = fichier.read()
+
+    # Le second bloc échoue après l'écriture du premier
+    ecrire_data(data, VIDEOS + [['Python avancé', 'v5', 'Code'], ['Cours de piano', 'v6', 'Musique']])
+    calculer = moteur.calculer_masque_backend
+    appels = []
+
+    def echoue_au_second_bloc(*args, **kwargs):
+        appels.append(1)
+        if len(appels) == 2:
+            raise RuntimeError("arrêt simulé")
+        return calculer(*args, **kwargs)
+
+    monkeypatch.setattr(moteur, 'calculer_masque_backend', echoue_au_second_bloc)
+    with pytest.raises(RuntimeError):
+        filtrer_incremental(str(data), automate, sortie, taille_bloc=3)
+    with open(sortie, 'rb') as fichier:
+        assert fichier.read() == avant
+    with open(chemin_etat_defaut(sortie), 'rb') as fichier:
+        assert fichier.read() == etat_avant
+    assert [nom for nom in os.listdir(tmp_path) if nom.endswith('.tmp')] == []
+
+    monkeypatch.setattr(moteur, 'calculer_masque_backend', calculer)
+    stats = filtrer_incremental(str(data), automate, sortie, taille_bloc=3)
+    assert (stats['total'], stats['gardees']) == (4, 2)
+    ids = pd.read_csv(sortie)['id']
+    assert not ids.duplicated().any()
+    assert len(ids) == 6
+
+
+def test_data_vide(tmp_path, automate):
+    """Data.csv sans ligne : en-tête seul, avec la fin de ligne des autres résultats"""
+    data = tmp_path / 'Data.csv'
+    sortie = str(tmp_path / 'videos_filtrees.csv')
+    ecrire_data(data, [])
+
+    stats = filtrer_incremental(str(data), automate, sortie)
+    assert stats['total'] == 0
+    with open(sortie, 'r', encoding='utf-8', newline='') as fichier:
+        assert fichier.read() == 'title,id,channelName,decision' + os.linesep
+
+
+@pytest.mark.parametrize('taille_bloc', [2, 100])
+def test_id_repete_dans_un_bloc(tmp_path, automate, taille_bloc):
+    """Un id nouveau répété dans le même bloc n'est écrit qu'une fois, au premier passage comme ensuite"""
+    data = tmp_path / 'Data.csv'
+    sortie = str(tmp_path / 'videos_filtrees.csv')
+    ecrire_data(data, [VIDEOS[0], VIDEOS[0], VIDEOS[1]])
+    stats = filtrer_incremental(str(data), automate, sortie, taille_bloc=taille_bloc)
+    assert stats['total'] == 2
+
+    ecrire_data(data, [VIDEOS[0], VIDEOS[0], VIDEOS[1], VIDEOS[2], VIDEOS[3], VIDEOS[2]])
+    stats = filtrer_incremental(str(data), automate, sortie, taille_bloc=taille_bloc)
+    assert (stats['mode'], stats['total'], stats['gardees']) == ('incremental', 2, 1)
+    assert pd.read_csv(sortie)['id'].tolist() == ['v1', 'v2', 'v3', 'v4']
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du filtrage sans pandas : même fichier, octet pour octet, que le moteur pandas
+"""
+
+import io
+
+import pytest
+
+import moteur_filtrage as moteur
+from automate_mots_cles import ReglesChamps
+from benchmarks.generer_donnees import generer_data, generer_keywords
+from filtrage_sans_pandas import CsvNonGere, filtrer_csv, mots_cles_depuis_csv
+
+# Cas particuliers : valeurs manquantes (NA, null, vide), guillemets, retour à la
+# ligne dans un champ, ligne courte, ligne vide, nombres avec et sans trous
+DATA_PARTICULIER = (
+    '\ufefftitle,id,viewcount,channelName\n'
+    'Apprendre Python,v1,15000,Code\n'
+    '"Tutoriel ""avancé"", partie 1",v2,,"Chaîne\nsur deux lignes"\n'
+    'NA,v3,NA,python\n'
+    'null,v4,0012\n'
+    '\n'
+    'Cuisine facile,v5,2.50,Cuisine\n'
+    '  Programmation  ,v6,1e3,nan\n'
+)
+
+KEYWORDS_PARTICULIER = 'keyword\nPython\nTUTORIEL\n123\n\n  programmation \n'
+
+
+def filtrer_pandas(data: str, keywords: str, **options) -> str:
+    automate = moteur.compiler_mots_cles(moteur.charger_mots_cles(io.StringIO(keywords)))
+    df_resultat, _ = moteur.filtrer(io.StringIO(data), automate, format_donnees='csv', **options)
+    return df_resultat.to_csv(index=False)
+
+
+def filtrer_standard(data: str, keywords: str, **options):
+    automate = moteur.compiler_mots_cles(mots_cles_depuis_csv(io.StringIO(keywords)))
+    sortie = io.StringIO(newline='')
+    stats = filtrer_csv(io.StringIO(data.lstrip('\ufeff'), newline=''), automate, sortie, **options)
+    return sortie.getvalue(), stats
+
+
+def test_mots_cles_identiques():
+    """Mêmes mots-clés nettoyés que moteur.charger_mots_cles"""
+    assert mots_cles_depuis_csv(io.StringIO(KEYWORDS_PARTICULIER)) == \
+        moteur.charger_mots_cles(io.StringIO(KEYWORDS_PARTICULIER))
+
+
+@pytest.mark.parametrize('options', [{}, {'colonnes': ['id', 'title']}, {'correspondances': True}])
+def test_cas_particuliers_identiques(options):
+    """Valeurs manquantes, guillemets et lignes courtes écrits comme par pandas"""
+    attendu = filtrer_pandas(DATA_PARTICULIER, KEYWORDS_PARTICULIER, **options)
+    obtenu, stats = filtrer_standard(DATA_PARTICULIER, KEYWORDS_PARTICULIER, **options)
+    assert obtenu == attendu
+    assert stats['total'] == 6
+
+
+def test_donnees_generees_identiques(tmp_path):
+    """Fichier synthétique (accents, chaînes répétées) : même résultat et mêmes statistiques"""
+    generer_data(str(tmp_path / 'Data.csv'), 3_000, graine=2)
+    generer_keywords(str(tmp_path / 'keywords.csv'), 50, graine=2)
+    data = (tmp_path / 'Data.csv').read_text(encoding='utf-8')
+    keywords = (tmp_path / 'keywords.csv').read_text(encoding='utf-8')
+
+    automate = moteur.compiler_mots_cles(moteur.charger_mots_cles(io.StringIO(keywords)))
+    df_resultat, stats_pandas = moteur.filtrer(io.StringIO(data), automate, format_donnees='csv',
+                                               correspondances=True)
+    obtenu, stats = filtrer_standard(data, keywords, correspondances=True)
+    assert obtenu == df_resultat.to_csv(index=False)
+    assert stats == stats_pandas
+
+
+def test_regles_champs_identiques():
+    """Règles par champ : mêmes colonnes match_/blocked_ et mêmes décisions que pandas"""
+    regles = ReglesChamps([('title', {'python', 'tutoriel'}, False), ('channelName', {'cuisine'}, True)])
+    data = DATA_PARTICULIER.lstrip('\ufeff')
+    df_resultat, stats_pandas = moteur.filtrer(io.StringIO(data), regles, format_donnees='csv')
+    sortie = io.StringIO(newline='')
+    stats = filtrer_csv(io.StringIO(data, newline=''), regles, sortie)
+    assert sortie.getvalue() == df_resultat.to_csv(index=False)
+    assert stats == stats_pandas
+
+
+def test_colonne_decision_remplacee():
+    """Une colonne 'decision' existante est remplacée à sa place, comme DataFrame.assign"""
+    data = 'title,decision,id\nApprendre Python,?,v1\nCuisine,?,v2\n'
+    obtenu, _ = filtrer_standard(data, 'keyword\npython\n')
+    assert obtenu == filtrer_pandas(data, 'keyword\npython\n')
+    assert obtenu.splitlines()[1] == 'Apprendre Python,Gardé,v1'
+
+
+def test_csv_non_gere():
+    """Colonnes dupliquées : seul pandas sait les renommer"""
+    with pytest.raises(CsvNonGere):
+        filtrer_standard('title,title\na,b\n', 'keyword\npython\n')
+    with pytest.raises(ValueError):
+        filtrer_standard('', 'keyword\npython\n')
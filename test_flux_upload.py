@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests de la lecture en flux des formulaires multipart
+"""
+
+import io
+
+import pytest
+
+from flux_upload import FormulaireFlux
+
+FRONTIERE = 'frontiere-de-test'
+
+DATA = "title,id\nApprendre Python,v1\nRecette de crêpes,v2\n".encode('utf-8') * 50
+
+
+def corps_multipart(parties) -> bytes:
+    """Corps multipart/form-data : parties (nom, nom de fichier ou None, contenu)"""
+    morceaux = []
+    for nom, nom_fichier, contenu in parties:
+        disposition = f'form-data; name="{nom}"'
+        if nom_fichier is not None:
+            disposition += f'; filename="{nom_fichier}"'
+        morceaux.append(f"--{FRONTIERE}\r\nContent-Disposition: {disposition}\r\n"
+                        f"Content-Type: text/csv\r\n\r\n".encode('latin-1') + contenu + b"\r\n")
+    morceaux.append(f"--{FRONTIERE}--\r\n".encode('latin-1'))
+    return b''.join(morceaux)
+
+
+@pytest.mark.parametrize('taille_lecture', [7, 1024, 64 * 1024])
+def test_parties_lues_en_flux(taille_lecture):
+    """Chaque partie est relue à l'identique, quelle que soit la découpe du flux"""
+    corps = corps_multipart([('keywords_file', 'keywords.csv', b"keyword\npython\n"),
+                             ('option', None, b"1"),
+                             ('data_file', 'Data.csv', DATA)])
+    formulaire = FormulaireFlux(io.BytesIO(corps), FRONTIERE, taille_lecture)
+    lues = [(partie.nom, partie.nom_fichier, partie.read()) for partie in formulaire.parties()]
+    assert lues == [('keywords_file', 'keywords.csv', b"keyword\npython\n"),
+                    ('option', None, b"1"),
+                    ('data_file', 'Data.csv', DATA)]
+
+
+def test_partie_non_lue_sautee():
+    """Une partie lue en partie seulement est sautée pour atteindre la suivante"""
+    corps = corps_multipart([('data_file', 'Data.csv', DATA), ('keywords_file', 'keywords.csv', b"keyword\n")])
+    formulaire = FormulaireFlux(io.BytesIO(corps), FRONTIERE, 16)
+    parties = formulaire.parties()
+    premiere = next(parties)
+    assert premiere.read(5) == b'title'
+    seconde = next(parties)
+    assert (seconde.nom, seconde.read()) == ('keywords_file', b"keyword\n")
+    assert premiere.octets_lus == len(DATA)
+    assert list(parties) == []
+
+
+def test_formulaire_tronque():
+    corps = corps_multipart([('data_file', 'Data.csv', DATA)])
+    formulaire = FormulaireFlux(io.BytesIO(corps[:len(corps) // 2]), FRONTIERE, 64)
+    with pytest.raises(ValueError):
+        for partie in formulaire.parties():
+            partie.read()
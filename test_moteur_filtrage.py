@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Tests du moteur de filtrage : moteurs de recherche, filtrage par blocs et en parallèle
+"""
+
+import io
+import threading
+
+import pandas as pd
+import pytest
+
+import moteur_filtrage as moteur
+from benchmarks.generer_donnees import generer_data, generer_keywords
+
+
+@pytest.fixture(scope='module')
+def fichiers(tmp_path_factory):
+    """Data.csv et keywords.csv synthétiques (accents, valeurs répétées)"""
+    dossier = tmp_path_factory.mktemp('donnees')
+    data = dossier / 'Data.csv'
+    keywords = dossier / 'keywords.csv'
+    generer_data(str(data), 2_000, graine=1)
+    generer_keywords(str(keywords), 40, graine=1)
+    return data, keywords
+
+
+@pytest.fixture(scope='module')
+def automate(fichiers):
+    return moteur.compiler_mots_cles(moteur.charger_mots_cles(str(fichiers[1])))
+
+
+def test_moteurs_identiques(fichiers, automate):
+    """Les moteurs donnent tous le masque de la boucle de référence"""
+    df_data = pd.read_csv(fichiers[0], dtype=str)
+    reference = moteur.calculer_masque_backend(df_data, automate, 'boucle')
+    assert 0 < reference.sum() < len(df_data)
+    for backend in ('vectorise', 'automate'):
+        assert (moteur.calculer_masque_backend(df_data, automate, backend) == reference).all(), backend
+
+
+def test_parallele_identique(fichiers, automate):
+    """Le pool de processus donne le même masque, dans l'ordre des lignes"""
+    df_data = pd.read_csv(fichiers[0], dtype=str)
+    reference = moteur.calculer_masque(df_data, automate)
+    with moteur.creer_pool(automate, 2) as pool:
+        masque = moteur.calculer_masque_backend(df_data, automate, 'parallele', 2, pool)
+        _, colonne, occurrences = moteur.calculer_correspondances(df_data, automate, 2, pool)
+    assert (masque == reference).all()
+    assert ((colonne != '') == reference).all()
+    assert sum(occurrences.values()) >= reference.sum()
+
+
+def test_blocs_identiques_au_filtrage_en_memoire(fichiers, automate):
+    """Le filtrage par blocs écrit le même fichier et les mêmes statistiques qu'en une fois"""
+    df_resultat, stats = moteur.filtrer(pd.read_csv(fichiers[0], dtype=str), automate)
+    attendu = df_resultat.to_csv(index=False)
+
+    sortie = io.StringIO()
+    stats_blocs = moteur.filtrer_par_blocs(str(fichiers[0]), automate, sortie, 300)
+    assert sortie.getvalue() == attendu
+    assert stats_blocs == stats
+
+
+def test_blocs_sans_pool_pour_un_petit_fichier(fichiers, automate, monkeypatch):
+    """En dessous de SEUIL_PARALLELE, le moteur 'parallele' ne démarre aucun processus"""
+    def interdit(*args, **kwargs):
+        raise AssertionError("pool créé pour un petit fichier")
+    monkeypatch.setattr(moteur, 'creer_pool', interdit)
+
+    sortie = io.StringIO()
+    stats = moteur.filtrer_par_blocs(str(fichiers[0]), automate, sortie, 500, backend='parallele', nb_workers=0)
+    assert stats['total'] == 2_000
+
+
+def test_blocs_en_parallele(fichiers, automate, monkeypatch):
+    """Au-delà du seuil, les blocs passent par le pool et le résultat ne change pas"""
+    attendu = io.StringIO()
+    moteur.filtrer_par_blocs(str(fichiers[0]), automate, attendu, 500)
+
+    monkeypatch.setattr(moteur, 'SEUIL_PARALLELE', 100)
+    sortie = io.StringIO()
+    moteur.filtrer_par_blocs(str(fichiers[0]), automate, sortie, 500, backend='parallele', nb_workers=2)
+    assert sortie.getvalue() == attendu.getvalue()
+
+
+def test_pool_demarre_par_spawn_depuis_un_serveur(automate):
+    """Avec d'autres threads en cours (serveur web), le pool n'est pas créé par fork"""
+    arret = threading.Event()
+    thread = threading.Thread(target=arret.wait)
+    thread.start()
+    try:
+        with moteur.creer_pool(automate, 1) as pool:
+            assert pool._mp_context.get_start_method() == 'spawn'
+            assert list(pool.map(moteur._masque_lot, [['python', 'cuisine']])) == [
+                automate.masque(['python', 'cuisine'])]
+    finally:
+        arret.set()
+        thread.join()
+
+
+def test_tri_des_nombres_lus_en_texte():
+    """Les colonnes numériques lues en texte (dtype=str) sont triées comme des nombres"""
+    df_data = pd.DataFrame({'title': ['a', 'b', 'c', 'd'], 'viewcount': ['900', '15000', None, '2500']}, dtype=str)
+    resultat = moteur.filtrer_compact(df_data, moteur.compiler_mots_cles({'a'}))
+    positions = resultat.positions()
+    assert resultat.trier(positions, 'viewcount').tolist() == [0, 3, 1, 2]
+    assert resultat.trier(positions, 'viewcount', decroissant=True).tolist() == [1, 3, 0, 2]
+    assert resultat.trier(positions, 'title', decroissant=True).tolist() == [3, 2, 1, 0]